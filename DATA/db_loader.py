@@ -1,20 +1,38 @@
 # SERVICE/db_loader.py
-import pyodbc
 import os
 import json
+import tempfile
+import threading
+from datetime import date, datetime, timezone
 #import math
-from dotenv import load_dotenv
-from DATA import data
+from DATA import data, parametros
 
-load_dotenv(override=True)
+# pyodbc y dotenv se importan recién al primer uso: el arranque (y los modos
+# que trabajan sólo con el caché) no pagan su costo de carga
+_entorno_cargado = False
+
+def _cargar_entorno():
+    """Lee el .env una sola vez (variables DB_CONNECTION_STRING y DB_QUERY_CONFIG)"""
+    global _entorno_cargado
+    if not _entorno_cargado:
+        _entorno_cargado = True
+        try:
+            from dotenv import load_dotenv
+        except ImportError:
+            print("⚠️ python-dotenv no está instalado: se usan sólo las variables de entorno")
+            return
+        load_dotenv(override=True)
 
 CACHE_FILE = "cache_config.json"
-MAX_JSON_NUMBER = 999999999999.0 
+MAX_JSON_NUMBER = parametros.MAX_JSON_NUMBER
+CLAVE_META = "_meta"
 
-def guardar_cache_local(datos_dict):
+def guardar_cache_local(datos_dict, version_bd=None, hash_parametros=None, fuente="bd"):
     """
     Guarda la configuración exitosa en un archivo JSON local.
     Convierte 'inf' a un número finito para cumplir el estándar JSON.
+    Agrega metadatos de frescura (_meta) y escribe de forma atómica:
+    archivo temporal en la misma carpeta + os.replace, así un corte nunca deja el JSON a medias.
     """
     try:
         # Hacemos una copia profunda para no modificar los datos en memoria
@@ -27,75 +45,237 @@ def guardar_cache_local(datos_dict):
                 if tramo['hasta'] == float('inf') or tramo['hasta'] >= MAX_JSON_NUMBER:
                     tramo['hasta'] = MAX_JSON_NUMBER
 
-        with open(CACHE_FILE, 'w') as f:
-            json.dump(datos_seguros, f, indent=4)
+        datos_seguros[CLAVE_META] = {
+            "obtenido": datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            "fuente": fuente,
+            "hash": hash_parametros,
+            "version_bd": version_bd,
+        }
+
+        carpeta = os.path.dirname(os.path.abspath(CACHE_FILE))
+        descriptor, temporal = tempfile.mkstemp(prefix=".cache_config.", suffix=".tmp", dir=carpeta)
+        try:
+            with os.fdopen(descriptor, 'w') as f:
+                json.dump(datos_seguros, f, indent=4)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temporal, CACHE_FILE)
+        except BaseException:
+            os.remove(temporal)
+            raise
         print("💾 Configuración guardada en caché local (JSON Seguro).")
     except Exception as e:
         print(f"⚠️ No se pudo escribir caché local: {e}")
 
+def leer_cache():
+    """Retorna (datos, metadatos) del caché local; (None, {}) si no existe o no se puede leer"""
+    if not os.path.exists(CACHE_FILE):
+        return None, {}
+    try:
+        with open(CACHE_FILE, 'r') as f:
+            raw_data = json.load(f)
+    except Exception as e:
+        print(f"❌ Error leyendo caché: {e}")
+        return None, {}
+    # Los cachés escritos antes de los metadatos no traen _meta
+    return raw_data, raw_data.pop(CLAVE_META, {}) or {}
+
+def edad_cache_segundos(meta: dict):
+    """Segundos desde que se obtuvieron los datos del caché (None si no se sabe)"""
+    try:
+        obtenido = datetime.fromisoformat(meta['obtenido'])
+    except (KeyError, TypeError, ValueError):
+        return None
+    return (datetime.now(timezone.utc) - obtenido).total_seconds()
+
 def cargar_desde_cache():
     """Intenta cargar la configuración desde el archivo JSON local"""
-    if not os.path.exists(CACHE_FILE):
+    raw_data, meta = leer_cache()
+    if raw_data is None:
         return False
         
     print("📂 Cargando desde caché local...")
     try:
-        with open(CACHE_FILE, 'r') as f:
-            raw_data = json.load(f)
-            aplicar_datos_a_memoria(raw_data)
-            data.ESTADO_CONEXION = "OFFLINE (Caché)"
-            data.MENSAJE_ESTADO = "Modo Offline (Datos Guardados)"
-            return True
+        publicado = aplicar_datos_a_memoria(raw_data)
+        if meta.get('hash') and meta['hash'] != publicado.hash:
+            print("⚠️ El hash del caché no coincide con su contenido (¿editado a mano?)")
+        data.ESTADO_CONEXION = "OFFLINE (Caché)"
+        data.MENSAJE_ESTADO = "Modo Offline (Datos Guardados)"
+        return True
     except Exception as e:
         print(f"❌ Error leyendo caché: {e}")
         return False
 
 def aplicar_datos_a_memoria(raw_data):
-    """Lógica común para inyectar datos al módulo data"""
+    """
+    Lógica común para publicar datos nuevos.
+    Construye un snapshot inmutable a partir del vigente (las claves ausentes se conservan)
+    y lo publica con intercambio atómico; DATA.data queda como espejo de ese snapshot.
+    Si el snapshot resultante no pasa parametros.validar se lanza ValueError y el vigente no cambia.
+    """
+    nuevo = parametros.validar(parametros.obtener_actual().reemplazar(raw_data))
+    return parametros.publicar(nuevo)
+
+def cargar_inicial():
+    """
+    Carga instantánea para el arranque (sin tocar la BD): caché local o valores de fábrica.
+    Si hay una BD configurada, el estado queda en LOADING hasta que termine la actualización.
+    """
+    if not cargar_desde_cache():
+        data.ESTADO_CONEXION = "OFFLINE (Default)"
+        data.MENSAJE_ESTADO = "Usando valores de fábrica"
+    _cargar_entorno()
+    if os.getenv('DB_CONNECTION_STRING'):
+        data.ESTADO_CONEXION = "LOADING"
+        data.MENSAJE_ESTADO = "Conectando a IARRHH..."
+
+# Una sola conexión a la BD, reutilizada por la carga inicial y el refresco periódico.
+# pyodbc no permite usar la misma conexión desde dos hilos a la vez: _lock_bd serializa las consultas.
+_conexion = None
+_lock_bd = threading.Lock()
+
+def _obtener_conexion(conn_str):
+    """Conexión vigente del pool (o una nueva); retorna (conexion, es_nueva)"""
+    global _conexion
+    if _conexion is not None:
+        return _conexion, False
+    import pyodbc
+    _conexion = pyodbc.connect(conn_str, timeout=5, autocommit=True)
+    return _conexion, True
+
+def cerrar_conexion():
+    """Cierra la conexión del pool; la próxima consulta abre una nueva"""
+    global _conexion
+    if _conexion is not None:
+        try:
+            _conexion.close()
+        except Exception:
+            pass
+        _conexion = None
+
+def actualizar_en_segundo_plano():
+    """Ejecuta actualizar_configuracion_desde_db en un hilo daemon y retorna el hilo"""
+    hilo = threading.Thread(target=actualizar_configuracion_desde_db, name="carga-parametros", daemon=True)
+    hilo.start()
+    return hilo
+
+def _datos_desde_filas(rows):
+    """Convierte las filas de DB_QUERY_CONFIG al formato plano del caché"""
+    datos_para_cache = {}
+
+    raw_map = {row.ConfigKey: row for row in rows}
+    datos_para_cache['VALOR_UF_ACTUAL'] = float(raw_map['VALOR_UF_ACTUAL'].val_Main)
+    datos_para_cache['SUELDO_MINIMO'] = int(raw_map['SUELDO_MINIMO'].val_Main)
+    datos_para_cache['TOPE_IMPONIBLE_AFP_SALUD'] = float(raw_map['TOPE_IMPONIBLE_AFP_SALUD'].val_Main)
+    datos_para_cache['TOPE_IMPONIBLE_CESANTIA'] = float(raw_map['TOPE_IMPONIBLE_CESANTIA'].val_Main)
+    datos_para_cache['DEFAULT_PLAN_ISAPRE_UF'] = float(raw_map['DEFAULT_PLAN_ISAPRE_UF'].val_Main)
     
-    # --- 1. ACTUALIZAR VARIABLES GLOBALES ---
-    data.VALOR_UF_ACTUAL = float(raw_data.get('VALOR_UF_ACTUAL', data.VALOR_UF_ACTUAL))
-    data.SUELDO_MINIMO = int(raw_data.get('SUELDO_MINIMO', data.SUELDO_MINIMO))
-    data.TOPE_IMPONIBLE_AFP_SALUD = float(raw_data.get('TOPE_IMPONIBLE_AFP_SALUD', data.TOPE_IMPONIBLE_AFP_SALUD))
-    data.TOPE_IMPONIBLE_CESANTIA = float(raw_data.get('TOPE_IMPONIBLE_CESANTIA', data.TOPE_IMPONIBLE_CESANTIA))
-    data.DEFAULT_PLAN_ISAPRE_UF = float(raw_data.get('DEFAULT_PLAN_ISAPRE_UF', data.DEFAULT_PLAN_ISAPRE_UF))
-
-    # --- 2. ACTUALIZAR DICCIONARIO AFP ---
-    if 'TASAS_AFP' in raw_data:
-        data.TASAS_AFP = raw_data['TASAS_AFP']
-
-    # --- 3. ACTUALIZAR TRAMOS (Con restauración de infinito) ---
-    if 'tramos_default' in raw_data:
-        tramos_limpios = []
-        for t in raw_data['tramos_default']:
-            hasta = float(t['hasta'])
-            # Restaurar infinito si es el número gigante
-            if hasta >= MAX_JSON_NUMBER:
-                hasta = float('inf')
-            
-            tramos_limpios.append({
-                "desde": float(t['desde']),
-                "hasta": hasta,
-                "tasa": float(t['tasa']),
-                "rebaja": float(t['rebaja'])
-            })
-        data.tramos_default = tramos_limpios
-
-    # --- 4. ACTUALIZAR PARAMETROS DICT ---
-    data.parametros_default.update({
-        "ingreso_minimo": data.SUELDO_MINIMO,
-        "valor_uf": data.VALOR_UF_ACTUAL,
-        "tope_imponible_uf": data.TOPE_IMPONIBLE_AFP_SALUD,
-        "tope_cesantia_uf": data.TOPE_IMPONIBLE_CESANTIA,
-        "tasa_afp": data.TASAS_AFP.get('Uno', 0.1049),
-        "tasa_salud": data.parametros_default['tasa_salud'],
-        "tasa_cesant": data.parametros_default['tasa_cesant']
-    })
-
-def actualizar_configuracion_desde_db():
+    # AFPs
+    afps = {}
+    for row in rows:
+        if row.Category == 'AFP':
+            name = row.ConfigKey.replace('AFP_', '').capitalize()
+            if name == 'Planvital': name = 'PlanVital'
+            if name == 'Provida': name = 'Provida' 
+            afps[name] = float(row.val_Main)
+    datos_para_cache['TASAS_AFP'] = afps
+
+    # Tramos
+    tramos = []
+    tramos_rows = sorted([r for r in rows if r.Category == 'IMPUESTO'], key=lambda x: x.ConfigKey)
+    for t in tramos_rows:
+        hasta = float(t.val_Aux1)
+        # MANTENEMOS INFINITO EN MEMORIA
+        if hasta > 900_000_000: hasta = float('inf')
+        
+        tramos.append({
+            "desde": float(t.val_Main),
+            "hasta": hasta,
+            "tasa": float(t.val_Aux2),
+            "rebaja": float(t.val_Aux3)
+        })
+    datos_para_cache['tramos_default'] = tramos
+
+    return datos_para_cache
+
+def _consultar_bd(conn, query, query_version, meta):
+    """
+    Ejecuta las consultas sobre una conexión abierta.
+    Retorna (datos, version_bd), o None si la versión de la BD coincide con la del caché
+    y éste se pudo cargar (no hace falta traer la configuración completa).
+    """
+    cursor = conn.cursor()
+    try:
+        version_bd = None
+        if query_version:
+            cursor.execute(query_version)
+            fila = cursor.fetchone()
+            version_bd = str(fila[0]) if fila and fila[0] is not None else None
+            if version_bd is not None and version_bd == meta.get('version_bd') and cargar_desde_cache():
+                print(f"✅ Sin cambios en BD (versión {version_bd}): se usa el caché.")
+                return None
+
+        cursor.execute(query)
+        return _datos_desde_filas(cursor.fetchall()), version_bd
+    finally:
+        cursor.close()
+
+def _consultar_con_reintento(conn_str, query, query_version, meta):
+    """
+    Consulta usando la conexión del pool. Si una conexión reutilizada falla (p.ej. la BD
+    la cerró por inactividad) se descarta y se reintenta una vez con una conexión nueva.
+    """
+    while True:
+        conn, es_nueva = _obtener_conexion(conn_str)
+        try:
+            return _consultar_bd(conn, query, query_version, meta)
+        except Exception:
+            cerrar_conexion()
+            if es_nueva:
+                raise
+            print("🔄 La conexión reutilizada falló; se reconecta...")
+
+_ultimo_hash_historico = None
+
+def _registrar_en_historico(params):
+    """
+    Agrega lo recién leído de la BD al histórico por fecha (UF del día y cambios mensuales).
+    Sólo cuando el snapshot cambió desde el último registro: el refresco periódico no
+    abre el SQLite si la BD devolvió lo mismo.
+    """
+    global _ultimo_hash_historico
+    if params.hash == _ultimo_hash_historico:
+        return
+    try:
+        from DATA import historico
+        historico.historico().registrar_snapshot(date.today(), params)
+        _ultimo_hash_historico = params.hash
+    except Exception as e:
+        print(f"⚠️ No se pudo actualizar el histórico de parámetros: {e}")
+
+def _ttl_minutos():
+    """CACHE_TTL_MINUTOS como número (0 = sin TTL); un valor mal escrito se ignora con aviso"""
+    valor = os.getenv('CACHE_TTL_MINUTOS') or 0
+    try:
+        return float(valor)
+    except ValueError:
+        print(f"⚠️ CACHE_TTL_MINUTOS inválido ({valor!r}); se consulta la BD sin TTL")
+        return 0.0
+
+def actualizar_configuracion_desde_db(forzar=False):
+    """
+    Carga la configuración desde la BD (o el caché si no hay conexión).
+    forzar=True ignora el TTL del caché: lo usan el refresco periódico y /recargar,
+    que existen justamente para volver a consultar la BD.
+    """
     print("🔄 Intentando conectar a Base de Datos...")
+    _cargar_entorno()
     conn_str = os.getenv('DB_CONNECTION_STRING')
     query = os.getenv('DB_QUERY_CONFIG')
+    # Opcionales: consulta barata que retorna una versión / fecha de última modificación,
+    # y minutos durante los cuales el caché se considera vigente sin consultar la BD
+    query_version = os.getenv('DB_QUERY_VERSION')
+    ttl_minutos = 0.0 if forzar else _ttl_minutos()
 
     if not conn_str:
         print("⚠️ Sin conexión configurada. Intentando caché...")
@@ -104,60 +284,77 @@ def actualizar_configuracion_desde_db():
             data.MENSAJE_ESTADO = "Usando valores de fábrica"
         return
 
+    _, meta = leer_cache()
+    edad = edad_cache_segundos(meta)
+    if ttl_minutos and meta.get('fuente') == "bd" and edad is not None and edad < ttl_minutos * 60:
+        if cargar_desde_cache():
+            data.ESTADO_CONEXION = "OFFLINE (Caché vigente)"
+            data.MENSAJE_ESTADO = f"Datos de IARRHH de hace {int(edad // 60)} min"
+            print(f"✅ Caché vigente (TTL {ttl_minutos:g} min): no se consulta la BD.")
+            return
+
     try:
-        with pyodbc.connect(conn_str, timeout=5) as conn:
-            cursor = conn.cursor()
-            cursor.execute(query)
-            rows = cursor.fetchall()
-
-            datos_para_cache = {}
-
-            raw_map = {row.ConfigKey: row for row in rows}
-            datos_para_cache['VALOR_UF_ACTUAL'] = float(raw_map['VALOR_UF_ACTUAL'].val_Main)
-            datos_para_cache['SUELDO_MINIMO'] = int(raw_map['SUELDO_MINIMO'].val_Main)
-            datos_para_cache['TOPE_IMPONIBLE_AFP_SALUD'] = float(raw_map['TOPE_IMPONIBLE_AFP_SALUD'].val_Main)
-            datos_para_cache['TOPE_IMPONIBLE_CESANTIA'] = float(raw_map['TOPE_IMPONIBLE_CESANTIA'].val_Main)
-            datos_para_cache['DEFAULT_PLAN_ISAPRE_UF'] = float(raw_map['DEFAULT_PLAN_ISAPRE_UF'].val_Main)
-            
-            # AFPs
-            afps = {}
-            for row in rows:
-                if row.Category == 'AFP':
-                    name = row.ConfigKey.replace('AFP_', '').capitalize()
-                    if name == 'Planvital': name = 'PlanVital'
-                    if name == 'Provida': name = 'Provida' 
-                    afps[name] = float(row.val_Main)
-            datos_para_cache['TASAS_AFP'] = afps
-
-            # Tramos
-            tramos = []
-            tramos_rows = sorted([r for r in rows if r.Category == 'IMPUESTO'], key=lambda x: x.ConfigKey)
-            for t in tramos_rows:
-                hasta = float(t.val_Aux1)
-                # MANTENEMOS INFINITO EN MEMORIA
-                if hasta > 900_000_000: hasta = float('inf')
-                
-                tramos.append({
-                    "desde": float(t.val_Main),
-                    "hasta": hasta,
-                    "tasa": float(t.val_Aux2),
-                    "rebaja": float(t.val_Aux3)
-                })
-            datos_para_cache['tramos_default'] = tramos
-
-            # APLICAR Y GUARDAR
-            aplicar_datos_a_memoria(datos_para_cache)
-            
-            # 2. Guardamos en disco, la función se encargará de cambiar 'inf' por el número gigante
-            guardar_cache_local(datos_para_cache)
-            
+        with _lock_bd:
+            resultado = _consultar_con_reintento(conn_str, query, query_version, meta)
+        if resultado is None:
             data.ESTADO_CONEXION = "ONLINE"
             data.MENSAJE_ESTADO = "Conectado a IARRHH"
-            print("✅ Datos actualizados y cacheados.")
+            return
+
+        datos_para_cache, version_bd = resultado
+
+        # APLICAR Y GUARDAR (si no pasa la validación, el snapshot vigente se mantiene)
+        publicado = aplicar_datos_a_memoria(datos_para_cache)
+
+        # 2. Guardamos en disco, la función se encargará de cambiar 'inf' por el número gigante
+        guardar_cache_local(datos_para_cache, version_bd=version_bd, hash_parametros=publicado.hash)
+        _registrar_en_historico(publicado)
+
+        data.ESTADO_CONEXION = "ONLINE"
+        data.MENSAJE_ESTADO = "Conectado a IARRHH"
+        print("✅ Datos actualizados y cacheados.")
+
+    except ValueError as e:
+        # Datos incoherentes en la BD: no se publican y el snapshot vigente sigue en uso
+        print(f"❌ Configuración de la BD rechazada: {e}")
+        data.MENSAJE_ESTADO = "Datos de IARRHH rechazados (se mantienen los vigentes)"
+        if data.ESTADO_CONEXION == "LOADING":
+            data.ESTADO_CONEXION = "OFFLINE (Caché)" if parametros.obtener_actual().version else "OFFLINE (Default)"
 
     except Exception as e:
         print(f"⚠️ Error conexión BD: {e}")
         print("🔄 Intentando usar caché local...")
         if not cargar_desde_cache():
             data.ESTADO_CONEXION = "OFFLINE (Default)"
-            data.MENSAJE_ESTADO = "Usando valores de fábrica"
\ No newline at end of file
+            data.MENSAJE_ESTADO = "Usando valores de fábrica"
+
+def iniciar_refresco_periodico(intervalo_segundos=900.0, al_actualizar=None):
+    """
+    Vuelve a consultar la configuración cada `intervalo_segundos` en un hilo daemon
+    (la UF cambia a diario y los tramos cada mes), reutilizando la conexión del pool.
+    Un snapshot nuevo y válido se publica con intercambio atómico: los cálculos en curso
+    terminan con el que tomaron. al_actualizar(snapshot) se registra con parametros.suscribir
+    y se llama desde el hilo del refresco sólo cuando cambia el contenido.
+    Retorna una función que detiene el refresco y cierra la conexión.
+    """
+    if al_actualizar is not None:
+        parametros.suscribir(al_actualizar)
+    detener = threading.Event()
+
+    def refrescar():
+        while not detener.wait(intervalo_segundos):
+            try:
+                actualizar_configuracion_desde_db(forzar=True)
+            except Exception as e:
+                print(f"⚠️ Error en refresco de parámetros: {e}")
+
+    threading.Thread(target=refrescar, name="refresco-parametros", daemon=True).start()
+
+    def parar():
+        detener.set()
+        if al_actualizar is not None:
+            parametros.desuscribir(al_actualizar)
+        with _lock_bd:
+            cerrar_conexion()
+
+    return parar
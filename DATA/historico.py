@@ -0,0 +1,270 @@
+# DATA/historico.py
+"""
+    Histórico de parámetros económicos indexado por fecha (recálculos retroactivos:
+    finiquitos, auditorías, reliquidaciones).
+
+    Se guardan dos series en un SQLite local:
+        uf                    valor diario de la UF
+        parametros_mensuales  conjunto vigente desde una fecha (sueldo mínimo, topes,
+                              tasas AFP, tramos...), una fila sólo cuando algo cambia
+
+    La consulta por fecha es una búsqueda binaria sobre las fechas ordenadas en memoria
+    (O(log n)) y el snapshot resultante se memoriza, así que una nómina de 24 meses
+    resuelve cada fila contra sus parámetros sin volver a leer la base.
+
+    Fechas: date/datetime, "AAAA-MM-DD" o un período "AAAA-MM". Un período se consulta
+    al ÚLTIMO día del mes (UF de cierre de la liquidación) y se registra como vigente
+    desde el PRIMER día del mes.
+
+    Ubicación: HISTORICO_PARAMETROS_DB si está definida; si no, junto al caché local de
+    parámetros (db_loader.CACHE_FILE).
+"""
+import calendar
+import json
+import os
+import sqlite3
+import threading
+from bisect import bisect_right
+from datetime import date, datetime
+from DATA import parametros
+
+HISTORICO_FILE = "historico_parametros.db"
+CLAVE_UF = "VALOR_UF_ACTUAL"
+
+
+def ruta_por_defecto() -> str:
+    """HISTORICO_PARAMETROS_DB, o HISTORICO_FILE en la carpeta del caché local de parámetros"""
+    ruta = os.getenv('HISTORICO_PARAMETROS_DB')
+    if ruta:
+        return ruta
+    from DATA import db_loader
+    return os.path.join(os.path.dirname(os.path.abspath(db_loader.CACHE_FILE)), HISTORICO_FILE)
+
+
+def _normalizar_fecha(valor, fin_de_mes: bool = True) -> str:
+    """Fecha ISO "AAAA-MM-DD"; un período "AAAA-MM" va al último (o primer) día del mes"""
+    if isinstance(valor, datetime):
+        return valor.date().isoformat()
+    if isinstance(valor, date):
+        return valor.isoformat()
+    texto = str(valor).strip()
+    if len(texto) == 7:
+        anio, mes = int(texto[:4]), int(texto[5:7])
+        dia = calendar.monthrange(anio, mes)[1] if fin_de_mes else 1
+        return date(anio, mes, dia).isoformat()
+    return date.fromisoformat(texto[:10]).isoformat()
+
+
+def _sin_uf(raw_data: dict) -> dict:
+    return {k: v for k, v in raw_data.items() if k != CLAVE_UF}
+
+
+class HistoricoParametros:
+    """Series de UF y de parámetros mensuales, persistidas en SQLite y consultadas con bisect"""
+
+    def __init__(self, ruta: str = None):
+        self.ruta = ruta or ruta_por_defecto()
+        # Reentrante: registrar_snapshot compone registrar_uf / registrar_parametros bajo el mismo lock
+        self._lock = threading.RLock()
+        self._fechas_uf = []
+        self._valores_uf = []
+        self._fechas_mensuales = []
+        self._datos_mensuales = []
+        self._snapshots = {}  # (fecha_mensual, fecha_uf) -> ParametrosEconomicos
+        self._cargar()
+
+    def _conectar(self):
+        conexion = sqlite3.connect(self.ruta)
+        conexion.execute("CREATE TABLE IF NOT EXISTS uf (fecha TEXT PRIMARY KEY, valor REAL NOT NULL)")
+        conexion.execute("CREATE TABLE IF NOT EXISTS parametros_mensuales "
+                         "(vigente_desde TEXT PRIMARY KEY, datos TEXT NOT NULL)")
+        return conexion
+
+    def _cargar(self):
+        if not os.path.exists(self.ruta):
+            return
+        conexion = self._conectar()
+        try:
+            for fecha, valor in conexion.execute("SELECT fecha, valor FROM uf ORDER BY fecha"):
+                self._fechas_uf.append(fecha)
+                self._valores_uf.append(valor)
+            for fecha, datos in conexion.execute(
+                    "SELECT vigente_desde, datos FROM parametros_mensuales ORDER BY vigente_desde"):
+                self._fechas_mensuales.append(fecha)
+                self._datos_mensuales.append(json.loads(datos))
+        finally:
+            conexion.close()
+
+    def _escribir(self, sql: str, filas: list):
+        """Ejecuta una escritura en una transacción (todas las filas o ninguna)"""
+        conexion = self._conectar()
+        try:
+            with conexion:
+                conexion.executemany(sql, filas)
+        finally:
+            conexion.close()
+
+    @staticmethod
+    def _reemplazar_en_serie(fechas: list, valores: list, fecha: str, valor):
+        """Inserta (o reemplaza) manteniendo ambas listas ordenadas por fecha"""
+        i = bisect_right(fechas, fecha)
+        if i and fechas[i - 1] == fecha:
+            valores[i - 1] = valor
+        else:
+            fechas.insert(i, fecha)
+            valores.insert(i, valor)
+
+    # --- Escritura ---
+
+    def registrar_uf(self, fecha, valor: float):
+        """Guarda el valor de la UF de un día"""
+        if valor <= 0:
+            raise ValueError(f"UF no positiva ({valor})")
+        fecha = _normalizar_fecha(fecha)
+        with self._lock:
+            self._escribir("INSERT OR REPLACE INTO uf (fecha, valor) VALUES (?, ?)", [(fecha, float(valor))])
+            self._reemplazar_en_serie(self._fechas_uf, self._valores_uf, fecha, float(valor))
+            self._snapshots.clear()
+
+    def registrar_uf_lote(self, valores: dict):
+        """Guarda muchos días de UF en una sola transacción ({fecha: valor})"""
+        filas = sorted((_normalizar_fecha(f), float(v)) for f, v in valores.items())
+        for fecha, valor in filas:
+            if valor <= 0:
+                raise ValueError(f"UF no positiva ({valor}) el {fecha}")
+        with self._lock:
+            self._escribir("INSERT OR REPLACE INTO uf (fecha, valor) VALUES (?, ?)", filas)
+            for fecha, valor in filas:
+                self._reemplazar_en_serie(self._fechas_uf, self._valores_uf, fecha, valor)
+            self._snapshots.clear()
+
+    def registrar_parametros(self, vigente_desde, raw_data: dict):
+        """
+        Guarda un conjunto de parámetros vigente desde una fecha (o período "AAAA-MM").
+        Las claves ausentes se toman del conjunto que regía en esa fecha (o del snapshot
+        vigente si no hay historia), y el resultado debe pasar parametros.validar.
+        """
+        fecha = _normalizar_fecha(vigente_desde, fin_de_mes=False)
+        with self._lock:
+            i = bisect_right(self._fechas_mensuales, fecha) - 1
+            anterior = self._datos_mensuales[i] if i >= 0 else _sin_uf(parametros.obtener_actual().a_diccionario())
+            # La UF no forma parte del conjunto mensual: se usa la vigente sólo para construir y validar
+            uf = parametros.obtener_actual().valor_uf
+            snapshot = parametros.validar(parametros.desde_diccionario({**anterior, CLAVE_UF: uf}).reemplazar(raw_data))
+            datos = _sin_uf(snapshot.a_diccionario())
+
+            self._escribir("INSERT OR REPLACE INTO parametros_mensuales (vigente_desde, datos) VALUES (?, ?)",
+                           [(fecha, json.dumps(datos, sort_keys=True))])
+            self._reemplazar_en_serie(self._fechas_mensuales, self._datos_mensuales, fecha, datos)
+            self._snapshots.clear()
+
+    def registrar_snapshot(self, fecha, params: parametros.ParametrosEconomicos):
+        """
+        Registra lo que rige en `fecha` según un snapshot (p.ej. el recién cargado de la BD):
+        la UF y los demás parámetros sólo si difieren de lo que ya regía en esa fecha
+        (un snapshot sin cambios no escribe nada).
+        """
+        fecha = _normalizar_fecha(fecha)
+        datos = _sin_uf(params.a_diccionario())
+        with self._lock:
+            j = bisect_right(self._fechas_uf, fecha) - 1
+            if j < 0 or self._valores_uf[j] != params.valor_uf:
+                self.registrar_uf(fecha, params.valor_uf)
+            i = bisect_right(self._fechas_mensuales, fecha) - 1
+            if i < 0 or self._datos_mensuales[i] != datos:
+                self.registrar_parametros(fecha, datos)
+
+    # --- Consulta ---
+
+    def parametros_en(self, fecha) -> parametros.ParametrosEconomicos:
+        """Snapshot con los parámetros que regían en `fecha` (ValueError si no hay historia)"""
+        fecha = _normalizar_fecha(fecha)
+        # Bajo el lock: una escritura concurrente inserta en las listas y limpia la memoria
+        with self._lock:
+            i = bisect_right(self._fechas_mensuales, fecha) - 1
+            j = bisect_right(self._fechas_uf, fecha) - 1
+            if i < 0:
+                raise ValueError(f"Sin parámetros históricos para {fecha}")
+            if j < 0:
+                raise ValueError(f"Sin valor de UF para {fecha}")
+
+            clave = (self._fechas_mensuales[i], self._fechas_uf[j])
+            snapshot = self._snapshots.get(clave)
+            if snapshot is None:
+                snapshot = self._snapshots[clave] = parametros.desde_diccionario(
+                    {**self._datos_mensuales[i], CLAVE_UF: self._valores_uf[j]})
+            return snapshot
+
+    def uf_en(self, fecha) -> float:
+        fecha = _normalizar_fecha(fecha)
+        with self._lock:
+            j = bisect_right(self._fechas_uf, fecha) - 1
+            if j < 0:
+                raise ValueError(f"Sin valor de UF para {fecha}")
+            return self._valores_uf[j]
+
+    def resumen(self) -> dict:
+        with self._lock:
+            return {
+                "dias_uf": len(self._fechas_uf),
+                "uf_desde": self._fechas_uf[0] if self._fechas_uf else None,
+                "uf_hasta": self._fechas_uf[-1] if self._fechas_uf else None,
+                "conjuntos_mensuales": len(self._fechas_mensuales),
+                "vigencias": list(self._fechas_mensuales),
+            }
+
+
+_historico = None
+_lock_historico = threading.Lock()
+
+
+def historico() -> HistoricoParametros:
+    """Instancia compartida del proceso (se abre al primer uso)"""
+    global _historico
+    if _historico is None:
+        with _lock_historico:
+            if _historico is None:
+                _historico = HistoricoParametros()
+    return _historico
+
+
+def parametros_en(fecha) -> parametros.ParametrosEconomicos:
+    """Parámetros vigentes en una fecha o período ("AAAA-MM")"""
+    return historico().parametros_en(fecha)
+
+
+def parametros_para(periodo=None) -> parametros.ParametrosEconomicos:
+    """Snapshot del período indicado, o el vigente si no se indica"""
+    if periodo is None or str(periodo).strip() == "":
+        return parametros.obtener_actual()
+    return parametros_en(periodo)
+
+
+def _numero(texto: str) -> float:
+    """Acepta '39123.45' y el formato chileno '39.123,45'"""
+    texto = str(texto).strip()
+    if ',' in texto:
+        texto = texto.replace('.', '').replace(',', '.')
+    return float(texto)
+
+
+def importar_uf_csv(ruta: str, separador: str = ','):
+    """Carga un CSV de UF diaria con columnas fecha y valor"""
+    import csv
+    with open(ruta, newline='', encoding='utf-8-sig') as f:
+        valores = {fila['fecha']: _numero(fila['valor']) for fila in csv.DictReader(f, delimiter=separador)}
+    historico().registrar_uf_lote(valores)
+    print(f"💾 {len(valores)} valores de UF guardados en el histórico")
+
+
+def importar_parametros_json(ruta: str):
+    """
+    Carga conjuntos mensuales desde un JSON: lista de objetos con "vigente_desde" y las
+    mismas claves que cache_config.json (sólo las que cambian)
+    """
+    with open(ruta, 'r', encoding='utf-8') as f:
+        conjuntos = json.load(f)
+    for conjunto in sorted(conjuntos, key=lambda c: _normalizar_fecha(c['vigente_desde'], fin_de_mes=False)):
+        datos = {k: v for k, v in conjunto.items() if k != 'vigente_desde'}
+        historico().registrar_parametros(conjunto['vigente_desde'], datos)
+    print(f"💾 {len(conjuntos)} conjuntos de parámetros guardados en el histórico")
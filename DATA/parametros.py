@@ -0,0 +1,259 @@
+# DATA/parametros.py
+"""
+    Snapshot inmutable y versionado de los parámetros económicos.
+
+    El loader construye un ParametrosEconomicos nuevo y lo publica con un
+    intercambio atómico; el motor toma la referencia una sola vez por cálculo,
+    así que un cálculo en curso nunca mezcla parámetros viejos y nuevos.
+    Las variables globales de DATA.data se mantienen como espejo para la UI.
+"""
+import hashlib
+import json
+import threading
+from types import MappingProxyType
+from DATA import data
+
+# Número usado para serializar 'inf' en JSON (mismo criterio que el caché local)
+MAX_JSON_NUMBER = 999999999999.0
+
+
+class ParametrosEconomicos:
+    """Conjunto inmutable de parámetros con número de versión y hash de contenido"""
+    __slots__ = (
+        "valor_uf", "sueldo_minimo", "tope_imponible_afp_salud", "tope_imponible_cesantia",
+        "default_plan_isapre_uf", "tasas_afp", "tramos",
+        "tasa_salud", "tasa_cesant", "factor_gratificacion", "porcentaje_gratificacion",
+        "version", "hash"
+    )
+
+    def __init__(self, version: int = 0, **valores):
+        object.__setattr__(self, "valor_uf", float(valores['valor_uf']))
+        object.__setattr__(self, "sueldo_minimo", int(valores['sueldo_minimo']))
+        object.__setattr__(self, "tope_imponible_afp_salud", float(valores['tope_imponible_afp_salud']))
+        object.__setattr__(self, "tope_imponible_cesantia", float(valores['tope_imponible_cesantia']))
+        object.__setattr__(self, "default_plan_isapre_uf", float(valores['default_plan_isapre_uf']))
+        object.__setattr__(self, "tasas_afp", MappingProxyType(
+            {nombre: float(tasa) for nombre, tasa in valores['tasas_afp'].items()}))
+        object.__setattr__(self, "tramos", tuple(
+            MappingProxyType({
+                "desde": float(t['desde']),
+                "hasta": float('inf') if float(t['hasta']) >= MAX_JSON_NUMBER else float(t['hasta']),
+                "tasa": float(t['tasa']),
+                "rebaja": float(t['rebaja'])
+            }) for t in valores['tramos']))
+        object.__setattr__(self, "tasa_salud", float(valores['tasa_salud']))
+        object.__setattr__(self, "tasa_cesant", float(valores['tasa_cesant']))
+        object.__setattr__(self, "factor_gratificacion", float(valores['factor_gratificacion']))
+        object.__setattr__(self, "porcentaje_gratificacion", float(valores['porcentaje_gratificacion']))
+        object.__setattr__(self, "version", int(version))
+        object.__setattr__(self, "hash", self._calcular_hash())
+
+    def __setattr__(self, nombre, valor):
+        raise AttributeError("ParametrosEconomicos es inmutable")
+
+    def __delattr__(self, nombre):
+        raise AttributeError("ParametrosEconomicos es inmutable")
+
+    def __reduce__(self):
+        # MappingProxyType no se puede serializar: se reconstruye desde el formato plano
+        return (desde_diccionario, (self.a_diccionario(), self.version))
+
+    def __repr__(self):
+        return f"ParametrosEconomicos(version={self.version}, hash={self.hash}, uf={self.valor_uf})"
+
+    def _calcular_hash(self) -> str:
+        contenido = json.dumps(self.a_diccionario(), sort_keys=True)
+        return hashlib.sha256(contenido.encode('utf-8')).hexdigest()[:16]
+
+    def a_diccionario(self) -> dict:
+        """Formato plano (mismas claves que cache_config.json), con 'inf' reemplazado para JSON"""
+        return {
+            "VALOR_UF_ACTUAL": self.valor_uf,
+            "SUELDO_MINIMO": self.sueldo_minimo,
+            "TOPE_IMPONIBLE_AFP_SALUD": self.tope_imponible_afp_salud,
+            "TOPE_IMPONIBLE_CESANTIA": self.tope_imponible_cesantia,
+            "DEFAULT_PLAN_ISAPRE_UF": self.default_plan_isapre_uf,
+            "TASAS_AFP": dict(self.tasas_afp),
+            "tramos_default": [
+                {**t, "hasta": MAX_JSON_NUMBER if t['hasta'] == float('inf') else t['hasta']}
+                for t in self.tramos
+            ],
+            "tasa_salud": self.tasa_salud,
+            "tasa_cesant": self.tasa_cesant,
+            "factor_gratificacion": self.factor_gratificacion,
+            "porcentaje_gratificacion": self.porcentaje_gratificacion,
+        }
+
+    def reemplazar(self, raw_data: dict, version: int = None) -> "ParametrosEconomicos":
+        """Crea un snapshot nuevo a partir de éste, sobrescribiendo las claves presentes en raw_data"""
+        return ParametrosEconomicos(
+            version=self.version if version is None else version,
+            valor_uf=raw_data.get('VALOR_UF_ACTUAL', self.valor_uf),
+            sueldo_minimo=raw_data.get('SUELDO_MINIMO', self.sueldo_minimo),
+            tope_imponible_afp_salud=raw_data.get('TOPE_IMPONIBLE_AFP_SALUD', self.tope_imponible_afp_salud),
+            tope_imponible_cesantia=raw_data.get('TOPE_IMPONIBLE_CESANTIA', self.tope_imponible_cesantia),
+            default_plan_isapre_uf=raw_data.get('DEFAULT_PLAN_ISAPRE_UF', self.default_plan_isapre_uf),
+            tasas_afp=raw_data.get('TASAS_AFP', self.tasas_afp),
+            tramos=raw_data.get('tramos_default', self.tramos),
+            tasa_salud=raw_data.get('tasa_salud', self.tasa_salud),
+            tasa_cesant=raw_data.get('tasa_cesant', self.tasa_cesant),
+            factor_gratificacion=raw_data.get('factor_gratificacion', self.factor_gratificacion),
+            porcentaje_gratificacion=raw_data.get('porcentaje_gratificacion', self.porcentaje_gratificacion),
+        )
+
+
+def desde_diccionario(raw_data: dict, version: int = 0) -> ParametrosEconomicos:
+    """Reconstruye un snapshot completo desde el formato plano de a_diccionario()"""
+    return ParametrosEconomicos(
+        version=version,
+        valor_uf=raw_data['VALOR_UF_ACTUAL'],
+        sueldo_minimo=raw_data['SUELDO_MINIMO'],
+        tope_imponible_afp_salud=raw_data['TOPE_IMPONIBLE_AFP_SALUD'],
+        tope_imponible_cesantia=raw_data['TOPE_IMPONIBLE_CESANTIA'],
+        default_plan_isapre_uf=raw_data['DEFAULT_PLAN_ISAPRE_UF'],
+        tasas_afp=raw_data['TASAS_AFP'],
+        tramos=raw_data['tramos_default'],
+        tasa_salud=raw_data['tasa_salud'],
+        tasa_cesant=raw_data['tasa_cesant'],
+        factor_gratificacion=raw_data['factor_gratificacion'],
+        porcentaje_gratificacion=raw_data['porcentaje_gratificacion'],
+    )
+
+
+# Separación máxima aceptada entre el 'hasta' de un tramo y el 'desde' del siguiente
+# (la tabla del SII deja $0,01 entre tramos)
+HOLGURA_TRAMOS = 1.0
+
+
+def validar(p: ParametrosEconomicos) -> ParametrosEconomicos:
+    """
+    Revisa que un snapshot sea coherente antes de publicarlo; lanza ValueError con todos
+    los problemas encontrados. Retorna el mismo snapshot si es válido.
+    """
+    problemas = []
+    if p.valor_uf <= 0:
+        problemas.append(f"UF no positiva ({p.valor_uf})")
+    if p.sueldo_minimo <= 0:
+        problemas.append(f"Sueldo mínimo no positivo ({p.sueldo_minimo})")
+    if p.tope_imponible_afp_salud <= 0 or p.tope_imponible_cesantia <= 0:
+        problemas.append("Topes imponibles deben ser positivos")
+    if p.default_plan_isapre_uf < 0:
+        problemas.append(f"Plan Isapre negativo ({p.default_plan_isapre_uf})")
+    if not p.tasas_afp:
+        problemas.append("Sin tasas de AFP")
+    for nombre, tasa in p.tasas_afp.items():
+        if not 0 < tasa < 1:
+            problemas.append(f"Tasa AFP {nombre} fuera de rango ({tasa})")
+    for nombre in ("tasa_salud", "tasa_cesant", "porcentaje_gratificacion"):
+        if not 0 <= getattr(p, nombre) < 1:
+            problemas.append(f"{nombre} fuera de rango ({getattr(p, nombre)})")
+
+    # Tramos: ordenados, contiguos, desde $0 hasta infinito
+    if not p.tramos:
+        problemas.append("Sin tramos de impuesto")
+    else:
+        if p.tramos[0]['desde'] != 0:
+            problemas.append(f"El primer tramo debe partir en 0 (parte en {p.tramos[0]['desde']})")
+        if p.tramos[-1]['hasta'] != float('inf'):
+            problemas.append("El último tramo debe ser abierto (hasta infinito)")
+        for i, t in enumerate(p.tramos, start=1):
+            if t['hasta'] <= t['desde']:
+                problemas.append(f"Tramo {i}: 'hasta' ({t['hasta']}) no supera a 'desde' ({t['desde']})")
+            if not 0 <= t['tasa'] < 1:
+                problemas.append(f"Tramo {i}: tasa fuera de rango ({t['tasa']})")
+            if t['rebaja'] < 0:
+                problemas.append(f"Tramo {i}: rebaja negativa ({t['rebaja']})")
+        for i, (anterior, siguiente) in enumerate(zip(p.tramos, p.tramos[1:]), start=1):
+            salto = siguiente['desde'] - anterior['hasta']
+            if not 0 <= salto <= HOLGURA_TRAMOS:
+                problemas.append(f"Tramos {i} y {i + 1} no son contiguos "
+                                 f"({anterior['hasta']} → {siguiente['desde']})")
+            if siguiente['tasa'] < anterior['tasa']:
+                problemas.append(f"Tramo {i + 1}: la tasa baja respecto al tramo anterior")
+
+    if problemas:
+        raise ValueError("Parámetros inválidos: " + "; ".join(problemas))
+    return p
+
+
+def _desde_valores_por_defecto() -> ParametrosEconomicos:
+    """Snapshot inicial (versión 0) con los valores de fábrica de DATA.data"""
+    return ParametrosEconomicos(
+        version=0,
+        valor_uf=data.VALOR_UF_ACTUAL,
+        sueldo_minimo=data.SUELDO_MINIMO,
+        tope_imponible_afp_salud=data.TOPE_IMPONIBLE_AFP_SALUD,
+        tope_imponible_cesantia=data.TOPE_IMPONIBLE_CESANTIA,
+        default_plan_isapre_uf=data.DEFAULT_PLAN_ISAPRE_UF,
+        tasas_afp=data.TASAS_AFP,
+        tramos=data.tramos_default,
+        tasa_salud=data.parametros_default['tasa_salud'],
+        tasa_cesant=data.parametros_default['tasa_cesant'],
+        factor_gratificacion=data.parametros_default['factor_gratificacion'],
+        porcentaje_gratificacion=data.parametros_default['porcentaje_gratificacion'],
+    )
+
+
+_lock_publicacion = threading.Lock()
+_actual = _desde_valores_por_defecto()
+_suscriptores = []
+
+
+def obtener_actual() -> ParametrosEconomicos:
+    """Snapshot vigente. Tomar la referencia una vez y usarla durante todo el cálculo."""
+    return _actual
+
+
+def suscribir(callback):
+    """Registra callback(nuevo_snapshot), llamado cada vez que se publica una versión nueva"""
+    if callback not in _suscriptores:
+        _suscriptores.append(callback)
+
+
+def desuscribir(callback):
+    if callback in _suscriptores:
+        _suscriptores.remove(callback)
+
+
+def publicar(nuevo: ParametrosEconomicos) -> ParametrosEconomicos:
+    """
+    Publica un snapshot con intercambio atómico y lo refleja en las globales de DATA.data.
+    Si el contenido no cambió (mismo hash) se conserva el snapshot vigente y su versión.
+    """
+    global _actual
+    with _lock_publicacion:
+        if nuevo.hash == _actual.hash:
+            return _actual
+        if nuevo.version <= _actual.version:
+            nuevo = nuevo.reemplazar({}, version=_actual.version + 1)
+        _actual = nuevo
+        _reflejar_en_globales(nuevo)
+
+    # Avisar fuera del lock (un suscriptor lento no bloquea otras publicaciones)
+    for callback in list(_suscriptores):
+        try:
+            callback(nuevo)
+        except Exception as e:
+            print(f"⚠️ Error en suscriptor de parámetros: {e}")
+    return nuevo
+
+
+def _reflejar_en_globales(p: ParametrosEconomicos):
+    """Mantiene DATA.data sincronizado para el código que aún lee las globales (UI, services)"""
+    data.VALOR_UF_ACTUAL = p.valor_uf
+    data.SUELDO_MINIMO = p.sueldo_minimo
+    data.TOPE_IMPONIBLE_AFP_SALUD = p.tope_imponible_afp_salud
+    data.TOPE_IMPONIBLE_CESANTIA = p.tope_imponible_cesantia
+    data.DEFAULT_PLAN_ISAPRE_UF = p.default_plan_isapre_uf
+    data.TASAS_AFP = dict(p.tasas_afp)
+    data.tramos_default = [dict(t) for t in p.tramos]
+    data.parametros_default = {
+        **data.parametros_default,
+        "ingreso_minimo": p.sueldo_minimo,
+        "valor_uf": p.valor_uf,
+        "tope_imponible_uf": p.tope_imponible_afp_salud,
+        "tope_cesantia_uf": p.tope_imponible_cesantia,
+        "tasa_afp": p.tasas_afp.get('Uno', 0.1049),
+        "tasa_salud": p.tasa_salud,
+        "tasa_cesant": p.tasa_cesant,
+    }
@@ -0,0 +1,131 @@
+# SERVICE/cache.py
+"""
+    Caché de resultados (LRU + TTL) delante del motor de cálculo.
+
+    La clave es un hash canónico del diccionario `datos` normalizado (de los bonos
+    sólo cuentan los totales imponible / no imponible, igual que en el motor, y del
+    monto sólo el que lee el modo) más el hash del snapshot de parámetros usado
+    (el vigente, o el histórico si los datos traen 'periodo').
+    Al publicarse parámetros nuevos el caché se vacía automáticamente.
+"""
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from DATA import parametros
+from SERVICE import engine, resultados
+
+MAX_ENTRADAS_DEFAULT = 1024
+TTL_SEGUNDOS_DEFAULT = 8 * 60 * 60  # Una jornada de trabajo
+
+
+def clave_canonica(datos: dict, modo: str, hash_parametros: str) -> str:
+    """
+    Hash estable del escenario: sólo los campos que afectan el cálculo, normalizados.
+    Del monto se usa sólo el que lee el modo (un valor sobrante del otro modo no separa entradas).
+    """
+    sistema = datos.get('salud_sistema', 'fonasa')
+    bonos_imponibles, bonos_no_imponibles = engine.totales_bonos(datos)
+    principal = "sueldo_base" if modo == "base_a_liquido" else "sueldo_liquido"
+    normalizado = {
+        "modo": modo,
+        "parametros": hash_parametros,
+        principal: float(datos.get(principal, 0)),
+        "movilizacion": float(datos.get('movilizacion', 0)),
+        "afp_nombre": datos.get('afp_nombre', 'Uno'),
+        "salud_sistema": sistema,
+        "salud_uf": float(datos.get('salud_uf', 0)) if sistema != 'fonasa' else 0.0,
+        "bonos_imponibles": round(float(bonos_imponibles), 2),
+        "bonos_no_imponibles": round(float(bonos_no_imponibles), 2)
+    }
+    contenido = json.dumps(normalizado, sort_keys=True)
+    return hashlib.sha256(contenido.encode('utf-8')).hexdigest()
+
+
+class CacheResultados:
+    """LRU acotado con expiración por tiempo y contadores de aciertos/fallos/expulsiones"""
+
+    def __init__(self, max_entradas: int = MAX_ENTRADAS_DEFAULT, ttl_segundos: float = TTL_SEGUNDOS_DEFAULT):
+        self.max_entradas = max_entradas
+        self.ttl_segundos = ttl_segundos
+        self._entradas = OrderedDict()  # clave -> (instante_guardado, resultado)
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+        self.expulsiones = 0
+        self.expiraciones = 0
+
+    def obtener(self, clave: str):
+        """Retorna el resultado guardado (inmutable, se comparte sin copiar), o None si no existe o expiró"""
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is None:
+                self.fallos += 1
+                return None
+            instante, resultado = entrada
+            if time.monotonic() - instante > self.ttl_segundos:
+                del self._entradas[clave]
+                self.expiraciones += 1
+                self.fallos += 1
+                return None
+            self._entradas.move_to_end(clave)
+            self.aciertos += 1
+            return resultado
+
+    def guardar(self, clave: str, resultado):
+        with self._lock:
+            self._entradas[clave] = (time.monotonic(), resultado)
+            self._entradas.move_to_end(clave)
+            while len(self._entradas) > self.max_entradas:
+                self._entradas.popitem(last=False)
+                self.expulsiones += 1
+
+    def limpiar(self, *_):
+        """Vacía el caché (se usa como suscriptor de parámetros nuevos)"""
+        with self._lock:
+            self._entradas.clear()
+
+    def estadisticas(self) -> dict:
+        with self._lock:
+            consultas = self.aciertos + self.fallos
+            return {
+                "entradas": len(self._entradas),
+                "max_entradas": self.max_entradas,
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "expulsiones": self.expulsiones,
+                "expiraciones": self.expiraciones,
+                "tasa_aciertos": (self.aciertos / consultas) if consultas else 0.0
+            }
+
+
+# Instancia compartida del proceso, invalidada al cargar parámetros nuevos
+cache_resultados = CacheResultados()
+parametros.suscribir(cache_resultados.limpiar)
+
+
+def _calcular_con_cache(datos: dict, modo: str, funcion):
+    params = engine.parametros_de(datos)
+    clave = clave_canonica(datos, modo, params.hash)
+
+    resultado = cache_resultados.obtener(clave)
+    if resultado is None:
+        resultado = funcion(datos, params=params)
+        cache_resultados.guardar(clave, resultado)
+    return resultado
+
+
+def calcular_liquido_desde_base(datos: dict) -> resultados.ResultadoLiquido:
+    """engine.calcular_liquido_desde_base con memoización"""
+    return _calcular_con_cache(datos, "base_a_liquido", engine.calcular_liquido_desde_base)
+
+
+def resolver_sueldo_base(datos: dict) -> resultados.ResultadoBase:
+    """engine.resolver_sueldo_base con memoización"""
+    return _calcular_con_cache(datos, "liquido_a_base", engine.resolver_sueldo_base)
+
+
+def estadisticas() -> dict:
+    """Contadores del caché compartido"""
+    return cache_resultados.estadisticas()
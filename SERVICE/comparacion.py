@@ -0,0 +1,105 @@
+# SERVICE/comparacion.py
+"""
+    Comparación de escenarios: un mismo sueldo evaluado en todas las AFP y en
+    varias opciones de salud (Fonasa, Isapre con distintos planes), en UNA sola
+    llamada al motor vectorizado.
+
+        comp = comparar({"sueldo_liquido": 1_200_000, ...}, "liquido_a_base",
+                        opciones_salud=[("fonasa", 0), ("isapre", 4.0)])
+        comp.filas()   # una fila por AFP × opción de salud, con el resultado completo
+"""
+import numpy as np
+from SERVICE import engine, lote, resultados
+
+
+def opciones_salud_default(datos: dict, params) -> list:
+    """Fonasa, el plan Isapre de referencia y, si el formulario trae otro plan, también ése"""
+    opciones = [("fonasa", 0.0), ("isapre", float(params.default_plan_isapre_uf))]
+    plan = float(datos.get('salud_uf', 0) or 0)
+    if datos.get('salud_sistema') == 'isapre' and plan > 0 and plan != params.default_plan_isapre_uf:
+        opciones.append(("isapre", plan))
+    return opciones
+
+
+def etiqueta_salud(sistema: str, uf: float) -> str:
+    return "Fonasa" if sistema == 'fonasa' else f"Isapre {uf:g} UF"
+
+
+class Comparacion:
+    """Resultado de comparar: las combinaciones evaluadas y sus resultados en formato columnar"""
+    __slots__ = ("modo", "afps", "sistemas", "planes_uf", "resultados")
+
+    def __init__(self, modo: str, afps: list, sistemas: list, planes_uf: list,
+                 conjunto: resultados.ConjuntoResultados):
+        object.__setattr__(self, "modo", modo)
+        object.__setattr__(self, "afps", tuple(afps))
+        object.__setattr__(self, "sistemas", tuple(sistemas))
+        object.__setattr__(self, "planes_uf", tuple(planes_uf))
+        object.__setattr__(self, "resultados", conjunto)
+
+    def __setattr__(self, nombre, valor):
+        raise AttributeError("Comparacion es inmutable")
+
+    def __len__(self):
+        return len(self.afps)
+
+    def filas(self) -> list:
+        """Una fila (dict) por combinación: AFP, salud y todos los campos del resultado"""
+        return [
+            {"afp_nombre": afp, "salud_sistema": sistema, "salud_uf": uf,
+             "salud": etiqueta_salud(sistema, uf), **fila}
+            for afp, sistema, uf, fila in zip(self.afps, self.sistemas, self.planes_uf,
+                                              self.resultados.a_dicts())
+        ]
+
+    def mejor(self) -> int:
+        """Índice de la combinación más conveniente: mayor líquido, o menor base para el mismo líquido"""
+        if self.modo == "base_a_liquido":
+            return int(np.argmax(self.resultados['sueldo_liquido']))
+        return int(np.argmin(self.resultados['sueldo_base']))
+
+    def indice(self, afp: str, sistema: str, uf: float):
+        """Posición de una combinación (p.ej. la elegida en el formulario), o None"""
+        for i, combinacion in enumerate(zip(self.afps, self.sistemas, self.planes_uf)):
+            if combinacion == (afp, sistema, (uf if sistema != 'fonasa' else 0.0)):
+                return i
+        return None
+
+
+def comparar(datos: dict, modo: str, opciones_salud: list = None, afps: list = None,
+             params=None) -> Comparacion:
+    """
+    Evalúa `datos` (formato del formulario) en cada AFP × opción de salud con una sola
+    llamada vectorizada. El resto de los datos (monto, bonos, movilización, período) es
+    común a todas las combinaciones.
+
+    opciones_salud: lista de (sistema, plan_uf); por defecto opciones_salud_default
+    afps:           nombres de AFP; por defecto todas las del snapshot
+    """
+    if modo not in resultados.TIPOS_POR_MODO:
+        raise ValueError(f"Modo desconocido: {modo}")
+    if params is None:
+        params = engine.parametros_de(datos)
+    if afps is None:
+        afps = sorted(params.tasas_afp)
+    if opciones_salud is None:
+        opciones_salud = opciones_salud_default(datos, params)
+
+    combinaciones = [(afp, sistema, float(uf) if sistema != 'fonasa' else 0.0)
+                     for afp in afps for sistema, uf in opciones_salud]
+    columna_afp = [afp for afp, _, _ in combinaciones]
+    columna_sistema = np.array([sistema for _, sistema, _ in combinaciones])
+    columna_uf = np.array([uf for _, _, uf in combinaciones], dtype=float)
+
+    bonos_imponibles, bonos_no_imponibles = engine.totales_bonos(datos)
+    escenario = (bonos_imponibles, bonos_no_imponibles, datos.get('movilizacion', 0),
+                 lote.tasas_afp_desde_nombres(columna_afp, params), columna_sistema, columna_uf)
+    if modo == "base_a_liquido":
+        montos = np.full(len(combinaciones), float(datos.get('sueldo_base', 0)))
+        columnas = lote.calcular_liquido_desde_base_lote(montos, *escenario, params=params)
+    else:
+        montos = np.full(len(combinaciones), float(datos.get('sueldo_liquido', 0)))
+        columnas = lote.resolver_sueldo_base_lote(montos, *escenario, params=params)
+
+    return Comparacion(modo, columna_afp, columna_sistema.tolist(), columna_uf.tolist(),
+                       resultados.ConjuntoResultados(modo, columnas, compactar=False))
@@ -0,0 +1,102 @@
+# SERVICE/curvas.py
+"""
+    Curvas de sueldo para tablas de bandas y gráficos.
+
+    Barre un rango de montos (p.ej. desde el sueldo mínimo hasta varios millones,
+    de $1.000 en $1.000) para cada combinación de AFP y sistema de salud, y lo
+    calcula en UNA sola llamada al motor vectorizado:
+
+        curva_liquido  →  líquido(base)    para cada base del rango
+        curva_base     →  base(líquido)    para cada líquido del rango
+
+    Retorna un DataFrame (una fila por monto × AFP × salud) listo para exportar a CSV.
+"""
+import numpy as np
+import pandas as pd
+from DATA import parametros
+from SERVICE import lote, nomina
+
+PASO_DEFAULT = 1000
+
+
+def montos_del_rango(desde: float, hasta: float, paso: float = PASO_DEFAULT) -> np.ndarray:
+    """Montos desde `desde` hasta `hasta` (incluido si cae en el paso)"""
+    if paso <= 0:
+        raise ValueError("El paso debe ser mayor a 0")
+    if hasta < desde:
+        raise ValueError("'hasta' debe ser mayor o igual a 'desde'")
+    return np.arange(desde, hasta + paso / 2, paso, dtype=float)
+
+
+def barrer(modo: str, desde: float = None, hasta: float = 5_000_000, paso: float = PASO_DEFAULT,
+           afps=None, sistemas=("fonasa", "isapre"), salud_uf: float = None,
+           movilizacion: float = 0, bonos_imponibles: float = 0, bonos_no_imponibles: float = 0,
+           params: parametros.ParametrosEconomicos = None) -> pd.DataFrame:
+    """
+    Calcula la curva completa (montos × AFP × sistema de salud) en una sola pasada vectorizada.
+
+    modo:      "base_a_liquido" (el rango son sueldos base) o "liquido_a_base" (son líquidos)
+    desde:     por defecto, el sueldo mínimo vigente
+    afps:      nombres de AFP; por defecto todas las del snapshot
+    salud_uf:  plan Isapre en UF; por defecto el plan de referencia del snapshot
+    """
+    if modo not in nomina.MODOS:
+        raise ValueError(f"Modo desconocido: {modo}")
+    if params is None:
+        params = parametros.obtener_actual()
+    if desde is None:
+        desde = params.sueldo_minimo
+    if afps is None:
+        afps = sorted(params.tasas_afp)
+    if salud_uf is None:
+        salud_uf = params.default_plan_isapre_uf
+
+    montos = montos_del_rango(desde, hasta, paso)
+    combinaciones = [(afp, sistema) for afp in afps for sistema in sistemas]
+
+    # Grilla plana: cada combinación repite el rango completo de montos
+    columna_montos = np.tile(montos, len(combinaciones))
+    columna_afp = np.repeat([afp for afp, _ in combinaciones], len(montos)).astype(object)
+    columna_sistema = np.repeat([sistema for _, sistema in combinaciones], len(montos))
+    columna_uf = np.where(columna_sistema == 'fonasa', 0.0, float(salud_uf))
+
+    escenario = (bonos_imponibles, bonos_no_imponibles, movilizacion,
+                 lote.tasas_afp_desde_nombres(columna_afp, params), columna_sistema, columna_uf)
+    if modo == "base_a_liquido":
+        columnas = lote.calcular_liquido_desde_base_lote(columna_montos, *escenario, params=params)
+    else:
+        columnas = lote.resolver_sueldo_base_lote(columna_montos, *escenario, params=params)
+
+    tabla = pd.DataFrame({"afp_nombre": columna_afp, "salud_sistema": columna_sistema, "salud_uf": columna_uf})
+    if modo == "liquido_a_base":
+        # El líquido real difiere del objetivo por el redondeo a miles de la base
+        tabla["liquido_objetivo"] = columna_montos.astype(np.int64)
+    for nombre in nomina.COLUMNAS_RESULTADO[modo]:
+        tabla[nombre] = columnas[nombre]
+    return tabla
+
+
+def curva_liquido(desde: float = None, hasta: float = 5_000_000, paso: float = PASO_DEFAULT, **opciones) -> pd.DataFrame:
+    """Líquido(base): cada monto del rango es un sueldo base"""
+    return barrer("base_a_liquido", desde, hasta, paso, **opciones)
+
+
+def curva_base(desde: float = None, hasta: float = 5_000_000, paso: float = PASO_DEFAULT, **opciones) -> pd.DataFrame:
+    """Base(líquido): cada monto del rango es el líquido objetivo (base redondeada a miles)"""
+    return barrer("liquido_a_base", desde, hasta, paso, **opciones)
+
+
+def tabla_bandas(curva: pd.DataFrame, columna: str = "sueldo_liquido") -> pd.DataFrame:
+    """
+    Formato ancho para publicar: una fila por monto del rango y una columna por AFP/salud.
+    `columna` es el valor de cada celda (p.ej. "sueldo_base" para una curva_base).
+    """
+    clave = "liquido_objetivo" if "liquido_objetivo" in curva.columns else "sueldo_base"
+    ancha = curva.assign(combinacion=curva['afp_nombre'] + " / " + curva['salud_sistema'].str.capitalize())
+    return ancha.pivot_table(index=clave, columns="combinacion", values=columna, aggfunc="first", sort=False)
+
+
+def exportar_csv(curva: pd.DataFrame, ruta: str, separador: str = ',', indice: bool = False):
+    """Escribe la curva como CSV (para la tabla de bandas usar indice=True)"""
+    curva.to_csv(ruta, sep=separador, index=indice, encoding='utf-8')
+    print(f"💾 Curva guardada en {ruta} ({len(curva)} filas)")
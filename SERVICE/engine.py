@@ -1,7 +1,16 @@
 # SERVICE/engine.py
-from DATA import data
+from DATA import parametros
+from SERVICE import instrumentacion, resultados
 from typing import List, Dict
 import math
+import time
+
+# Pasos de $1 que se permiten al llevar la base aproximada a la base exacta al peso
+PASOS_AJUSTE_PESO = 16
+
+# Error máximo (pesos de líquido) aceptado en el despeje del modelo lineal antes de usar bisección
+TOLERANCIA_MODELO = 1.0
+
 
 def redondear_a_miles_arriba(valor: float) -> int:
     """
@@ -12,48 +21,160 @@ def redondear_a_miles_arriba(valor: float) -> int:
     return int(math.ceil(valor / 1000) * 1000)
 
 
-def calcular_impuesto_unico(base_tributable: float) -> float:
-    """Calcula el impuesto de segunda categoría según tramos de data.py"""
+def calcular_impuesto_unico(base_tributable: float, tramos: List[Dict] = None) -> float:
+    """Calcula el impuesto de segunda categoría según los tramos del snapshot de parámetros"""
     if base_tributable <= 0:
         return 0.0
     
-    for tramo in data.tramos_default:
+    if tramos is None:
+        tramos = parametros.obtener_actual().tramos
+    
+    for tramo in tramos:
         if tramo['desde'] <= base_tributable <= tramo['hasta']:
             return (base_tributable * tramo['tasa']) - tramo['rebaja']
             
     # Seguridad para tramos infinitos si no se capturó antes
-    ultimo = data.tramos_default[-1]
+    ultimo = tramos[-1]
     if base_tributable > ultimo['desde']:
         return (base_tributable * ultimo['tasa']) - ultimo['rebaja']
          
     return 0.0
 
 
-def simular_liquido(sueldo_base: float, datos: dict) -> tuple:
+class Escenario:
     """
-    Función de simulación forward: dado un sueldo base, calcula el líquido resultante.
-    Retorna (liquido_calculado, diccionario_detalles)
+    Escenario compilado: todo lo que NO depende del sueldo base, calculado una sola vez
+    (sumas de bonos, tasas, topes en pesos, tope de gratificación y costo Isapre).
+    Es inmutable; evaluar(base) es el núcleo que comparten todas las funciones del motor.
     """
-    # Desempaquetar datos
-    lista_bonos: List[Dict] = datos.get('bonos', [])
-    movilizacion = datos.get('movilizacion', 0)
-    
-    # Sumas de bonos
-    bonos_imponibles = sum(b['monto'] for b in lista_bonos if b['imponible'])
-    bonos_no_imponibles = sum(b['monto'] for b in lista_bonos if not b['imponible'])
+    __slots__ = (
+        "movilizacion", "bonos_imponibles", "bonos_no_imponibles",
+        "tasa_afp", "tasa_fonasa", "tasa_cesantia",
+        "tope_pesos_afp_salud", "tope_pesos_cesantia", "tope_grat", "porcentaje_grat",
+        "usar_fonasa", "costo_plan_isapre", "tramos", "version_parametros", "hash_parametros"
+    )
+
+    def __init__(self, **valores):
+        for campo in self.__slots__:
+            object.__setattr__(self, campo, valores[campo])
+
+    def __setattr__(self, nombre, valor):
+        raise AttributeError("Escenario es inmutable")
+
+    def __delattr__(self, nombre):
+        raise AttributeError("Escenario es inmutable")
+
+    def _calcular(self, sueldo_base: float) -> tuple:
+        """
+        Núcleo único de la liquidación (lo comparten liquido y evaluar).
+        Retorna (liquido, gratificacion, imponible, afp, salud, cesantia, impuesto,
+        total_haberes, total_descuentos, base_tributable)
+        """
+        # A. Gratificación
+        gratificacion = min(sueldo_base * self.porcentaje_grat, self.tope_grat)
+        
+        # B. Total Imponible (Base + Grat + Bonos)
+        imponible = sueldo_base + gratificacion + self.bonos_imponibles
+        
+        # C. Aplicar Topes Legales Diferenciados 
+        imp_afecto_afp_salud = min(imponible, self.tope_pesos_afp_salud)
+        imp_afecto_cesantia = min(imponible, self.tope_pesos_cesantia)
+        
+        # D. Cálculos Previsionales
+        val_afp = imp_afecto_afp_salud * self.tasa_afp
+        val_cesantia = imp_afecto_cesantia * self.tasa_cesantia
+        
+        val_salud = imp_afecto_afp_salud * self.tasa_fonasa
+        if not self.usar_fonasa:
+            val_salud = max(val_salud, self.costo_plan_isapre)
+            
+        # E. Impuesto
+        base_trib = imponible - val_afp - val_salud - val_cesantia
+        val_impuesto = calcular_impuesto_unico(base_trib, self.tramos)
+        
+        # F. Líquido
+        tot_haberes = imponible + self.movilizacion + self.bonos_no_imponibles
+        tot_descuentos = val_afp + val_salud + val_cesantia + val_impuesto
+        
+        liquido = tot_haberes - tot_descuentos
+        return (liquido, gratificacion, imponible, val_afp, val_salud, val_cesantia, val_impuesto,
+                tot_haberes, tot_descuentos, base_trib)
+
+    def liquido(self, sueldo_base: float) -> float:
+        """Sólo el líquido (sin armar el diccionario de detalles), para búsquedas"""
+        return self._calcular(sueldo_base)[0]
+
+    def evaluar(self, sueldo_base: float) -> tuple:
+        """
+        Dado un sueldo base, calcula el líquido resultante.
+        Retorna (liquido_calculado, diccionario_detalles)
+        """
+        (liquido, gratificacion, imponible, val_afp, val_salud, val_cesantia, val_impuesto,
+         tot_haberes, tot_descuentos, base_trib) = self._calcular(sueldo_base)
+        
+        detalles = {
+            "grat": gratificacion,
+            "imp": imponible,
+            "afp": val_afp,
+            "salud": val_salud,
+            "ces": val_cesantia,
+            "tax": val_impuesto,
+            "hab": tot_haberes,
+            "desc": tot_descuentos,
+            "base_trib": base_trib,
+            "bonos_imp": self.bonos_imponibles,
+            "bonos_no_imp": self.bonos_no_imponibles
+        }
+        
+        return liquido, detalles
+
+
+def totales_bonos(datos) -> tuple:
+    """
+    (bonos imponibles, bonos no imponibles). Si `datos` trae los totales precalculados
+    ('bonos_imponibles' / 'bonos_no_imponibles', p.ej. desde la UI) se usan tal cual;
+    si no, se suma la lista 'bonos' en una sola pasada.
+    """
+    if 'bonos_imponibles' in datos or 'bonos_no_imponibles' in datos:
+        return datos.get('bonos_imponibles', 0), datos.get('bonos_no_imponibles', 0)
+    imponibles = no_imponibles = 0
+    for b in datos.get('bonos', []):
+        if b['imponible']:
+            imponibles += b['monto']
+        else:
+            no_imponibles += b['monto']
+    return imponibles, no_imponibles
+
+
+def parametros_de(datos) -> parametros.ParametrosEconomicos:
+    """
+    Snapshot para un cálculo: si `datos` trae 'periodo' ("AAAA-MM" o fecha) se usan los
+    parámetros históricos de ese período (DATA/historico.py); si no, los vigentes.
+    """
+    periodo = datos.get('periodo')
+    if not periodo:
+        return parametros.obtener_actual()
+    from DATA import historico
+    return historico.parametros_en(periodo)
+
+
+def compilar_escenario(datos, params: parametros.ParametrosEconomicos = None) -> Escenario:
+    """
+    Precalcula una vez todo lo independiente del sueldo base. Acepta un Escenario ya compilado.
+    `params` permite fijar un snapshot de parámetros; por defecto el del 'periodo' de los
+    datos o, si no trae, el vigente.
+    """
+    if isinstance(datos, Escenario):
+        return datos
     
-    # Parámetros económicos desde DATA
-    uf = data.VALOR_UF_ACTUAL
-    ingreso_minimo = data.SUELDO_MINIMO
+    if params is None:
+        params = parametros_de(datos)
     
-    # Topes en Pesos
-    tope_pesos_afp_salud = data.TOPE_IMPONIBLE_AFP_SALUD * uf
-    tope_pesos_cesantia = data.TOPE_IMPONIBLE_CESANTIA * uf
+    # Desempaquetar datos
+    bonos_imponibles, bonos_no_imponibles = totales_bonos(datos)
     
-    # Tasas
-    tasa_afp = data.TASAS_AFP.get(datos.get('afp_nombre', 'Uno'), 0.1049)
-    tasa_fonasa = data.parametros_default['tasa_salud']
-    tasa_cesantia = data.parametros_default['tasa_cesant']
+    # Parámetros económicos desde el snapshot
+    uf = params.valor_uf
     
     # Configuración Salud
     usar_fonasa = (datos.get('salud_sistema', 'fonasa') == 'fonasa')
@@ -61,117 +182,95 @@ def simular_liquido(sueldo_base: float, datos: dict) -> tuple:
     if not usar_fonasa:
         costo_plan_isapre = datos.get('salud_uf', 0) * uf
     
-    # A. Gratificación
-    tope_grat = (4.75 * ingreso_minimo) / 12
-    gratificacion = min(sueldo_base * 0.25, tope_grat)
-    
-    # B. Total Imponible (Base + Grat + Bonos)
-    imponible = sueldo_base + gratificacion + bonos_imponibles
-    
-    # C. Aplicar Topes Legales Diferenciados 
-    imp_afecto_afp_salud = min(imponible, tope_pesos_afp_salud)
-    imp_afecto_cesantia = min(imponible, tope_pesos_cesantia)
-    
-    # D. Cálculos Previsionales
-    val_afp = imp_afecto_afp_salud * tasa_afp
-    val_cesantia = imp_afecto_cesantia * tasa_cesantia
-    
-    val_salud = 0
-    if usar_fonasa:
-        val_salud = imp_afecto_afp_salud * tasa_fonasa
-    else:
-        siete_porciento = imp_afecto_afp_salud * tasa_fonasa
-        val_salud = max(siete_porciento, costo_plan_isapre)
-        
-    # E. Impuesto
-    base_trib = imponible - val_afp - val_salud - val_cesantia
-    val_impuesto = calcular_impuesto_unico(base_trib)
-    
-    # F. Líquido
-    tot_haberes = imponible + movilizacion + bonos_no_imponibles
-    tot_descuentos = val_afp + val_salud + val_cesantia + val_impuesto
-    
-    liquido = tot_haberes - tot_descuentos
-    
-    detalles = {
-        "grat": gratificacion,
-        "imp": imponible,
-        "afp": val_afp,
-        "salud": val_salud,
-        "ces": val_cesantia,
-        "tax": val_impuesto,
-        "hab": tot_haberes,
-        "desc": tot_descuentos,
-        "base_trib": base_trib,
-        "bonos_imp": bonos_imponibles,
-        "bonos_no_imp": bonos_no_imponibles
-    }
-    
-    return liquido, detalles
+    return Escenario(
+        movilizacion=datos.get('movilizacion', 0),
+        bonos_imponibles=bonos_imponibles,
+        bonos_no_imponibles=bonos_no_imponibles,
+        tasa_afp=params.tasas_afp.get(datos.get('afp_nombre', 'Uno'), 0.1049),
+        tasa_fonasa=params.tasa_salud,
+        tasa_cesantia=params.tasa_cesant,
+        tope_pesos_afp_salud=params.tope_imponible_afp_salud * uf,
+        tope_pesos_cesantia=params.tope_imponible_cesantia * uf,
+        tope_grat=(params.factor_gratificacion * params.sueldo_minimo) / 12,
+        porcentaje_grat=params.porcentaje_gratificacion,
+        usar_fonasa=usar_fonasa,
+        costo_plan_isapre=costo_plan_isapre,
+        tramos=params.tramos,
+        version_parametros=params.version,
+        hash_parametros=params.hash
+    )
 
 
-def calcular_liquido_desde_base(datos: dict) -> dict:
+def simular_liquido(sueldo_base: float, datos, params: parametros.ParametrosEconomicos = None) -> tuple:
+    """
+    Función de simulación forward: dado un sueldo base, calcula el líquido resultante.
+    `datos` puede ser el diccionario del formulario o un Escenario ya compilado.
+    Retorna (liquido_calculado, diccionario_detalles)
+    """
+    return compilar_escenario(datos, params).evaluar(sueldo_base)
+
+
+def calcular_liquido_desde_base(datos: dict, params: parametros.ParametrosEconomicos = None) -> resultados.ResultadoLiquido:
     """
     Calcula el sueldo líquido a partir del sueldo base.
     Esta es la función "forward" - Base → Líquido
+    Retorna un resultado inmutable (se lee como diccionario; a_dict() para una copia)
     """
     sueldo_base = datos.get('sueldo_base', 0)
-    movilizacion = datos.get('movilizacion', 0)
-    lista_bonos: List[Dict] = datos.get('bonos', [])
-    
-    bonos_imponibles = sum(b['monto'] for b in lista_bonos if b['imponible'])
-    bonos_no_imponibles = sum(b['monto'] for b in lista_bonos if not b['imponible'])
-    
-    # Usar simular_liquido para el cálculo
-    liquido, d = simular_liquido(sueldo_base, datos)
-    
-    return {
-        "sueldo_base": sueldo_base,
-        "gratificacion": round(d['grat']),
-        "bonos_imponibles": round(bonos_imponibles),
-        "bonos_no_imponibles": round(bonos_no_imponibles),
-        "movilizacion": round(movilizacion),
-        "sueldo_liquido": round(liquido),
-        "imponible": round(d['imp']),
-        "total_haberes": round(d['hab']),
-        "total_descuentos": round(d['desc']),
-        "impuesto": round(d['tax']),
-        "cesantia": round(d['ces']),
-        "cotizacion_salud": round(d['salud']),
-        "cotizacion_previsional": round(d['afp']),
-        "base_tributable": round(d['base_trib'])
-    }
-
-
-def resolver_sueldo_base(datos: dict) -> dict:
-    """
-    Algoritmo de búsqueda binaria con REDONDEO A MILES hacia arriba.
-    Esta es la función "inversa" - Líquido → Base
-    """
-    liquido_objetivo = datos['sueldo_liquido']
-    movilizacion = datos.get('movilizacion', 0)
-    lista_bonos: List[Dict] = datos.get('bonos', [])
+    escenario = compilar_escenario(datos, params)
     
-    bonos_imponibles = sum(b['monto'] for b in lista_bonos if b['imponible'])
-    bonos_no_imponibles = sum(b['monto'] for b in lista_bonos if not b['imponible'])
+    liquido, d = escenario.evaluar(sueldo_base)
+    
+    return resultados.ResultadoLiquido(
+        sueldo_base=sueldo_base,
+        gratificacion=round(d['grat']),
+        bonos_imponibles=round(escenario.bonos_imponibles),
+        bonos_no_imponibles=round(escenario.bonos_no_imponibles),
+        movilizacion=round(escenario.movilizacion),
+        sueldo_liquido=round(liquido),
+        imponible=round(d['imp']),
+        total_haberes=round(d['hab']),
+        total_descuentos=round(d['desc']),
+        impuesto=round(d['tax']),
+        cesantia=round(d['ces']),
+        cotizacion_salud=round(d['salud']),
+        cotizacion_previsional=round(d['afp']),
+        base_tributable=round(d['base_trib'])
+    )
+
+
+def _buscar_base_por_biseccion(liquido_objetivo: float, escenario: Escenario, traza: dict = None) -> float:
+    """
+    Búsqueda binaria clásica sobre el escenario compilado (hasta 100 iteraciones).
+    Si se entrega `traza` (instrumentación activa), se completa con contadores y tiempos por fase.
+    """
+    if traza is not None:
+        inicio = time.perf_counter()
     
     # --- Configuración del Algoritmo de Búsqueda ---
     precision = 1.0
     min_base = 0
     max_base = liquido_objetivo * 3.0
     iteraciones = 0
+    duplicaciones = 0
+    limite_seguridad = False
     
     # Expandir rango si es necesario
-    while simular_liquido(max_base, datos)[0] < liquido_objetivo:
+    while escenario.liquido(max_base) < liquido_objetivo:
         max_base *= 2
+        duplicaciones += 1
         if max_base > 100_000_000:  # Límite de seguridad
+            limite_seguridad = True
             break
 
+    if traza is not None:
+        fin_expansion = time.perf_counter()
+
     # --- Búsqueda Binaria ---
     base_exacta = 0
     while (max_base - min_base) > precision and iteraciones < 100:
         base_exacta = (min_base + max_base) / 2
-        liquido_calc, _ = simular_liquido(base_exacta, datos)
+        liquido_calc = escenario.liquido(base_exacta)
         
         if liquido_calc < liquido_objetivo:
             min_base = base_exacta
@@ -179,31 +278,141 @@ def resolver_sueldo_base(datos: dict) -> dict:
             max_base = base_exacta
         
         iteraciones += 1
+
+    if traza is not None:
+        traza.update(
+            evaluaciones=duplicaciones + (0 if limite_seguridad else 1) + iteraciones,
+            duplicaciones=duplicaciones,
+            iteraciones=iteraciones,
+            tope_iteraciones=(max_base - min_base) > precision,
+            limite_seguridad=limite_seguridad,
+        )
+        traza['tiempos'].update(expansion=fin_expansion - inicio, biseccion=time.perf_counter() - fin_expansion)
+
+    return base_exacta
+
+
+def _base_al_peso(liquido_objetivo: float, escenario: Escenario, base_aproximada: float,
+                  traza: dict = None) -> int:
+    """
+    Base exacta al peso: el entero más cercano a la raíz de liquido(base) = objetivo,
+    decidido con la simulación misma en las medias (base ± 0,5) y no con el método
+    que dio la aproximación. lote.resolver_sueldo_base_lote aplica el mismo paso,
+    así ambos motores redondean a miles desde la misma base exacta.
+    """
+    base = max(int(round(base_aproximada)), 0)
+    evaluaciones = 0
+    for _ in range(PASOS_AJUSTE_PESO):
+        if base > 0:
+            evaluaciones += 1
+            if escenario.liquido(base - 0.5) >= liquido_objetivo:
+                base -= 1
+                continue
+        evaluaciones += 1
+        if escenario.liquido(base + 0.5) < liquido_objetivo:
+            base += 1
+        else:
+            break
+    if traza is not None:
+        traza['evaluaciones'] = traza.get('evaluaciones', 0) + evaluaciones
+    return base
+
+
+def _buscar_base_por_modelo(liquido_objetivo: float, escenario: Escenario, traza: dict = None):
+    """
+    Despeje sobre el modelo lineal por tramos del escenario (compilado una vez por escenario
+    y snapshot en modelo_lineal.modelo_para). Retorna None si el modelo no es invertible o
+    su despeje no se confirma contra la simulación exacta: entonces se usa bisección.
+    """
+    from SERVICE import modelo_lineal
+    if traza is not None:
+        inicio = time.perf_counter()
+    modelo = modelo_lineal.modelo_para(escenario)
+    if traza is not None:
+        fin_modelo = time.perf_counter()
+    if modelo is None:
+        return None
+
+    base_exacta = modelo.base_para_liquido(liquido_objetivo)
+    # Verificación contra la simulación exacta (base 0: los bonos ya cubren el objetivo)
+    if base_exacta > 0 and abs(escenario.liquido(base_exacta) - liquido_objetivo) > TOLERANCIA_MODELO:
+        return None
+
+    if traza is not None:
+        traza.update(evaluaciones=int(base_exacta > 0), nodos=len(modelo.bases))
+        traza['tiempos'].update(modelo=fin_modelo - inicio, despeje=time.perf_counter() - fin_modelo)
+    return base_exacta
+
+
+def resolver_sueldo_base(datos: dict, metodo: str = "lineal",
+                         params: parametros.ParametrosEconomicos = None) -> resultados.ResultadoBase:
+    """
+    Resuelve el sueldo base con REDONDEO A MILES hacia arriba.
+    Esta es la función "inversa" - Líquido → Base
+    Retorna un resultado inmutable (se lee como diccionario; a_dict() para una copia)
+
+    metodo:
+        "lineal"    -> despeje sobre el modelo lineal por tramos, guardado por escenario y
+                       snapshot (por defecto); si el modelo no aplica se usa bisección
+        "biseccion" -> búsqueda binaria
+    Con ambos métodos la base exacta al peso la decide _base_al_peso, así que el resultado
+    no depende del método.
+    """
+    liquido_objetivo = datos['sueldo_liquido']
+    escenario = compilar_escenario(datos, params)
+    
+    # Instrumentación opcional: con ACTIVO = False no se toma ningún tiempo
+    traza = {"metodo": metodo, "tiempos": {}} if instrumentacion.ACTIVO else None
+    
+    base_exacta = None
+    if metodo == "lineal":
+        base_exacta = _buscar_base_por_modelo(liquido_objetivo, escenario, traza)
+    if base_exacta is None:
+        if traza is not None:
+            traza.update(metodo="biseccion", respaldo=metodo != "biseccion")
+        base_exacta = _buscar_base_por_biseccion(liquido_objetivo, escenario, traza)
+    
+    if traza is not None:
+        inicio_recalculo = time.perf_counter()
     
     # --- REDONDEO A MILES HACIA ARRIBA ---
-    sueldo_base_redondeado = redondear_a_miles_arriba(base_exacta)
+    # Desde la base exacta al peso: centavos de ruido sobre un múltiplo de 1000 no suben otros $1000
+    sueldo_base_exacto = _base_al_peso(liquido_objetivo, escenario, base_exacta, traza)
+    sueldo_base_redondeado = redondear_a_miles_arriba(sueldo_base_exacto)
     
     # --- Recalcular con el sueldo redondeado ---
-    liquido_real, d = simular_liquido(sueldo_base_redondeado, datos)
+    liquido_real, d = escenario.evaluar(sueldo_base_redondeado)
+    
+    # Bajo el tope de gratificación el líquido sube más de $1 por peso de base: la base al
+    # peso puede quedar hasta medio peso corta. El líquido pagado nunca es menor al pedido.
+    faltan = round(liquido_real - liquido_objetivo) < 0
+    if faltan:
+        sueldo_base_redondeado += 1000
+        liquido_real, d = escenario.evaluar(sueldo_base_redondeado)
+    
+    if traza is not None:
+        traza['evaluaciones'] = traza.get('evaluaciones', 0) + 1 + faltan
+        traza['tiempos']['recalculo'] = time.perf_counter() - inicio_recalculo
+        instrumentacion.registrar(traza)
     
     # Calcular diferencia (cuánto más recibirá el trabajador por el redondeo)
     diferencia = liquido_real - liquido_objetivo
     
-    return {
-        "sueldo_base": sueldo_base_redondeado,
-        "sueldo_base_exacto": round(base_exacta),
-        "gratificacion": round(d['grat']),
-        "bonos_imponibles": round(bonos_imponibles),
-        "bonos_no_imponibles": round(bonos_no_imponibles),
-        "movilizacion": round(movilizacion),
-        "sueldo_liquido": round(liquido_real),
-        "imponible": round(d['imp']),
-        "total_haberes": round(d['hab']),
-        "total_descuentos": round(d['desc']),
-        "impuesto": round(d['tax']),
-        "cesantia": round(d['ces']),
-        "diferencia": round(diferencia),
-        "cotizacion_salud": round(d['salud']),
-        "cotizacion_previsional": round(d['afp']),
-        "redondeo_aplicado": sueldo_base_redondeado - round(base_exacta)
-    }
+    return resultados.ResultadoBase(
+        sueldo_base=sueldo_base_redondeado,
+        sueldo_base_exacto=sueldo_base_exacto,
+        gratificacion=round(d['grat']),
+        bonos_imponibles=round(escenario.bonos_imponibles),
+        bonos_no_imponibles=round(escenario.bonos_no_imponibles),
+        movilizacion=round(escenario.movilizacion),
+        sueldo_liquido=round(liquido_real),
+        imponible=round(d['imp']),
+        total_haberes=round(d['hab']),
+        total_descuentos=round(d['desc']),
+        impuesto=round(d['tax']),
+        cesantia=round(d['ces']),
+        diferencia=round(diferencia),
+        cotizacion_salud=round(d['salud']),
+        cotizacion_previsional=round(d['afp']),
+        redondeo_aplicado=sueldo_base_redondeado - sueldo_base_exacto
+    )
@@ -0,0 +1,155 @@
+# SERVICE/instrumentacion.py
+"""
+    Instrumentación opcional del motor de cálculo (desactivada por defecto).
+
+    Cuenta, por cada resolución Líquido → Base:
+        evaluaciones del líquido, duplicaciones del rango de búsqueda,
+        iteraciones de bisección, veces que se alcanzó el tope de 100 iteraciones
+        o el límite de seguridad de $100.000.000, y el tiempo de cada fase.
+
+    Con ACTIVO = False el motor sólo revisa esta bandera una vez por resolución.
+    Uso:
+        instrumentacion.activar()
+        ...
+        instrumentacion.estadisticas()          # resumen acumulado (dict)
+        instrumentacion.iniciar_volcado_periodico(60)
+"""
+import json
+import threading
+import time
+
+ACTIVO = False
+
+
+class EstadisticasMotor:
+    """Acumulado de trazas de resolución, agrupado por método (lineal, biseccion, lote)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._hilo = threading.local()  # contador y última traza de cada hilo
+        self.reiniciar()
+
+    def reiniciar(self):
+        with self._lock:
+            self.metodos = {}
+            self.ultima = None
+            self.desde = time.time()
+
+    def registrar(self, traza: dict):
+        with self._lock:
+            m = self.metodos.get(traza['metodo'])
+            if m is None:
+                m = self.metodos[traza['metodo']] = {
+                    "resoluciones": 0, "filas": 0, "evaluaciones": 0, "duplicaciones": 0,
+                    "iteraciones": 0, "max_iteraciones": 0, "tope_iteraciones": 0,
+                    "limite_seguridad": 0, "tiempos": {}
+                }
+            m['resoluciones'] += 1
+            m['filas'] += traza.get('filas', 1)
+            m['evaluaciones'] += traza.get('evaluaciones', 0)
+            m['duplicaciones'] += traza.get('duplicaciones', 0)
+            m['iteraciones'] += traza.get('iteraciones', 0)
+            m['max_iteraciones'] = max(m['max_iteraciones'], traza.get('iteraciones', 0))
+            m['tope_iteraciones'] += traza.get('tope_iteraciones', False)
+            m['limite_seguridad'] += traza.get('limite_seguridad', False)
+            for fase, segundos in traza.get('tiempos', {}).items():
+                m['tiempos'][fase] = m['tiempos'].get(fase, 0.0) + segundos
+            self.ultima = traza
+        self._hilo.contador = getattr(self._hilo, 'contador', 0) + 1
+        self._hilo.ultima = traza
+
+    def ultima_del_hilo(self) -> tuple:
+        """(resoluciones registradas por el hilo actual, su última traza o None)"""
+        return getattr(self._hilo, 'contador', 0), getattr(self._hilo, 'ultima', None)
+
+    def resumen(self) -> dict:
+        with self._lock:
+            metodos = {}
+            for nombre, m in self.metodos.items():
+                n = m['resoluciones']
+                metodos[nombre] = {
+                    **{k: v for k, v in m.items() if k != 'tiempos'},
+                    "evaluaciones_promedio": round(m['evaluaciones'] / n, 2),
+                    "iteraciones_promedio": round(m['iteraciones'] / n, 2),
+                    "tiempos_ms": {fase: round(s * 1000, 3) for fase, s in m['tiempos'].items()},
+                    "tiempo_promedio_us": {fase: round(s / n * 1e6, 2) for fase, s in m['tiempos'].items()},
+                }
+            return {"activo": ACTIVO, "segundos": round(time.time() - self.desde, 1), "metodos": metodos}
+
+
+estadisticas_motor = EstadisticasMotor()
+
+
+def activar():
+    global ACTIVO
+    ACTIVO = True
+
+
+def desactivar():
+    global ACTIVO
+    ACTIVO = False
+
+
+def registrar(traza: dict):
+    """Llamado por el motor al terminar una resolución instrumentada"""
+    estadisticas_motor.registrar(traza)
+
+
+def estadisticas() -> dict:
+    """Resumen acumulado por método desde el último reinicio"""
+    return estadisticas_motor.resumen()
+
+
+def ultima_resolucion() -> dict:
+    """Traza de la resolución más reciente (o None)"""
+    return estadisticas_motor.ultima
+
+
+def ultima_resolucion_del_hilo() -> tuple:
+    """
+    (contador, traza) de las resoluciones del hilo que llama. Otros hilos (p.ej. la vista
+    previa) no lo mueven: si el contador no cambió tras un cálculo, fue un acierto del caché.
+    """
+    return estadisticas_motor.ultima_del_hilo()
+
+
+def reiniciar():
+    estadisticas_motor.reiniciar()
+
+
+def formatear_traza(traza: dict) -> str:
+    """Una línea legible para la consola"""
+    tiempos = ", ".join(f"{fase} {s * 1e6:.0f}µs" for fase, s in traza.get('tiempos', {}).items())
+    avisos = ""
+    if traza.get('tope_iteraciones'):
+        avisos += " ⚠️ tope de iteraciones"
+    if traza.get('limite_seguridad'):
+        avisos += " ⚠️ límite de seguridad"
+    return (f"📊 {traza['metodo']}: {traza.get('evaluaciones', 0)} evaluaciones, "
+            f"{traza.get('duplicaciones', 0)} duplicaciones, {traza.get('iteraciones', 0)} iteraciones "
+            f"({tiempos}){avisos}")
+
+
+def iniciar_volcado_periodico(intervalo_segundos: float = 60.0, archivo: str = None):
+    """
+    Activa la instrumentación y vuelca el resumen cada `intervalo_segundos` en un hilo daemon:
+    una línea JSON por volcado en `archivo`, o un resumen por consola si no se indica.
+    Retorna una función que detiene el volcado.
+    """
+    activar()
+    detener = threading.Event()
+
+    def volcar():
+        while not detener.wait(intervalo_segundos):
+            resumen = estadisticas()
+            if archivo:
+                with open(archivo, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps({"instante": time.time(), **resumen}, ensure_ascii=False) + "\n")
+                continue
+            for nombre, m in resumen['metodos'].items():
+                print(f"📊 [{nombre}] {m['resoluciones']} resoluciones, "
+                      f"{m['evaluaciones_promedio']} evaluaciones y {m['iteraciones_promedio']} iteraciones "
+                      f"promedio, tope {m['tope_iteraciones']}, límite {m['limite_seguridad']}")
+
+    threading.Thread(target=volcar, name="volcado-instrumentacion", daemon=True).start()
+    return detener.set
@@ -0,0 +1,368 @@
+# SERVICE/lote.py
+"""
+    Motor vectorizado (NumPy) para cálculos masivos de nómina.
+
+    Reproduce operación por operación a SERVICE/engine.py, pero sobre arreglos:
+    cada columna (sueldo base, bonos, movilización, tasa AFP, salud) es un
+    arreglo o un escalar que se difunde (broadcast) sobre todas las filas.
+"""
+import time
+import numpy as np
+from DATA import parametros
+from SERVICE import engine, instrumentacion
+
+TASA_AFP_DEFAULT = 0.1049
+
+
+def tasas_afp_desde_nombres(nombres, params: parametros.ParametrosEconomicos = None) -> np.ndarray:
+    """Convierte un arreglo de nombres de AFP a su tasa decimal (0.1049 si no existe)"""
+    if params is None:
+        params = parametros.obtener_actual()
+    nombres = np.asarray(nombres, dtype=object)
+    unicos, inverso = np.unique(nombres, return_inverse=True)
+    tasas = np.array([params.tasas_afp.get(n, TASA_AFP_DEFAULT) for n in unicos], dtype=float)
+    return tasas[inverso].reshape(nombres.shape)
+
+
+class ParametrosPorFila:
+    """
+    Parámetros que cambian de una fila a otra (p.ej. una fila por trabajador y mes en
+    una proyección). Tiene los mismos atributos que ParametrosEconomicos que usa el motor
+    vectorizado, pero como arreglos alineados con las filas; los tramos de cada snapshot
+    quedan en matrices (snapshots × tramos) y el impuesto se calcula fila a fila.
+
+    snapshots: lista de ParametrosEconomicos
+    indice:    para cada fila, la posición de su snapshot en la lista
+    """
+    __slots__ = (
+        "snapshots", "indice", "valor_uf", "sueldo_minimo", "tope_imponible_afp_salud",
+        "tope_imponible_cesantia", "tasa_salud", "tasa_cesant", "factor_gratificacion",
+        "porcentaje_gratificacion", "tramos_desde", "tramos_hasta", "tramos_tasa", "tramos_rebaja",
+        "ultimo_desde"
+    )
+
+    def __init__(self, snapshots: list, indice):
+        self.snapshots = list(snapshots)
+        self.indice = np.asarray(indice, dtype=np.int64)
+        for campo in ("valor_uf", "sueldo_minimo", "tope_imponible_afp_salud", "tope_imponible_cesantia",
+                      "tasa_salud", "tasa_cesant", "factor_gratificacion", "porcentaje_gratificacion"):
+            por_snapshot = np.array([float(getattr(p, campo)) for p in self.snapshots])
+            setattr(self, campo, por_snapshot[self.indice])
+
+        # Tramos rellenados hasta el snapshot con más tramos: 'desde' infinito nunca se alcanza
+        largo = max(len(p.tramos) for p in self.snapshots)
+        def matriz(clave, relleno):
+            return np.array([[t[clave] for t in p.tramos] + [relleno] * (largo - len(p.tramos))
+                             for p in self.snapshots])
+        self.tramos_desde = matriz('desde', np.inf)
+        self.tramos_hasta = matriz('hasta', np.inf)
+        self.tramos_tasa = matriz('tasa', 0.0)
+        self.tramos_rebaja = matriz('rebaja', 0.0)
+        self.ultimo_desde = np.array([p.tramos[-1]['desde'] for p in self.snapshots])
+
+    def tasas_afp(self, nombres) -> np.ndarray:
+        """Tasa de cada fila según su AFP y su snapshot (0.1049 si no existe)"""
+        nombres = np.asarray(nombres, dtype=object)
+        unicos, inverso = np.unique(nombres, return_inverse=True)
+        tabla = np.array([[p.tasas_afp.get(n, TASA_AFP_DEFAULT) for n in unicos] for p in self.snapshots])
+        return tabla[self.indice, inverso.reshape(nombres.shape)]
+
+    def calcular_impuesto(self, base_tributable) -> np.ndarray:
+        """Mismas reglas que calcular_impuesto_lote, con los tramos del snapshot de cada fila"""
+        bt = np.asarray(base_tributable, dtype=float)
+        desde = self.tramos_desde[self.indice]
+        idx = np.clip((desde <= bt[:, None]).sum(axis=1) - 1, 0, desde.shape[1] - 1)
+        filas = np.arange(len(bt))
+        desde_fila = desde[filas, idx]
+        hasta_fila = self.tramos_hasta[self.indice, idx]
+        impuesto = (bt * self.tramos_tasa[self.indice, idx]) - self.tramos_rebaja[self.indice, idx]
+
+        dentro = (desde_fila <= bt) & (bt <= hasta_fila)
+        dentro |= bt > self.ultimo_desde[self.indice]
+        return np.where((bt > 0) & dentro, impuesto, 0.0)
+
+
+def calcular_impuesto_lote(base_tributable, tramos=None) -> np.ndarray:
+    """
+    Impuesto único vectorizado: np.searchsorted sobre los 'desde' de los tramos.
+    Respeta las mismas reglas que calcular_impuesto_unico (incluidos los bordes inclusivos).
+    """
+    bt = np.asarray(base_tributable, dtype=float)
+    if tramos is None:
+        tramos = parametros.obtener_actual().tramos
+    desde = np.array([t['desde'] for t in tramos])
+    hasta = np.array([t['hasta'] for t in tramos])
+    tasa = np.array([t['tasa'] for t in tramos])
+    rebaja = np.array([t['rebaja'] for t in tramos])
+
+    idx = np.clip(np.searchsorted(desde, bt, side='right') - 1, 0, len(tramos) - 1)
+    impuesto = (bt * tasa[idx]) - rebaja[idx]
+
+    dentro = (desde[idx] <= bt) & (bt <= hasta[idx])
+    # Seguridad para tramos infinitos (igual que el motor escalar)
+    dentro |= bt > desde[-1]
+    return np.where((bt > 0) & dentro, impuesto, 0.0)
+
+
+def simular_liquido_lote(sueldo_base, bonos_imponibles=0, bonos_no_imponibles=0,
+                         movilizacion=0, tasa_afp=TASA_AFP_DEFAULT,
+                         salud_sistema='fonasa', salud_uf=0.0,
+                         params: parametros.ParametrosEconomicos = None) -> tuple:
+    """
+    Contraparte vectorizada de simular_liquido.
+    Retorna (liquido, detalles) donde detalles tiene las mismas claves que el motor escalar,
+    cada una como arreglo de NumPy.
+    """
+    sueldo_base = np.asarray(sueldo_base, dtype=float)
+    bonos_imponibles = np.asarray(bonos_imponibles, dtype=float)
+    bonos_no_imponibles = np.asarray(bonos_no_imponibles, dtype=float)
+    movilizacion = np.asarray(movilizacion, dtype=float)
+    tasa_afp = np.asarray(tasa_afp, dtype=float)
+    usar_fonasa = np.asarray(salud_sistema) == 'fonasa'
+    salud_uf = np.asarray(salud_uf, dtype=float)
+
+    # Parámetros económicos desde el snapshot (una sola referencia para todo el lote);
+    # con ParametrosPorFila cada valor es un arreglo y se difunde igual que las columnas
+    if params is None:
+        params = parametros.obtener_actual()
+    uf = params.valor_uf
+    tope_pesos_afp_salud = params.tope_imponible_afp_salud * uf
+    tope_pesos_cesantia = params.tope_imponible_cesantia * uf
+    tasa_fonasa = params.tasa_salud
+    tasa_cesantia = params.tasa_cesant
+
+    costo_plan_isapre = salud_uf * uf
+
+    # A. Gratificación
+    tope_grat = (params.factor_gratificacion * params.sueldo_minimo) / 12
+    gratificacion = np.minimum(sueldo_base * params.porcentaje_gratificacion, tope_grat)
+
+    # B. Total Imponible
+    imponible = sueldo_base + gratificacion + bonos_imponibles
+
+    # C. Topes Legales Diferenciados
+    imp_afecto_afp_salud = np.minimum(imponible, tope_pesos_afp_salud)
+    imp_afecto_cesantia = np.minimum(imponible, tope_pesos_cesantia)
+
+    # D. Cálculos Previsionales
+    val_afp = imp_afecto_afp_salud * tasa_afp
+    val_cesantia = imp_afecto_cesantia * tasa_cesantia
+    siete_porciento = imp_afecto_afp_salud * tasa_fonasa
+    val_salud = np.where(usar_fonasa, siete_porciento, np.maximum(siete_porciento, costo_plan_isapre))
+
+    # E. Impuesto
+    base_trib = imponible - val_afp - val_salud - val_cesantia
+    if isinstance(params, ParametrosPorFila):
+        val_impuesto = params.calcular_impuesto(base_trib)
+    else:
+        val_impuesto = calcular_impuesto_lote(base_trib, params.tramos)
+
+    # F. Líquido
+    tot_haberes = imponible + movilizacion + bonos_no_imponibles
+    tot_descuentos = val_afp + val_salud + val_cesantia + val_impuesto
+
+    liquido = tot_haberes - tot_descuentos
+
+    forma = liquido.shape
+    detalles = {
+        "grat": np.broadcast_to(gratificacion, forma),
+        "imp": imponible,
+        "afp": val_afp,
+        "salud": val_salud,
+        "ces": val_cesantia,
+        "tax": val_impuesto,
+        "hab": tot_haberes,
+        "desc": tot_descuentos,
+        "base_trib": base_trib,
+        "bonos_imp": np.broadcast_to(bonos_imponibles, forma),
+        "bonos_no_imp": np.broadcast_to(bonos_no_imponibles, forma)
+    }
+
+    return liquido, detalles
+
+
+def _redondear(valores, forma) -> np.ndarray:
+    """round() de Python (mitad al par) sobre arreglos, como enteros"""
+    return np.broadcast_to(np.round(valores), forma).astype(np.int64)
+
+
+def calcular_liquido_desde_base_lote(sueldo_base, bonos_imponibles=0, bonos_no_imponibles=0,
+                                     movilizacion=0, tasa_afp=TASA_AFP_DEFAULT,
+                                     salud_sistema='fonasa', salud_uf=0.0,
+                                     params: parametros.ParametrosEconomicos = None) -> dict:
+    """
+    Contraparte vectorizada de calcular_liquido_desde_base (Base → Líquido).
+    Retorna un diccionario de columnas con las mismas claves que el motor escalar.
+    """
+    liquido, d = simular_liquido_lote(sueldo_base, bonos_imponibles, bonos_no_imponibles,
+                                      movilizacion, tasa_afp, salud_sistema, salud_uf, params)
+    forma = liquido.shape
+
+    return {
+        "sueldo_base": _redondear(sueldo_base, forma),
+        "gratificacion": _redondear(d['grat'], forma),
+        "bonos_imponibles": _redondear(d['bonos_imp'], forma),
+        "bonos_no_imponibles": _redondear(d['bonos_no_imp'], forma),
+        "movilizacion": _redondear(movilizacion, forma),
+        "sueldo_liquido": _redondear(liquido, forma),
+        "imponible": _redondear(d['imp'], forma),
+        "total_haberes": _redondear(d['hab'], forma),
+        "total_descuentos": _redondear(d['desc'], forma),
+        "impuesto": _redondear(d['tax'], forma),
+        "cesantia": _redondear(d['ces'], forma),
+        "cotizacion_salud": _redondear(d['salud'], forma),
+        "cotizacion_previsional": _redondear(d['afp'], forma),
+        "base_tributable": _redondear(d['base_trib'], forma)
+    }
+
+
+def redondear_a_miles_arriba_lote(valores) -> np.ndarray:
+    """Versión vectorizada de engine.redondear_a_miles_arriba"""
+    valores = np.asarray(valores, dtype=float)
+    return np.where(valores <= 0, 0, np.ceil(valores / 1000) * 1000).astype(np.int64)
+
+
+def _base_al_peso_lote(objetivo: np.ndarray, base_aproximada: np.ndarray, liquido) -> tuple:
+    """
+    Contraparte vectorizada de engine._base_al_peso: lleva cada base aproximada al entero
+    más cercano a la raíz, decidido con la simulación en las medias (base ± 0,5).
+    Retorna (bases enteras, evaluaciones vectorizadas).
+    """
+    base = np.maximum(np.round(base_aproximada), 0.0)
+    evaluaciones = 0
+    for _ in range(engine.PASOS_AJUSTE_PESO):
+        bajar = (base > 0) & (liquido(base - 0.5) >= objetivo)
+        subir = ~bajar & (liquido(base + 0.5) < objetivo)
+        evaluaciones += 2
+        if not (bajar.any() or subir.any()):
+            break
+        base = base - bajar + subir
+    return base.astype(np.int64), evaluaciones
+
+
+def buscar_base_exacta_lote(sueldo_liquido, bonos_imponibles=0, bonos_no_imponibles=0,
+                            movilizacion=0, tasa_afp=TASA_AFP_DEFAULT,
+                            salud_sistema='fonasa', salud_uf=0.0,
+                            params: parametros.ParametrosEconomicos = None) -> np.ndarray:
+    """
+    Base exacta al peso de cada fila (enteros), la misma que engine.resolver_sueldo_base:
+    bisección en paralelo (lockstep) hasta acotar cada base a < $1, interpolación lineal
+    dentro del intervalo (el líquido es lineal por tramos) y el ajuste al peso que
+    comparte con el motor escalar (engine._base_al_peso).
+    """
+    objetivo = np.asarray(sueldo_liquido, dtype=float)
+    columnas = np.broadcast_arrays(objetivo, np.asarray(bonos_imponibles), np.asarray(bonos_no_imponibles),
+                                   np.asarray(movilizacion), np.asarray(tasa_afp),
+                                   np.asarray(salud_sistema), np.asarray(salud_uf))
+    objetivo = columnas[0]
+    escenario = columnas[1:]
+    if params is None:
+        params = parametros.obtener_actual()
+
+    traza = {"metodo": "lote", "filas": int(objetivo.size), "tiempos": {}} if instrumentacion.ACTIVO else None
+    if traza is not None:
+        inicio = time.perf_counter()
+
+    def liquido(bases):
+        return simular_liquido_lote(bases, *escenario, params=params)[0]
+
+    # --- Configuración del Algoritmo de Búsqueda ---
+    precision = 1.0
+    min_base = np.zeros(objetivo.shape)
+    max_base = np.maximum(objetivo * 3.0, precision)
+    duplicaciones = 0
+
+    # Expandir rango donde haga falta
+    for _ in range(64):
+        cortos = liquido(max_base) < objetivo
+        if not cortos.any():
+            break
+        max_base = np.where(cortos, max_base * 2, max_base)
+        duplicaciones += 1
+
+    if traza is not None:
+        fin_expansion = time.perf_counter()
+
+    # --- Búsqueda Binaria (todas las filas a la vez) ---
+    iteraciones = 0
+    for _ in range(100):
+        activos = (max_base - min_base) > precision
+        if not activos.any():
+            break
+        medio = (min_base + max_base) / 2
+        bajo = liquido(medio) < objetivo
+        min_base = np.where(activos & bajo, medio, min_base)
+        max_base = np.where(activos & ~bajo, medio, max_base)
+        iteraciones += 1
+
+    if traza is not None:
+        fin_biseccion = time.perf_counter()
+
+    # --- Interpolación final dentro del intervalo ---
+    liq_min = liquido(min_base)
+    liq_max = liquido(max_base)
+    delta = liq_max - liq_min
+    with np.errstate(divide='ignore', invalid='ignore'):
+        base_exacta = np.where(delta > 0, min_base + (objetivo - liq_min) * (max_base - min_base) / delta, min_base)
+    base_exacta = np.clip(base_exacta, min_base, max_base)
+
+    # Objetivos alcanzados con base 0 (bonos / movilización ya los cubren)
+    base_exacta = np.where(objetivo <= liquido(np.zeros(objetivo.shape)), 0.0, base_exacta)
+
+    if traza is not None:
+        fin_interpolacion = time.perf_counter()
+
+    # --- Ajuste al peso (el mismo paso que el motor escalar) ---
+    base_exacta, evaluaciones_ajuste = _base_al_peso_lote(objetivo, base_exacta, liquido)
+
+    if traza is not None:
+        # Evaluaciones vectorizadas (cada una cubre todas las filas)
+        traza.update(
+            evaluaciones=min(duplicaciones + 1, 64) + iteraciones + 3 + evaluaciones_ajuste,
+            duplicaciones=duplicaciones,
+            iteraciones=iteraciones,
+            tope_iteraciones=bool(((max_base - min_base) > precision).any()),
+            limite_seguridad=duplicaciones == 64,
+        )
+        traza['tiempos'].update(expansion=fin_expansion - inicio, biseccion=fin_biseccion - fin_expansion,
+                                interpolacion=fin_interpolacion - fin_biseccion,
+                                ajuste=time.perf_counter() - fin_interpolacion)
+        instrumentacion.registrar(traza)
+    return base_exacta
+
+
+def resolver_sueldo_base_lote(sueldo_liquido, bonos_imponibles=0, bonos_no_imponibles=0,
+                              movilizacion=0, tasa_afp=TASA_AFP_DEFAULT,
+                              salud_sistema='fonasa', salud_uf=0.0,
+                              params: parametros.ParametrosEconomicos = None) -> dict:
+    """
+    Contraparte vectorizada de resolver_sueldo_base (Líquido → Base).
+    Aplica el mismo REDONDEO A MILES hacia arriba y retorna columnas con las mismas claves.
+    """
+    objetivo = np.asarray(sueldo_liquido, dtype=float)
+    escenario = (bonos_imponibles, bonos_no_imponibles, movilizacion, tasa_afp, salud_sistema, salud_uf)
+    if params is None:
+        params = parametros.obtener_actual()
+
+    base_exacta = buscar_base_exacta_lote(objetivo, *escenario, params=params)
+    # Igual que el motor escalar: se redondea a miles desde la base exacta al peso
+    sueldo_base_redondeado = redondear_a_miles_arriba_lote(base_exacta)
+
+    # El líquido pagado nunca es menor al pedido (ver engine.resolver_sueldo_base)
+    liquido_real, _ = simular_liquido_lote(sueldo_base_redondeado, *escenario, params=params)
+    faltan = np.round(liquido_real - objetivo) < 0
+    if faltan.any():
+        sueldo_base_redondeado = sueldo_base_redondeado + np.where(faltan, 1000, 0)
+        liquido_real, _ = simular_liquido_lote(sueldo_base_redondeado, *escenario, params=params)
+
+    # --- Recalcular con el sueldo redondeado ---
+    resultado = calcular_liquido_desde_base_lote(sueldo_base_redondeado, *escenario, params=params)
+    forma = resultado['sueldo_liquido'].shape
+    sueldo_base_exacto = np.broadcast_to(base_exacta, forma).astype(np.int64)
+
+    resultado.pop('base_tributable')
+    resultado['sueldo_base'] = np.broadcast_to(sueldo_base_redondeado, forma).astype(np.int64)
+    resultado['sueldo_base_exacto'] = sueldo_base_exacto
+    resultado['diferencia'] = _redondear(liquido_real - objetivo, forma)
+    resultado['redondeo_aplicado'] = resultado['sueldo_base'] - sueldo_base_exacto
+    return resultado
@@ -0,0 +1,184 @@
+# SERVICE/modelo_lineal.py
+"""
+    Compilador del modelo lineal por tramos de la liquidación.
+
+    Para un escenario fijo (AFP, salud, bonos, movilización) el líquido es una
+    función lineal por tramos del sueldo base. Sus quiebres sólo pueden estar en:
+    el tope de gratificación, los topes imponibles (AFP/Salud y Cesantía), el
+    cruce Isapre vs 7% y los bordes de los tramos de impuesto. Entre quiebres
+    basta interpolar, y la inversa (Líquido → Base) es un despeje directo.
+
+    modelo_para(escenario) guarda los modelos compilados por escenario y snapshot:
+    es lo que usa engine.resolver_sueldo_base (metodo="lineal", por defecto).
+"""
+import threading
+from bisect import bisect_right
+from typing import List
+from SERVICE import engine
+
+# Distancia usada para medir la pendiente del último segmento (no tiene más quiebres)
+PASO_PENDIENTE_FINAL = 1_000_000.0
+
+# Una nómina repite pocos escenarios (AFP × salud × bonos): se conservan los más recientes
+MAX_MODELOS = 1024
+_modelos = {}
+_lock_modelos = threading.Lock()  # El servidor resuelve desde varios hilos del executor
+_SIN_MODELO = object()
+
+
+class ModeloLineal:
+    """Líquido(base) como lista ordenada de nodos (base, líquido) + pendiente final"""
+    __slots__ = ("bases", "liquidos", "pendiente_final")
+
+    def __init__(self, bases: List[float], liquidos: List[float], pendiente_final: float):
+        self.bases = bases
+        self.liquidos = liquidos
+        self.pendiente_final = pendiente_final
+
+    def liquido(self, sueldo_base: float) -> float:
+        """Evaluación forward: búsqueda binaria del segmento + interpolación"""
+        i = bisect_right(self.bases, sueldo_base) - 1
+        if i >= len(self.bases) - 1:
+            return self.liquidos[-1] + (sueldo_base - self.bases[-1]) * self.pendiente_final
+        i = max(i, 0)
+        b0, b1 = self.bases[i], self.bases[i + 1]
+        l0, l1 = self.liquidos[i], self.liquidos[i + 1]
+        return l0 + (sueldo_base - b0) * (l1 - l0) / (b1 - b0)
+
+    def pendiente(self, sueldo_base: float) -> float:
+        """Derivada d(líquido)/d(base) en el segmento que contiene a sueldo_base"""
+        i = bisect_right(self.bases, sueldo_base) - 1
+        if i >= len(self.bases) - 1:
+            return self.pendiente_final
+        i = max(i, 0)
+        return (self.liquidos[i + 1] - self.liquidos[i]) / (self.bases[i + 1] - self.bases[i])
+
+    def base_para_liquido(self, liquido_objetivo: float) -> float:
+        """Evaluación inversa: despeje cerrado dentro del segmento que contiene el objetivo"""
+        if liquido_objetivo <= self.liquidos[0]:
+            return self.bases[0]
+        i = bisect_right(self.liquidos, liquido_objetivo) - 1
+        if i >= len(self.liquidos) - 1:
+            return self.bases[-1] + (liquido_objetivo - self.liquidos[-1]) / self.pendiente_final
+        b0, b1 = self.bases[i], self.bases[i + 1]
+        l0, l1 = self.liquidos[i], self.liquidos[i + 1]
+        return b0 + (liquido_objetivo - l0) * (b1 - b0) / (l1 - l0)
+
+
+def _impuesto_continuo(base_tributable: float, tramos: list) -> float:
+    """Impuesto único eligiendo el tramo por su 'desde' (sin los huecos de 1 centavo entre tramos)"""
+    if base_tributable <= 0:
+        return 0.0
+    desdes = [t['desde'] for t in tramos]
+    tramo = tramos[max(bisect_right(desdes, base_tributable) - 1, 0)]
+    return (base_tributable * tramo['tasa']) - tramo['rebaja']
+
+
+def _liquido_nodo(sueldo_base: float, escenario: engine.Escenario) -> float:
+    """Líquido exacto en un nodo, con el impuesto continuo (los nodos caen justo en los bordes de tramo)"""
+    _, d = escenario.evaluar(sueldo_base)
+    return d['hab'] - (d['afp'] + d['salud'] + d['ces'] + _impuesto_continuo(d['base_trib'], escenario.tramos))
+
+
+def _interpolar_cruces(xs: List[float], ys: List[float], pendiente_final: float, objetivos: List[float]) -> List[float]:
+    """Dada una función lineal por tramos creciente (xs, ys), retorna los x donde y = objetivo"""
+    cruces = []
+    for y in objetivos:
+        if y <= ys[0]:
+            continue
+        i = bisect_right(ys, y) - 1
+        if i >= len(ys) - 1:
+            if pendiente_final > 0:
+                cruces.append(xs[-1] + (y - ys[-1]) / pendiente_final)
+            continue
+        x0, x1, y0, y1 = xs[i], xs[i + 1], ys[i], ys[i + 1]
+        if y1 > y0:
+            cruces.append(x0 + (y - y0) * (x1 - x0) / (y1 - y0))
+    return cruces
+
+
+def compilar_modelo(datos, params=None) -> ModeloLineal:
+    """
+    Compila el escenario de `datos` (diccionario o Escenario ya compilado) en un ModeloLineal.
+    Los nodos se evalúan con la simulación exacta, por lo que el modelo coincide con
+    simular_liquido en todo el dominio (salvo los huecos de 1 centavo entre tramos de impuesto).
+    """
+    esc = engine.compilar_escenario(datos, params)
+
+    # Base desde la cual la gratificación queda topada (sin gratificación no hay tope que alcanzar)
+    base_tope_grat = esc.tope_grat / esc.porcentaje_grat if esc.porcentaje_grat > 0 else float('inf')
+
+    def base_para_imponible(imponible: float) -> float:
+        # Inversa de: base + min(base * porcentaje_grat, tope_grat) + bonos_imponibles
+        resto = imponible - esc.bonos_imponibles
+        if resto <= base_tope_grat + esc.tope_grat:
+            return resto / (1 + esc.porcentaje_grat)
+        return resto - esc.tope_grat
+
+    # --- 1. Quiebres estructurales (en el imponible) ---
+    quiebres = {
+        0.0,
+        base_para_imponible(esc.tope_pesos_afp_salud),
+        base_para_imponible(esc.tope_pesos_cesantia),
+    }
+    if esc.porcentaje_grat > 0:
+        quiebres.add(base_tope_grat)
+
+    # Con tasa de salud 0 el plan Isapre siempre es mayor: no hay cruce
+    if not esc.usar_fonasa and esc.tasa_fonasa > 0:
+        imponible_cruce = esc.costo_plan_isapre / esc.tasa_fonasa
+        if imponible_cruce < esc.tope_pesos_afp_salud:
+            quiebres.add(base_para_imponible(imponible_cruce))
+
+    estructurales = sorted(b for b in quiebres if b >= 0)
+
+    # --- 2. Bordes de tramos de impuesto (la base tributable es lineal entre quiebres estructurales) ---
+    tributables = [esc.evaluar(b)[1]['base_trib'] for b in estructurales]
+    b_lejana = estructurales[-1] + PASO_PENDIENTE_FINAL
+    pendiente_trib = (esc.evaluar(b_lejana)[1]['base_trib'] - tributables[-1]) / PASO_PENDIENTE_FINAL
+
+    bordes_impuesto = [0.0] + [t['desde'] for t in esc.tramos]
+    quiebres.update(_interpolar_cruces(estructurales, tributables, pendiente_trib, bordes_impuesto))
+
+    # --- 3. Nodos exactos ---
+    bases = sorted(b for b in quiebres if b >= 0)
+    liquidos = [_liquido_nodo(b, esc) for b in bases]
+
+    b_final = bases[-1] + PASO_PENDIENTE_FINAL
+    pendiente_final = (_liquido_nodo(b_final, esc) - liquidos[-1]) / PASO_PENDIENTE_FINAL
+
+    return ModeloLineal(bases, liquidos, pendiente_final)
+
+
+def _clave_modelo(esc: engine.Escenario) -> tuple:
+    """Todo lo que define el modelo: el snapshot (por hash de contenido) + las entradas del escenario"""
+    return (esc.hash_parametros, esc.bonos_imponibles, esc.bonos_no_imponibles, esc.movilizacion,
+            esc.tasa_afp, esc.usar_fonasa, esc.costo_plan_isapre)
+
+
+def _es_invertible(modelo: ModeloLineal) -> bool:
+    """El despeje sólo vale si el líquido es estrictamente creciente en todos los nodos"""
+    return (modelo.pendiente_final > 0
+            and all(l1 > l0 for l0, l1 in zip(modelo.liquidos, modelo.liquidos[1:])))
+
+
+def modelo_para(escenario: engine.Escenario):
+    """
+    ModeloLineal del escenario (compilado una vez por escenario y snapshot), o None si
+    el modelo no es invertible y conviene la bisección.
+    """
+    clave = _clave_modelo(escenario)
+    with _lock_modelos:
+        modelo = _modelos.get(clave, _SIN_MODELO)
+    if modelo is not _SIN_MODELO:
+        return modelo
+
+    # La compilación no toca estado compartido: se hace fuera del lock
+    nuevo = compilar_modelo(escenario)
+    if not _es_invertible(nuevo):
+        nuevo = None
+    with _lock_modelos:
+        modelo = _modelos.setdefault(clave, nuevo)
+        while len(_modelos) > MAX_MODELOS:
+            del _modelos[next(iter(_modelos))]
+    return modelo
@@ -0,0 +1,296 @@
+# SERVICE/motor_entero.py
+"""
+    Modo de cálculo en aritmética entera (punto fijo), exacto al peso.
+
+    Mismo flujo que SERVICE/engine.py y SERVICE/lote.py, pero sin floats:
+
+        montos             pesos enteros (las entradas se redondean al peso)
+        UF                 centavos  (39.597,67 → 3_959_767)
+        montos en UF       milésimas (87,8 UF → 87_800; plan 2,822 UF → 2_822)
+        tasas y factores   millonésimas (0,1049 → 104_900)
+        tramos             desde / hasta / rebaja en centavos
+
+    Reglas de redondeo (mitad hacia arriba, al peso) por concepto:
+        tope de gratificación, gratificación, topes imponibles en pesos,
+        cotización AFP, cotización salud, plan Isapre, seguro de cesantía,
+        impuesto único (nunca negativo).
+
+    Con enteros la base tributable nunca cae "entre" dos tramos, y el resultado es
+    reproducible bit a bit: dos rutas (escalar o lote, un proceso o varios) dan
+    exactamente los mismos pesos, y los resultados sirven como claves de caché o diff.
+"""
+import threading
+import numpy as np
+from DATA import parametros
+from SERVICE import engine, lote, resultados
+
+ESCALA_UF = 100            # UF en centavos
+ESCALA_MONTO_UF = 1000     # Montos expresados en UF, en milésimas
+ESCALA_TASA = 1_000_000    # Tasas en millonésimas
+ESCALA_TRAMO = 100         # Tramos de impuesto en centavos
+
+# Sobre este monto (pesos) los productos con tasas podrían desbordar int64
+LIMITE_BASE = 10_000_000_000
+
+
+def _dividir_redondeando(numerador, denominador):
+    """División entera con redondeo mitad hacia arriba (sirve para int y arreglos int64)"""
+    return (numerador + denominador // 2) // denominador
+
+
+def _a_entero(valor, escala: int = 1):
+    """Monto (o arreglo) a entero en la escala indicada, redondeando al más cercano"""
+    return np.rint(np.asarray(valor, dtype=float) * escala).astype(np.int64)
+
+
+class ParametrosEnteros:
+    """Snapshot de parámetros convertido una sola vez a punto fijo"""
+    __slots__ = (
+        "uf", "tope_pesos_afp_salud", "tope_pesos_cesantia", "tope_grat", "porcentaje_grat",
+        "tasa_salud", "tasa_cesantia", "tramo_desde", "tramo_tasa", "tramo_rebaja",
+        "hash"
+    )
+
+    def __init__(self, params: parametros.ParametrosEconomicos):
+        self.uf = int(round(params.valor_uf * ESCALA_UF))
+        self.tope_pesos_afp_salud = _dividir_redondeando(
+            int(round(params.tope_imponible_afp_salud * ESCALA_MONTO_UF)) * self.uf, ESCALA_MONTO_UF * ESCALA_UF)
+        self.tope_pesos_cesantia = _dividir_redondeando(
+            int(round(params.tope_imponible_cesantia * ESCALA_MONTO_UF)) * self.uf, ESCALA_MONTO_UF * ESCALA_UF)
+        self.tope_grat = _dividir_redondeando(
+            int(round(params.factor_gratificacion * ESCALA_TASA)) * params.sueldo_minimo, 12 * ESCALA_TASA)
+        self.porcentaje_grat = int(round(params.porcentaje_gratificacion * ESCALA_TASA))
+        self.tasa_salud = int(round(params.tasa_salud * ESCALA_TASA))
+        self.tasa_cesantia = int(round(params.tasa_cesant * ESCALA_TASA))
+
+        # Basta con 'desde': en pesos enteros no existen bases entre un 'hasta' y el 'desde' siguiente
+        self.tramo_desde = np.array([int(round(t['desde'] * ESCALA_TRAMO)) for t in params.tramos], dtype=np.int64)
+        self.tramo_tasa = np.array([int(round(t['tasa'] * ESCALA_TASA)) for t in params.tramos], dtype=np.int64)
+        self.tramo_rebaja = np.array([int(round(t['rebaja'] * ESCALA_TRAMO)) for t in params.tramos], dtype=np.int64)
+        self.hash = params.hash
+
+
+# Con recarga en caliente cada versión publicada agrega una entrada: se conservan
+# sólo las más recientes (la vigente y las que aún usen cálculos en curso)
+MAX_COMPILADOS = 4
+_compilados = {}
+_lock_compilados = threading.Lock()  # El servidor llama desde varios hilos del executor
+
+
+def compilar_parametros(params: parametros.ParametrosEconomicos = None) -> ParametrosEnteros:
+    """ParametrosEnteros del snapshot (se convierte una vez por hash de contenido)"""
+    if params is None:
+        params = parametros.obtener_actual()
+    with _lock_compilados:
+        compilado = _compilados.get(params.hash)
+    if compilado is not None:
+        return compilado
+
+    # La conversión no toca estado compartido: se hace fuera del lock
+    nuevo = ParametrosEnteros(params)
+    with _lock_compilados:
+        compilado = _compilados.setdefault(params.hash, nuevo)
+        while len(_compilados) > MAX_COMPILADOS:
+            del _compilados[next(iter(_compilados))]
+    return compilado
+
+
+def calcular_impuesto_entero(base_tributable, p: ParametrosEnteros) -> np.ndarray:
+    """Impuesto único en pesos enteros (base tributable en pesos enteros)"""
+    bt = np.asarray(base_tributable, dtype=np.int64)
+    bt_centavos = bt * ESCALA_TRAMO
+    idx = np.clip(np.searchsorted(p.tramo_desde, bt_centavos, side='right') - 1, 0, len(p.tramo_desde) - 1)
+
+    # (bt × tasa − rebaja) en centavos × millonésimas, redondeado al peso
+    numerador = bt_centavos * p.tramo_tasa[idx] - p.tramo_rebaja[idx] * ESCALA_TASA
+    impuesto = _dividir_redondeando(numerador, ESCALA_TRAMO * ESCALA_TASA)
+    return np.where(bt > 0, np.maximum(impuesto, 0), 0)
+
+
+def simular_liquido_entero(sueldo_base, bonos_imponibles=0, bonos_no_imponibles=0,
+                           movilizacion=0, tasa_afp=lote.TASA_AFP_DEFAULT,
+                           salud_sistema='fonasa', salud_uf=0.0,
+                           params: parametros.ParametrosEconomicos = None) -> tuple:
+    """
+    Contraparte entera de lote.simular_liquido_lote. `sueldo_base` debe venir en pesos enteros.
+    Retorna (liquido, detalles) con arreglos int64 en pesos.
+    """
+    p = compilar_parametros(params)
+    sueldo_base = np.asarray(sueldo_base, dtype=np.int64)
+    bonos_imponibles = _a_entero(bonos_imponibles)
+    bonos_no_imponibles = _a_entero(bonos_no_imponibles)
+    movilizacion = _a_entero(movilizacion)
+    tasa_afp = _a_entero(tasa_afp, ESCALA_TASA)
+    usar_fonasa = np.asarray(salud_sistema) == 'fonasa'
+    costo_plan_isapre = _dividir_redondeando(_a_entero(salud_uf, ESCALA_MONTO_UF) * p.uf, ESCALA_MONTO_UF * ESCALA_UF)
+
+    # A. Gratificación
+    gratificacion = np.minimum(_dividir_redondeando(sueldo_base * p.porcentaje_grat, ESCALA_TASA), p.tope_grat)
+
+    # B. Total Imponible
+    imponible = sueldo_base + gratificacion + bonos_imponibles
+
+    # C. Topes Legales Diferenciados
+    imp_afecto_afp_salud = np.minimum(imponible, p.tope_pesos_afp_salud)
+    imp_afecto_cesantia = np.minimum(imponible, p.tope_pesos_cesantia)
+
+    # D. Cálculos Previsionales (cada concepto redondeado al peso)
+    val_afp = _dividir_redondeando(imp_afecto_afp_salud * tasa_afp, ESCALA_TASA)
+    val_cesantia = _dividir_redondeando(imp_afecto_cesantia * p.tasa_cesantia, ESCALA_TASA)
+    siete_porciento = _dividir_redondeando(imp_afecto_afp_salud * p.tasa_salud, ESCALA_TASA)
+    val_salud = np.where(usar_fonasa, siete_porciento, np.maximum(siete_porciento, costo_plan_isapre))
+
+    # E. Impuesto
+    base_trib = imponible - val_afp - val_salud - val_cesantia
+    val_impuesto = calcular_impuesto_entero(base_trib, p)
+
+    # F. Líquido
+    tot_haberes = imponible + movilizacion + bonos_no_imponibles
+    tot_descuentos = val_afp + val_salud + val_cesantia + val_impuesto
+
+    liquido = tot_haberes - tot_descuentos
+
+    forma = liquido.shape
+    detalles = {
+        "grat": np.broadcast_to(gratificacion, forma),
+        "imp": imponible,
+        "afp": val_afp,
+        "salud": val_salud,
+        "ces": val_cesantia,
+        "tax": val_impuesto,
+        "hab": tot_haberes,
+        "desc": tot_descuentos,
+        "base_trib": base_trib,
+        "bonos_imp": np.broadcast_to(bonos_imponibles, forma),
+        "bonos_no_imp": np.broadcast_to(bonos_no_imponibles, forma)
+    }
+    return liquido, detalles
+
+
+def calcular_liquido_desde_base_entero(sueldo_base, bonos_imponibles=0, bonos_no_imponibles=0,
+                                       movilizacion=0, tasa_afp=lote.TASA_AFP_DEFAULT,
+                                       salud_sistema='fonasa', salud_uf=0.0,
+                                       params: parametros.ParametrosEconomicos = None) -> dict:
+    """Base → Líquido en aritmética entera. Mismas columnas que lote.calcular_liquido_desde_base_lote."""
+    base = _a_entero(sueldo_base)
+    liquido, d = simular_liquido_entero(base, bonos_imponibles, bonos_no_imponibles, movilizacion,
+                                        tasa_afp, salud_sistema, salud_uf, params)
+    forma = liquido.shape
+    return {
+        "sueldo_base": np.broadcast_to(base, forma).copy(),
+        "gratificacion": d['grat'].copy(),
+        "bonos_imponibles": d['bonos_imp'].copy(),
+        "bonos_no_imponibles": d['bonos_no_imp'].copy(),
+        "movilizacion": np.broadcast_to(_a_entero(movilizacion), forma).copy(),
+        "sueldo_liquido": liquido,
+        "imponible": d['imp'],
+        "total_haberes": d['hab'],
+        "total_descuentos": d['desc'],
+        "impuesto": d['tax'],
+        "cesantia": d['ces'],
+        "cotizacion_salud": d['salud'],
+        "cotizacion_previsional": d['afp'],
+        "base_tributable": d['base_trib'],
+    }
+
+
+def buscar_base_exacta_entero(sueldo_liquido, bonos_imponibles=0, bonos_no_imponibles=0,
+                              movilizacion=0, tasa_afp=lote.TASA_AFP_DEFAULT,
+                              salud_sistema='fonasa', salud_uf=0.0,
+                              params: parametros.ParametrosEconomicos = None) -> np.ndarray:
+    """
+    Base ENTERA (en pesos) donde el líquido alcanza el objetivo: liquido(b) >= objetivo > liquido(b - 1).
+    Bisección entera en paralelo: termina cuando el intervalo es de $1, sin interpolación.
+    (Con el redondeo por concepto el líquido puede bajar $1 entre pesos vecinos,
+    pero la búsqueda es determinista: siempre entrega la misma base.)
+    """
+    objetivo = _a_entero(sueldo_liquido)
+    columnas = np.broadcast_arrays(objetivo, np.asarray(bonos_imponibles), np.asarray(bonos_no_imponibles),
+                                   np.asarray(movilizacion), np.asarray(tasa_afp),
+                                   np.asarray(salud_sistema), np.asarray(salud_uf))
+    objetivo = columnas[0]
+    escenario = columnas[1:]
+
+    def liquido(bases):
+        return simular_liquido_entero(bases, *escenario, params=params)[0]
+
+    # Invariante: liquido(min_base) < objetivo <= liquido(max_base)
+    min_base = np.zeros(objetivo.shape, dtype=np.int64)
+    max_base = np.clip(objetivo * 3, 1, LIMITE_BASE)
+    for _ in range(64):
+        cortos = (liquido(max_base) < objetivo) & (max_base < LIMITE_BASE)
+        if not cortos.any():
+            break
+        max_base = np.where(cortos, np.minimum(max_base * 2, LIMITE_BASE), max_base)
+
+    while True:
+        activos = (max_base - min_base) > 1
+        if not activos.any():
+            break
+        medio = (min_base + max_base) // 2
+        bajo = liquido(medio) < objetivo
+        min_base = np.where(activos & bajo, medio, min_base)
+        max_base = np.where(activos & ~bajo, medio, max_base)
+
+    # Objetivos alcanzados con base 0 (bonos / movilización ya los cubren)
+    return np.where(objetivo <= liquido(np.zeros(objetivo.shape, dtype=np.int64)), 0, max_base)
+
+
+def resolver_sueldo_base_entero(sueldo_liquido, bonos_imponibles=0, bonos_no_imponibles=0,
+                                movilizacion=0, tasa_afp=lote.TASA_AFP_DEFAULT,
+                                salud_sistema='fonasa', salud_uf=0.0,
+                                params: parametros.ParametrosEconomicos = None) -> dict:
+    """Líquido → Base en aritmética entera, con REDONDEO A MILES hacia arriba"""
+    objetivo = _a_entero(sueldo_liquido)
+    escenario = (bonos_imponibles, bonos_no_imponibles, movilizacion, tasa_afp, salud_sistema, salud_uf)
+
+    base_exacta = buscar_base_exacta_entero(objetivo, *escenario, params=params)
+    sueldo_base_redondeado = -(-base_exacta // 1000) * 1000
+
+    resultado = calcular_liquido_desde_base_entero(sueldo_base_redondeado, *escenario, params=params)
+
+    # El redondeo por concepto puede restar $1 entre pesos vecinos: si la base redondeada
+    # quedó bajo el objetivo se sube al múltiplo de mil siguiente (el líquido nunca es menor al pedido)
+    faltan = resultado['sueldo_liquido'] < objetivo
+    if faltan.any():
+        sueldo_base_redondeado = np.where(faltan, resultado['sueldo_base'] + 1000, resultado['sueldo_base'])
+        resultado = calcular_liquido_desde_base_entero(sueldo_base_redondeado, *escenario, params=params)
+    forma = resultado['sueldo_liquido'].shape
+    base_exacta = np.broadcast_to(base_exacta, forma)
+
+    resultado.pop('base_tributable')
+    resultado['sueldo_base_exacto'] = base_exacta.copy()
+    resultado['diferencia'] = resultado['sueldo_liquido'] - objetivo
+    resultado['redondeo_aplicado'] = resultado['sueldo_base'] - base_exacta
+    return resultado
+
+
+# --- Llamadas individuales (mismo formato que el motor escalar) ---
+
+def _escenario_desde_datos(datos: dict, params: parametros.ParametrosEconomicos) -> tuple:
+    sistema = datos.get('salud_sistema', 'fonasa')
+    return (
+        *engine.totales_bonos(datos),
+        datos.get('movilizacion', 0),
+        params.tasas_afp.get(datos.get('afp_nombre', 'Uno'), lote.TASA_AFP_DEFAULT),
+        sistema,
+        datos.get('salud_uf', 0) if sistema != 'fonasa' else 0.0,
+    )
+
+
+def calcular_liquido_desde_base(datos: dict, params: parametros.ParametrosEconomicos = None) -> resultados.ResultadoLiquido:
+    """engine.calcular_liquido_desde_base en aritmética entera"""
+    if params is None:
+        params = parametros.obtener_actual()
+    columnas = calcular_liquido_desde_base_entero(datos.get('sueldo_base', 0),
+                                                  *_escenario_desde_datos(datos, params), params=params)
+    return resultados.ResultadoLiquido(**{c: int(v) for c, v in columnas.items()})
+
+
+def resolver_sueldo_base(datos: dict, params: parametros.ParametrosEconomicos = None) -> resultados.ResultadoBase:
+    """engine.resolver_sueldo_base en aritmética entera"""
+    if params is None:
+        params = parametros.obtener_actual()
+    columnas = resolver_sueldo_base_entero(datos['sueldo_liquido'],
+                                           *_escenario_desde_datos(datos, params), params=params)
+    return resultados.ResultadoBase(**{c: int(v) for c, v in columnas.items()})
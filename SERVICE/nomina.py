@@ -0,0 +1,193 @@
+# SERVICE/nomina.py
+"""
+    Procesamiento masivo de nóminas (modo batch, sin interfaz gráfica).
+
+    Convierte bloques de la nómina (tablas de pandas) en columnas de entrada
+    para el motor vectorizado. El recorrido de archivos está en
+    SERVICE/pipeline.py. Columnas de entrada:
+
+        sueldo_base | sueldo_liquido    (según el modo, obligatoria)
+        movilizacion, afp_nombre, salud_sistema, salud_uf,
+        bonos_imponibles, bonos_no_imponibles   (opcionales)
+        periodo     ("AAAA-MM", opcional) cada fila se calcula con los parámetros
+                    históricos de su período (DATA/historico.py); se copia a la salida
+
+    Montos en pesos: "1500000", "1.500.000" o "$ 1.500.000" (puntos de miles);
+    salud_uf en UF con punto o coma decimal ("2.822" o "2,822").
+
+    Cualquier otra columna (rut, nombre, centro de costo...) se copia tal cual
+    al archivo de salida, delante de las columnas calculadas.
+"""
+import numpy as np
+import pandas as pd
+from DATA import parametros
+from SERVICE import engine, lote, resultados
+
+MODOS = ("liquido_a_base", "base_a_liquido")
+TAMANO_BLOQUE_DEFAULT = 5000
+
+COLUMNAS_ENTRADA = (
+    "sueldo_base", "sueldo_liquido", "movilizacion", "afp_nombre",
+    "salud_sistema", "salud_uf", "bonos_imponibles", "bonos_no_imponibles"
+)
+
+COLUMNA_PERIODO = "periodo"
+
+# Montos con puntos de miles: "1.500.000", "-12.500", "1.500.000,50" (un solo punto sin grupo de 3: decimal)
+PATRON_MILES = r'^-?\d{1,3}(?:\.\d{3})+(?:,\d*)?$'
+
+# Mismos campos (y orden) que los resultados del motor escalar
+COLUMNAS_RESULTADO = resultados.CAMPOS_POR_MODO
+
+
+def _columna_numerica(tabla: pd.DataFrame, nombre: str, pesos: bool = True) -> np.ndarray:
+    """
+    Columna numérica de la tabla (0 si no existe o está vacía). Acepta coma decimal ('2,822')
+    y, en montos en pesos, el formato chileno con puntos de miles ('$ 1.500.000', '1.500.000,50').
+    Un valor que no es número lanza ValueError con la columna, la fila y el valor.
+    """
+    if nombre not in tabla.columns:
+        return np.zeros(len(tabla))
+    serie = tabla[nombre]
+    if not pd.api.types.is_numeric_dtype(serie):
+        texto = serie.fillna('').astype(str).str.strip()
+        if pesos:
+            texto = texto.str.replace(r'[$\s]', '', regex=True)
+            miles = texto.str.match(PATRON_MILES)
+            texto = texto.where(~miles, texto.str.replace('.', '', regex=False))
+        texto = texto.str.replace(',', '.', regex=False).replace({'': '0', 'nan': '0'})
+        serie = pd.to_numeric(texto, errors='coerce')
+        invalidos = np.flatnonzero(serie.isna().to_numpy())
+        if invalidos.size:
+            i = invalidos[0]
+            otros = f" (y {invalidos.size - 1} filas más)" if invalidos.size > 1 else ""
+            raise ValueError(f"Valor no numérico en '{nombre}', fila {tabla.index[i]}: "
+                             f"{tabla[nombre].iloc[i]!r}{otros}")
+    return serie.fillna(0).to_numpy(dtype=float)
+
+
+def _columna_texto(tabla: pd.DataFrame, nombre: str, defecto: str) -> np.ndarray:
+    """Columna de texto sin espacios; vacíos reemplazados por `defecto`"""
+    if nombre not in tabla.columns:
+        return np.full(len(tabla), defecto, dtype=object)
+    serie = tabla[nombre].fillna('').astype(str).str.strip()
+    return serie.where(serie != '', defecto).to_numpy(dtype=object)
+
+
+def columnas_entrada(tabla: pd.DataFrame) -> dict:
+    """
+    Columnas de entrada ya limpias (COLUMNAS_ENTRADA como arreglos NumPy): numéricas con 0
+    por defecto, AFP 'Uno' y salud 'fonasa' si faltan, y plan en UF 0 para Fonasa.
+    """
+    sistemas = np.char.lower(_columna_texto(tabla, 'salud_sistema', 'fonasa').astype(str))
+    return {
+        "sueldo_base": _columna_numerica(tabla, 'sueldo_base'),
+        "sueldo_liquido": _columna_numerica(tabla, 'sueldo_liquido'),
+        "movilizacion": _columna_numerica(tabla, 'movilizacion'),
+        "afp_nombre": _columna_texto(tabla, 'afp_nombre', 'Uno'),
+        "salud_sistema": sistemas,
+        "salud_uf": np.where(sistemas != 'fonasa', _columna_numerica(tabla, 'salud_uf', pesos=False), 0.0),
+        "bonos_imponibles": _columna_numerica(tabla, 'bonos_imponibles'),
+        "bonos_no_imponibles": _columna_numerica(tabla, 'bonos_no_imponibles'),
+    }
+
+
+def calcular_tabla(tabla: pd.DataFrame, modo: str, params: parametros.ParametrosEconomicos = None,
+                   entero: bool = False) -> dict:
+    """
+    Calcula un bloque de la nómina con el motor vectorizado. Retorna columnas (arreglos NumPy).
+    Con entero=True usa el motor de punto fijo (SERVICE/motor_entero.py), exacto al peso.
+    Si la tabla trae la columna 'periodo', cada período se calcula con sus parámetros
+    históricos; `params` (o el snapshot vigente) se usa para las filas sin período.
+    """
+    if params is None:
+        params = parametros.obtener_actual()
+
+    if COLUMNA_PERIODO in tabla.columns:
+        periodos = _columna_texto(tabla, COLUMNA_PERIODO, '')
+        distintos = pd.unique(periodos)
+        if len(distintos) > 1 or distintos[0] != '':
+            return _calcular_por_periodo(tabla.drop(columns=COLUMNA_PERIODO), modo, params, entero,
+                                         periodos, distintos)
+
+    entrada = columnas_entrada(tabla)
+    escenario = (
+        entrada['bonos_imponibles'],
+        entrada['bonos_no_imponibles'],
+        entrada['movilizacion'],
+        lote.tasas_afp_desde_nombres(entrada['afp_nombre'], params),
+        entrada['salud_sistema'],
+        entrada['salud_uf'],
+    )
+
+    montos = entrada["sueldo_base" if modo == "base_a_liquido" else "sueldo_liquido"]
+    if entero:
+        from SERVICE import motor_entero
+        if modo == "base_a_liquido":
+            return motor_entero.calcular_liquido_desde_base_entero(montos, *escenario, params=params)
+        return motor_entero.resolver_sueldo_base_entero(montos, *escenario, params=params)
+    if modo == "base_a_liquido":
+        return lote.calcular_liquido_desde_base_lote(montos, *escenario, params=params)
+    return lote.resolver_sueldo_base_lote(montos, *escenario, params=params)
+
+
+def _calcular_por_periodo(tabla: pd.DataFrame, modo: str, params: parametros.ParametrosEconomicos,
+                          entero: bool, periodos: np.ndarray, distintos) -> dict:
+    """Una llamada vectorizada por período; los resultados vuelven a su fila original"""
+    from DATA import historico
+    columnas = {}
+    for periodo in distintos:
+        filas = np.flatnonzero(periodos == periodo)
+        params_periodo = historico.parametros_en(periodo) if periodo else params
+        parcial = calcular_tabla(tabla.iloc[filas], modo, params_periodo, entero)
+        for campo, valores in parcial.items():
+            if campo not in columnas:
+                columnas[campo] = np.empty(len(tabla), dtype=valores.dtype)
+            columnas[campo][filas] = valores
+    return columnas
+
+
+def calcular_bloque(filas: list, modo: str, params: parametros.ParametrosEconomicos = None,
+                    entero: bool = False) -> dict:
+    """Igual que calcular_tabla, pero desde una lista de diccionarios (una por trabajador)"""
+    return calcular_tabla(pd.DataFrame(filas), modo, params, entero)
+
+
+def tabla_desde_datos(lista_datos: list) -> pd.DataFrame:
+    """Convierte diccionarios con el formato del formulario (bonos como lista o totales) a una tabla de nómina"""
+    filas = []
+    con_periodo = any(datos.get('periodo') for datos in lista_datos)
+    for datos in lista_datos:
+        bonos_imponibles, bonos_no_imponibles = engine.totales_bonos(datos)
+        filas.append({
+            "sueldo_base": datos.get('sueldo_base', 0),
+            "sueldo_liquido": datos.get('sueldo_liquido', 0),
+            "movilizacion": datos.get('movilizacion', 0),
+            "afp_nombre": datos.get('afp_nombre', 'Uno'),
+            "salud_sistema": datos.get('salud_sistema', 'fonasa'),
+            "salud_uf": datos.get('salud_uf', 0),
+            "bonos_imponibles": bonos_imponibles,
+            "bonos_no_imponibles": bonos_no_imponibles,
+            COLUMNA_PERIODO: datos.get('periodo') or '',
+        })
+    columnas = list(COLUMNAS_ENTRADA) + ([COLUMNA_PERIODO] if con_periodo else [])
+    return pd.DataFrame(filas, columns=columnas)
+
+
+def calcular_conjunto(lista_datos: list, modo: str, params: parametros.ParametrosEconomicos = None,
+                      entero: bool = False) -> resultados.ConjuntoResultados:
+    """
+    Calcula varios diccionarios del formulario en una sola pasada vectorizada.
+    Retorna un conjunto columnar (un arreglo por campo, sin un diccionario por fila).
+    """
+    if not lista_datos:
+        columnas = {c: np.zeros(0, dtype=np.int64) for c in COLUMNAS_RESULTADO[modo]}
+    else:
+        columnas = calcular_tabla(tabla_desde_datos(lista_datos), modo, params, entero)
+    return resultados.ConjuntoResultados(modo, columnas)
+
+
+def calcular_lista_datos(lista_datos: list, modo: str, params: parametros.ParametrosEconomicos = None,
+                         entero: bool = False) -> list:
+    """Igual que calcular_conjunto, pero como lista de diccionarios (mismas claves que el motor escalar)"""
+    return calcular_conjunto(lista_datos, modo, params, entero).a_dicts()
@@ -0,0 +1,96 @@
+# SERVICE/perfil_arranque.py
+"""
+    Perfil de arranque (python main.py --profile-startup).
+
+    Mide el tiempo de importación de cada módulo cargado durante el arranque
+    (inclusivo, con sus dependencias más pesadas debajo) y los hitos del
+    arranque hasta que la primera ventana está en pantalla.
+"""
+import builtins
+import sys
+import time
+
+_inicio = None
+_import_original = None
+_pila = []       # Importaciones en curso: [nombre, hijos]
+_raiz = []       # (nombre, segundos, hijos) de las importaciones de primer nivel
+_hitos = []
+
+
+def activar(inicio: float = None):
+    """Empieza a medir; `inicio` es el perf_counter() tomado al comienzo del proceso"""
+    global _inicio, _import_original
+    if _import_original is not None:
+        return
+    _inicio = inicio if inicio is not None else time.perf_counter()
+    _import_original = builtins.__import__
+    builtins.__import__ = _import_medido
+
+
+def activo() -> bool:
+    return _import_original is not None
+
+
+def _modulo_nuevo(nombre, globales, lista_desde, nivel):
+    """Nombre absoluto del módulo que esta importación va a cargar por primera vez (o None)"""
+    if nivel:
+        paquete = (globales or {}).get('__package__') or ''
+        base = paquete.rsplit('.', nivel - 1)[0] if nivel > 1 else paquete
+        nombre = f"{base}.{nombre}" if nombre else base
+    if nombre not in sys.modules:
+        return nombre
+    modulo = sys.modules[nombre]
+    for sub in lista_desde or ():
+        if sub != '*' and not hasattr(modulo, sub):
+            return f"{nombre}.{sub}"
+    return None
+
+
+def _import_medido(nombre, globales=None, locales=None, lista_desde=(), nivel=0):
+    nuevo = _modulo_nuevo(nombre, globales, lista_desde, nivel)
+    if nuevo is None:
+        return _import_original(nombre, globales, locales, lista_desde, nivel)
+
+    # Tiempo inclusivo; lo que importe este módulo queda como hijo suyo
+    entrada = [nuevo, []]
+    _pila.append(entrada)
+    t0 = time.perf_counter()
+    try:
+        return _import_original(nombre, globales, locales, lista_desde, nivel)
+    finally:
+        segundos = time.perf_counter() - t0
+        _pila.pop()
+        destino = _pila[-1][1] if _pila else _raiz
+        destino.append((nuevo, segundos, entrada[1]))
+
+
+def marcar(hito: str):
+    """Registra un hito con el tiempo transcurrido desde el inicio del proceso"""
+    if activo():
+        _hitos.append((hito, time.perf_counter() - _inicio))
+
+
+def reporte(maximo_modulos: int = 10, maximo_hijos: int = 3) -> str:
+    """Texto con los hitos y las importaciones más lentas (con sus dependencias más pesadas)"""
+    lineas = ["⏱️ Perfil de arranque", "   Hitos (desde el inicio del proceso):"]
+    for hito, segundos in _hitos:
+        lineas.append(f"      {segundos * 1000:9.1f} ms  {hito}")
+
+    total_imports = sum(segundos for _, segundos, _ in _raiz)
+    lineas.append(f"   Importaciones ({total_imports * 1000:.1f} ms en total, las más lentas):")
+    for nombre, segundos, hijos in sorted(_raiz, key=lambda x: -x[1])[:maximo_modulos]:
+        lineas.append(f"      {segundos * 1000:9.1f} ms  {nombre}")
+        for hijo, seg_hijo, _ in sorted(hijos, key=lambda x: -x[1])[:maximo_hijos]:
+            lineas.append(f"      {seg_hijo * 1000:9.1f} ms    └ {hijo}")
+    return "\n".join(lineas)
+
+
+def terminar(hito: str):
+    """Marca el último hito, imprime el reporte y deja de medir importaciones"""
+    global _import_original
+    if not activo():
+        return
+    marcar(hito)
+    builtins.__import__ = _import_original
+    _import_original = None
+    print(reporte())
@@ -0,0 +1,189 @@
+# SERVICE/pipeline.py
+"""
+    Pipeline de generadores para nóminas muy grandes, con memoria acotada.
+
+        leer_bloques  →  rebloquear  →  calcular_bloques  →  escribir_bloques
+
+    Cada etapa consume y entrega un bloque a la vez, así que el consumo de
+    memoria depende del tamaño de bloque y no del tamaño del archivo.
+    Formatos soportados: CSV (pandas) y Parquet (pyarrow), en entrada y salida.
+"""
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+from DATA import parametros
+from SERVICE import nomina
+
+TAMANO_BLOQUE_DEFAULT = nomina.TAMANO_BLOQUE_DEFAULT
+
+
+def _es_parquet(ruta: str) -> bool:
+    return ruta.lower().endswith(('.parquet', '.pq'))
+
+
+def leer_bloques(ruta: str, tamano_bloque: int = TAMANO_BLOQUE_DEFAULT, separador: str = ','):
+    """Generador de DataFrames leídos por partes (nunca carga el archivo completo)"""
+    if _es_parquet(ruta):
+        import pyarrow.parquet as pq
+        archivo = pq.ParquetFile(ruta)
+        for lote_arrow in archivo.iter_batches(batch_size=tamano_bloque):
+            yield lote_arrow.to_pandas()
+    else:
+        # Todo como texto: los identificadores (RUT, códigos) se copian sin alterar
+        with pd.read_csv(ruta, sep=separador, chunksize=tamano_bloque, dtype=str,
+                         keep_default_na=False, encoding='utf-8-sig') as lector:
+            yield from lector
+
+
+def rebloquear(bloques, tamano_bloque: int = TAMANO_BLOQUE_DEFAULT):
+    """Normaliza los bloques a exactamente `tamano_bloque` filas (el último puede ser menor)"""
+    pendientes = []
+    filas_pendientes = 0
+    for tabla in bloques:
+        while len(tabla):
+            faltan = tamano_bloque - filas_pendientes
+            pendientes.append(tabla.iloc[:faltan])
+            filas_pendientes += len(pendientes[-1])
+            tabla = tabla.iloc[faltan:]
+            if filas_pendientes == tamano_bloque:
+                yield pd.concat(pendientes, ignore_index=True)
+                pendientes = []
+                filas_pendientes = 0
+    if pendientes:
+        yield pd.concat(pendientes, ignore_index=True)
+
+
+def calcular_bloques(bloques, modo: str, params: parametros.ParametrosEconomicos = None, entero: bool = False):
+    """Etapa de cálculo: columnas extra de la entrada + columnas de resultado del motor"""
+    if params is None:
+        params = parametros.obtener_actual()
+    columnas_resultado = nomina.COLUMNAS_RESULTADO[modo]
+
+    for tabla in bloques:
+        columnas = nomina.calcular_tabla(tabla, modo, params, entero)
+        extras = [c for c in tabla.columns if c not in nomina.COLUMNAS_ENTRADA]
+        salida = tabla[extras].reset_index(drop=True)
+        yield salida.assign(**{c: columnas[c] for c in columnas_resultado})
+
+
+# --- Ejecución en paralelo (un proceso por núcleo) ---
+
+# Snapshot de parámetros del proceso trabajador: se recibe UNA vez, en el initializer
+_params_trabajador = None
+
+
+def _iniciar_trabajador(params: parametros.ParametrosEconomicos):
+    global _params_trabajador
+    _params_trabajador = params
+
+
+def _calcular_en_trabajador(tabla: pd.DataFrame, modo: str, entero: bool) -> pd.DataFrame:
+    return next(calcular_bloques([tabla], modo, _params_trabajador, entero))
+
+
+def calcular_bloques_en_paralelo(bloques, modo: str, params: parametros.ParametrosEconomicos = None,
+                                 trabajadores: int = None, entero: bool = False):
+    """
+    Igual que calcular_bloques, repartiendo los bloques en un ProcessPoolExecutor.
+    Los resultados salen en el mismo orden de entrada y sólo hay 2 bloques en vuelo
+    por trabajador, así que la memoria sigue acotada.
+    """
+    if params is None:
+        params = parametros.obtener_actual()
+    trabajadores = trabajadores or os.cpu_count() or 1
+
+    with ProcessPoolExecutor(max_workers=trabajadores, initializer=_iniciar_trabajador,
+                             initargs=(params,)) as executor:
+        en_vuelo = deque()
+        for tabla in bloques:
+            en_vuelo.append(executor.submit(_calcular_en_trabajador, tabla, modo, entero))
+            if len(en_vuelo) >= trabajadores * 2:
+                yield en_vuelo.popleft().result()
+        while en_vuelo:
+            yield en_vuelo.popleft().result()
+
+
+def escribir_bloques(bloques, ruta_salida: str, separador: str = ','):
+    """Escritor incremental: agrega cada bloque al archivo y entrega la cantidad de filas escritas"""
+    if _es_parquet(ruta_salida):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        escritor = None
+        try:
+            for tabla in bloques:
+                if escritor is None:
+                    tabla_arrow = pa.Table.from_pandas(tabla, preserve_index=False)
+                    escritor = pq.ParquetWriter(ruta_salida, tabla_arrow.schema)
+                else:
+                    tabla_arrow = pa.Table.from_pandas(tabla, schema=escritor.schema, preserve_index=False)
+                escritor.write_table(tabla_arrow)
+                yield len(tabla)
+        finally:
+            if escritor is not None:
+                escritor.close()
+    else:
+        with open(ruta_salida, 'w', newline='', encoding='utf-8') as f:
+            encabezado = True
+            for tabla in bloques:
+                tabla.to_csv(f, sep=separador, index=False, header=encabezado)
+                encabezado = False
+                yield len(tabla)
+
+
+def procesar_archivo(ruta_entrada: str, ruta_salida: str, modo: str = "liquido_a_base",
+                     tamano_bloque: int = TAMANO_BLOQUE_DEFAULT, separador: str = ',',
+                     mostrar_progreso: bool = True, trabajadores: int = 1, entero: bool = False,
+                     periodo: str = None) -> dict:
+    """
+    Arma y ejecuta el pipeline completo sobre un archivo (CSV o Parquet).
+    Todo el archivo se calcula con el MISMO snapshot de parámetros: el vigente, o el
+    histórico de `periodo` ("AAAA-MM"). Las filas con su propia columna 'periodo'
+    usan los parámetros históricos de ese período.
+    Con trabajadores > 1 la etapa de cálculo se reparte en procesos.
+    Con entero=True se usa el motor de punto fijo (resultados exactos al peso).
+    Retorna un resumen con filas procesadas, bloques, segundos y filas/segundo.
+    """
+    if modo not in nomina.MODOS:
+        raise ValueError(f"Modo inválido: {modo} (use {' o '.join(nomina.MODOS)})")
+
+    if periodo:
+        from DATA import historico
+        params = historico.parametros_en(periodo)
+    else:
+        params = parametros.obtener_actual()
+    inicio = time.perf_counter()
+    total_filas = 0
+    bloques = 0
+
+    etapas = leer_bloques(ruta_entrada, tamano_bloque, separador)
+    etapas = rebloquear(etapas, tamano_bloque)
+    if trabajadores > 1:
+        etapas = calcular_bloques_en_paralelo(etapas, modo, params, trabajadores, entero)
+    else:
+        etapas = calcular_bloques(etapas, modo, params, entero)
+
+    for filas in escribir_bloques(etapas, ruta_salida, separador):
+        total_filas += filas
+        bloques += 1
+        if mostrar_progreso:
+            transcurrido = time.perf_counter() - inicio
+            print(f"   ... {total_filas:,} filas ({total_filas / transcurrido:,.0f} filas/s)".replace(",", "."))
+
+    segundos = time.perf_counter() - inicio
+    resumen = {
+        "modo": modo,
+        "filas": total_filas,
+        "bloques": bloques,
+        "segundos": round(segundos, 3),
+        "filas_por_segundo": round(total_filas / segundos) if segundos > 0 else 0,
+        "version_parametros": params.version,
+        "periodo": periodo,
+        "trabajadores": trabajadores,
+        "aritmetica": "entera" if entero else "flotante",
+    }
+    if mostrar_progreso:
+        print(f"✅ {total_filas:,} filas en {segundos:.2f}s".replace(",", ".")
+              + f" ({resumen['filas_por_segundo']:,} filas/s)".replace(",", "."))
+    return resumen
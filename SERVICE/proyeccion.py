@@ -0,0 +1,219 @@
+# SERVICE/proyeccion.py
+"""
+    Proyección anual (o de cualquier cantidad de meses) de la nómina.
+
+    Cada trabajador × mes es una fila del motor vectorizado y la proyección COMPLETA se
+    calcula en una sola pasada: los parámetros de cada mes (UF, topes, tasas AFP, tramos)
+    viajan como columnas (lote.ParametrosPorFila), así que un cambio de tramos a mitad
+    de año o una trayectoria de UF mes a mes no obligan a separar el cálculo.
+
+        proy = proyectar(tabla, periodos_desde("2025-01", 12),
+                         uf_por_mes=trayectoria_uf(38_000, 12, 0.003),
+                         bonos_imponibles_mensuales={"2025-03": 200_000, "2025-09": 150_000})
+        proy.totales_mensuales()   # una fila por mes (suma de toda la nómina)
+        proy.totales_anuales()     # una fila por trabajador (suma de los meses)
+
+    Parámetros de cada mes: se resuelven en el histórico (DATA/historico.py); un mes
+    posterior a la última vigencia usa la última conocida y, sin histórico, se usa el
+    snapshot vigente. La trayectoria de UF, si se indica, reemplaza la UF de cada mes.
+
+    La tabla de entrada tiene las mismas columnas que una nómina (SERVICE/nomina.py).
+    Los bonos mensuales se SUMAN a los bonos recurrentes de la tabla.
+"""
+import numpy as np
+import pandas as pd
+from DATA import parametros
+from SERVICE import lote, nomina
+
+# Campos que se acumulan por mes y por año
+CAMPOS_PROYECCION = (
+    "sueldo_base", "gratificacion", "imponible", "total_haberes", "cotizacion_previsional",
+    "cotizacion_salud", "cesantia", "impuesto", "total_descuentos", "sueldo_liquido"
+)
+COTIZACIONES = ("cotizacion_previsional", "cotizacion_salud", "cesantia")
+
+
+def periodos_desde(inicio: str, meses: int = 12) -> list:
+    """`meses` períodos consecutivos desde `inicio`: "2025-11", 3 → ["2025-11", "2025-12", "2026-01"]"""
+    if meses <= 0:
+        raise ValueError("La proyección debe tener al menos un mes")
+    anio, mes = int(inicio[:4]), int(inicio[5:7])
+    if not 1 <= mes <= 12:
+        raise ValueError(f"Período inválido: {inicio} (se espera AAAA-MM)")
+    return [f"{anio + (mes - 1 + i) // 12:04d}-{(mes - 1 + i) % 12 + 1:02d}" for i in range(meses)]
+
+
+def trayectoria_uf(uf_inicial: float, meses: int, variacion_mensual: float = 0.0) -> list:
+    """UF de cada mes (2 decimales) con una variación mensual constante (0.003 = 0,3% mensual)"""
+    return [round(uf_inicial * (1 + variacion_mensual) ** i, 2) for i in range(meses)]
+
+
+def _por_periodo(valores, periodos: list) -> list:
+    """Lista alineada con los períodos desde None, una secuencia o {periodo: valor}"""
+    if valores is None:
+        return [None] * len(periodos)
+    if isinstance(valores, dict):
+        return [valores.get(p) for p in periodos]
+    valores = list(valores)
+    if len(valores) != len(periodos):
+        raise ValueError(f"Se esperaban {len(periodos)} valores mensuales y llegaron {len(valores)}")
+    return valores
+
+
+def parametros_por_mes(periodos: list, uf_por_mes=None,
+                       params: parametros.ParametrosEconomicos = None) -> list:
+    """
+    Snapshot de cada período: el del histórico o, sin historia, `params` (por defecto el
+    vigente). uf_por_mes (lista alineada o {periodo: uf}) reemplaza la UF de cada mes.
+    """
+    from DATA import historico
+    if params is None:
+        params = parametros.obtener_actual()
+
+    snapshots = []
+    for periodo, uf in zip(periodos, _por_periodo(uf_por_mes, periodos)):
+        try:
+            snapshot = historico.parametros_en(periodo)
+        except ValueError:
+            snapshot = params
+        if uf is not None and float(uf) != snapshot.valor_uf:
+            snapshot = parametros.validar(snapshot.reemplazar({historico.CLAVE_UF: float(uf)}))
+        snapshots.append(snapshot)
+    return snapshots
+
+
+def _calendario(valores, n: int, periodos: list) -> np.ndarray:
+    """
+    Matriz (trabajadores × meses) de montos mensuales. Acepta un escalar, un vector por mes
+    (largo = meses), una matriz (trabajadores × meses), un vector por trabajador en forma
+    (trabajadores, 1), o {periodo: monto o vector por trabajador}.
+    """
+    m = len(periodos)
+    if valores is None:
+        return np.zeros((n, m))
+    if isinstance(valores, dict):
+        matriz = np.zeros((n, m))
+        for j, valor in enumerate(_por_periodo(valores, periodos)):
+            if valor is not None:
+                matriz[:, j] = valor
+        return matriz
+    valores = np.asarray(valores, dtype=float)
+    try:
+        return np.broadcast_to(valores, (n, m))
+    except ValueError:
+        raise ValueError(f"Montos mensuales con forma {valores.shape}: se esperaba "
+                         f"(meses,)=({m},), (trabajadores, meses)=({n}, {m}) o ({n}, 1)") from None
+
+
+class Proyeccion:
+    """Resultado de proyectar: cada campo es una matriz (trabajadores × meses) de enteros"""
+    __slots__ = ("modo", "periodos", "snapshots", "columnas", "extras")
+
+    def __init__(self, modo: str, periodos: list, snapshots: list, columnas: dict, extras: pd.DataFrame):
+        object.__setattr__(self, "modo", modo)
+        object.__setattr__(self, "periodos", tuple(periodos))
+        object.__setattr__(self, "snapshots", tuple(snapshots))
+        object.__setattr__(self, "columnas", columnas)
+        object.__setattr__(self, "extras", extras)
+
+    def __setattr__(self, nombre, valor):
+        raise AttributeError("Proyeccion es inmutable")
+
+    def __getitem__(self, campo: str) -> np.ndarray:
+        return self.columnas[campo]
+
+    @property
+    def trabajadores(self) -> int:
+        return self.columnas["sueldo_liquido"].shape[0]
+
+    def totales_mensuales(self) -> pd.DataFrame:
+        """Una fila por mes con la suma de toda la nómina (y la UF usada ese mes)"""
+        tabla = pd.DataFrame({campo: self.columnas[campo].sum(axis=0) for campo in CAMPOS_PROYECCION},
+                             index=pd.Index(self.periodos, name="periodo"))
+        tabla.insert(0, "valor_uf", [p.valor_uf for p in self.snapshots])
+        tabla["cotizaciones"] = sum(tabla[campo] for campo in COTIZACIONES)
+        return tabla
+
+    def totales_anuales(self) -> pd.DataFrame:
+        """Una fila por trabajador con la suma de los meses; las columnas extra (rut, nombre...) van delante"""
+        sumas = pd.DataFrame({campo: self.columnas[campo].sum(axis=1) for campo in CAMPOS_PROYECCION})
+        sumas["cotizaciones"] = sum(sumas[campo] for campo in COTIZACIONES)
+        return pd.concat([self.extras.reset_index(drop=True), sumas], axis=1)
+
+    def total(self) -> dict:
+        """Totales de la nómina completa en todo el período proyectado"""
+        totales = {campo: int(self.columnas[campo].sum()) for campo in CAMPOS_PROYECCION}
+        totales["cotizaciones"] = sum(totales[campo] for campo in COTIZACIONES)
+        return totales
+
+    def detalle(self) -> pd.DataFrame:
+        """Formato largo: una fila por trabajador × mes (orden: trabajador, luego mes)"""
+        n, m = self.trabajadores, len(self.periodos)
+        tabla = self.extras.iloc[np.repeat(np.arange(n), m)].reset_index(drop=True)
+        tabla[nomina.COLUMNA_PERIODO] = np.tile(self.periodos, n)
+        for campo, valores in self.columnas.items():
+            tabla[campo] = valores.ravel()
+        return tabla
+
+
+def proyectar(tabla: pd.DataFrame, periodos: list, modo: str = "base_a_liquido", uf_por_mes=None,
+              bonos_imponibles_mensuales=None, bonos_no_imponibles_mensuales=None,
+              params: parametros.ParametrosEconomicos = None, params_por_mes: list = None) -> Proyeccion:
+    """
+    Proyecta la nómina en `periodos` con una sola llamada al motor vectorizado.
+
+    modo:           "base_a_liquido" (sueldo base pactado) o "liquido_a_base" (líquido
+                    pactado: la base se recalcula cada mes)
+    uf_por_mes:     trayectoria de UF (lista alineada con los períodos o {periodo: uf})
+    bonos_*_mensuales: calendario de bonos por mes (ver _calendario)
+    params:         snapshot para los meses sin histórico (por defecto el vigente)
+    params_por_mes: snapshots explícitos, uno por período (reemplaza al histórico y a uf_por_mes)
+    """
+    if modo not in nomina.MODOS:
+        raise ValueError(f"Modo desconocido: {modo}")
+    periodos = list(periodos)
+    if params_por_mes is None:
+        params_por_mes = parametros_por_mes(periodos, uf_por_mes, params)
+    elif len(params_por_mes) != len(periodos):
+        raise ValueError(f"Se esperaban {len(periodos)} snapshots y llegaron {len(params_por_mes)}")
+
+    n, m = len(tabla), len(periodos)
+    entrada = nomina.columnas_entrada(tabla)
+
+    # Fila k = trabajador k // m en el mes k % m: el resultado vuelve a (n, m) con un reshape
+    por_fila = lote.ParametrosPorFila(params_por_mes, np.tile(np.arange(m), n))
+    def repetir(columna):
+        return np.repeat(columna, m)
+
+    escenario = (
+        repetir(entrada['bonos_imponibles']) + _calendario(bonos_imponibles_mensuales, n, periodos).ravel(),
+        repetir(entrada['bonos_no_imponibles']) + _calendario(bonos_no_imponibles_mensuales, n, periodos).ravel(),
+        repetir(entrada['movilizacion']),
+        por_fila.tasas_afp(repetir(entrada['afp_nombre'])),
+        repetir(entrada['salud_sistema']),
+        repetir(entrada['salud_uf']),
+    )
+    if modo == "base_a_liquido":
+        columnas = lote.calcular_liquido_desde_base_lote(repetir(entrada['sueldo_base']), *escenario,
+                                                         params=por_fila)
+    else:
+        columnas = lote.resolver_sueldo_base_lote(repetir(entrada['sueldo_liquido']), *escenario,
+                                                  params=por_fila)
+
+    extras = tabla[[c for c in tabla.columns if c not in nomina.COLUMNAS_ENTRADA and c != nomina.COLUMNA_PERIODO]]
+    return Proyeccion(modo, periodos, params_por_mes,
+                      {campo: valores.reshape(n, m) for campo, valores in columnas.items()}, extras)
+
+
+def exportar_csv(proyeccion: Proyeccion, ruta_mensual: str, ruta_anual: str = None,
+                 ruta_detalle: str = None, separador: str = ','):
+    """Escribe los totales por mes y, si se indican, los totales por trabajador y el detalle largo"""
+    proyeccion.totales_mensuales().to_csv(ruta_mensual, sep=separador, encoding='utf-8')
+    print(f"💾 Totales mensuales en {ruta_mensual} ({len(proyeccion.periodos)} meses)")
+    if ruta_anual:
+        proyeccion.totales_anuales().to_csv(ruta_anual, sep=separador, index=False, encoding='utf-8')
+        print(f"💾 Totales por trabajador en {ruta_anual} ({proyeccion.trabajadores} filas)")
+    if ruta_detalle:
+        detalle = proyeccion.detalle()
+        detalle.to_csv(ruta_detalle, sep=separador, index=False, encoding='utf-8')
+        print(f"💾 Detalle trabajador × mes en {ruta_detalle} ({len(detalle)} filas)")
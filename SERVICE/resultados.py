@@ -0,0 +1,133 @@
+# SERVICE/resultados.py
+"""
+    Tipos de resultado del motor.
+
+    Resultado (una llamada): objeto inmutable con __slots__, sin diccionario por
+    instancia. Se comporta como un Mapping de sólo lectura (resultado['impuesto'],
+    .get(), .keys()), así que el código que esperaba un dict sigue funcionando;
+    a_dict() entrega un dict real cuando hace falta (ResultadosPopup, JSON).
+
+    ConjuntoResultados (lotes): un arreglo NumPy por campo en vez de un dict por
+    fila; las filas se materializan sólo al pedirlas.
+"""
+from collections.abc import Mapping
+
+# Montos en pesos bajo este límite caben en int32 (la mitad de memoria que int64)
+LIMITE_INT32 = 2**31 - 1
+
+CAMPOS_BASE_A_LIQUIDO = (
+    "sueldo_base", "gratificacion", "bonos_imponibles", "bonos_no_imponibles", "movilizacion",
+    "sueldo_liquido", "imponible", "total_haberes", "total_descuentos", "impuesto", "cesantia",
+    "cotizacion_salud", "cotizacion_previsional", "base_tributable"
+)
+
+CAMPOS_LIQUIDO_A_BASE = (
+    "sueldo_base", "sueldo_base_exacto", "gratificacion", "bonos_imponibles", "bonos_no_imponibles",
+    "movilizacion", "sueldo_liquido", "imponible", "total_haberes", "total_descuentos", "impuesto",
+    "cesantia", "diferencia", "cotizacion_salud", "cotizacion_previsional", "redondeo_aplicado"
+)
+
+
+def _reconstruir(clase, valores: tuple):
+    return clase(**dict(zip(clase.__slots__, valores)))
+
+
+class Resultado(Mapping):
+    """Base de los resultados inmutables; cada subclase define sus campos en __slots__"""
+    __slots__ = ()
+
+    def __init__(self, **valores):
+        for campo in self.__slots__:
+            object.__setattr__(self, campo, valores[campo])
+
+    def __setattr__(self, nombre, valor):
+        raise AttributeError(f"{type(self).__name__} es inmutable")
+
+    def __delattr__(self, nombre):
+        raise AttributeError(f"{type(self).__name__} es inmutable")
+
+    def __getitem__(self, campo):
+        if campo not in self.__slots__:
+            raise KeyError(campo)
+        return getattr(self, campo)
+
+    def __iter__(self):
+        return iter(self.__slots__)
+
+    def __len__(self):
+        return len(self.__slots__)
+
+    def __hash__(self):
+        return hash((type(self).__name__, self.valores()))
+
+    def __reduce__(self):
+        # Con __slots__ y __setattr__ bloqueado, pickle necesita reconstruir por el constructor
+        return (_reconstruir, (type(self), self.valores()))
+
+    def __repr__(self):
+        campos = ", ".join(f"{c}={getattr(self, c)!r}" for c in self.__slots__)
+        return f"{type(self).__name__}({campos})"
+
+    def valores(self) -> tuple:
+        return tuple(getattr(self, c) for c in self.__slots__)
+
+    def a_dict(self) -> dict:
+        """Copia como diccionario (mismas claves que el formato anterior del motor)"""
+        return {c: getattr(self, c) for c in self.__slots__}
+
+
+class ResultadoLiquido(Resultado):
+    """Base → Líquido (calcular_liquido_desde_base)"""
+    __slots__ = CAMPOS_BASE_A_LIQUIDO
+
+
+class ResultadoBase(Resultado):
+    """Líquido → Base (resolver_sueldo_base)"""
+    __slots__ = CAMPOS_LIQUIDO_A_BASE
+
+
+TIPOS_POR_MODO = {"base_a_liquido": ResultadoLiquido, "liquido_a_base": ResultadoBase}
+CAMPOS_POR_MODO = {modo: tipo.__slots__ for modo, tipo in TIPOS_POR_MODO.items()}
+
+
+class ConjuntoResultados:
+    """Resultados de un lote en formato columnar: un arreglo por campo, todos del mismo largo"""
+    __slots__ = ("modo", "columnas")
+
+    def __init__(self, modo: str, columnas: dict, compactar: bool = True):
+        self.modo = modo
+        self.columnas = {campo: columnas[campo] for campo in CAMPOS_POR_MODO[modo]}
+        if compactar:
+            for campo, columna in self.columnas.items():
+                if columna.dtype.kind == 'i' and columna.size and abs(columna).max() <= LIMITE_INT32:
+                    self.columnas[campo] = columna.astype('int32')
+
+    def __len__(self):
+        return len(self.columnas[CAMPOS_POR_MODO[self.modo][0]])
+
+    def __getitem__(self, campo: str):
+        """La columna completa de un campo"""
+        return self.columnas[campo]
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.fila(i)
+
+    def fila(self, i: int) -> Resultado:
+        """Materializa una fila como resultado inmutable (enteros de Python)"""
+        return TIPOS_POR_MODO[self.modo](**{c: columna[i].item() for c, columna in self.columnas.items()})
+
+    def a_dicts(self) -> list:
+        """Lista de diccionarios (formato de la API JSON); construye todas las filas"""
+        campos = CAMPOS_POR_MODO[self.modo]
+        valores = [self.columnas[c].tolist() for c in campos]
+        return [dict(zip(campos, fila)) for fila in zip(*valores)]
+
+    def a_dataframe(self):
+        import pandas as pd
+        return pd.DataFrame(self.columnas, copy=False)
+
+    @property
+    def nbytes(self) -> int:
+        """Memoria ocupada por los arreglos"""
+        return sum(columna.nbytes for columna in self.columnas.values())
@@ -1,15 +1,15 @@
 """
     Módulo de servicios para la calculadora de sueldos.
 """
-from DATA import data  
+from DATA import parametros
 
 def obtener_lista_afps() -> list:
     """Retorna la lista de nombres de AFPs ordenadas alfabéticamente"""
-    return sorted(list(data.TASAS_AFP.keys()))
+    return sorted(list(parametros.obtener_actual().tasas_afp.keys()))
 
 def obtener_tasa_afp(nombre_afp: str) -> float:
     """Retorna la tasa decimal asociada al nombre de la AFP"""
-    return data.TASAS_AFP.get(nombre_afp, 0.0)
+    return parametros.obtener_actual().tasas_afp.get(nombre_afp, 0.0)
 
 
 def formato_chile_sueldo(current_value: str) -> str:
@@ -22,14 +22,50 @@ def formato_chile_sueldo(current_value: str) -> str:
     
 def obtener_defaults_salud():
     """Retorna una tupla con (Valor UF Global, Plan Isapre Default)"""
-    return data.VALOR_UF_ACTUAL, data.DEFAULT_PLAN_ISAPRE_UF
+    params = parametros.obtener_actual()
+    return params.valor_uf, params.default_plan_isapre_uf
 
 def calcular_costo_isapre_pesos(plan_uf: str) -> str:
     """Convierte el plan UF a pesos y lo formatea"""
     try:
         # Reemplazar comas por puntos si el usuario usa decimales latinos
         valor_uf_float = float(plan_uf.replace(',', '.'))
-        total_pesos = int(valor_uf_float * data.VALOR_UF_ACTUAL)
+        total_pesos = int(valor_uf_float * parametros.obtener_actual().valor_uf)
         return f"$ {total_pesos:,}".replace(",", ".")
     except ValueError:
-        return "$ 0"
\ No newline at end of file
+        return "$ 0"
+
+# Valores aceptados en la columna 'imponible' de un CSV de bonos
+VALORES_IMPONIBLE = {"si": True, "sí": True, "s": True, "x": True, "1": True, "true": True, "imponible": True,
+                     "no": False, "n": False, "0": False, "false": False, "": False, "no imponible": False}
+
+def leer_bonos_csv(ruta: str):
+    """
+    Lee bonos desde un CSV con encabezado nombre, monto, imponible (separador ',' o ';').
+    Montos en pesos, con o sin puntos de miles. Retorna (bonos, errores); las filas
+    inválidas se omiten y se describen en `errores`.
+    """
+    import csv
+    with open(ruta, newline='', encoding='utf-8-sig') as f:
+        muestra = f.read(4096)
+        f.seek(0)
+        try:
+            dialecto = csv.Sniffer().sniff(muestra, delimiters=",;")
+        except csv.Error:
+            dialecto = csv.excel
+        lector = csv.DictReader(f, dialect=dialecto)
+        lector.fieldnames = [c.strip().lower() for c in lector.fieldnames or []]
+        if not {'nombre', 'monto'} <= set(lector.fieldnames):
+            raise ValueError("El CSV debe tener columnas 'nombre' y 'monto' (e 'imponible' opcional)")
+
+        bonos, errores = [], []
+        for linea, fila in enumerate(lector, start=2):
+            nombre = (fila.get('nombre') or '').strip()
+            # Mismo criterio que el formulario: puntos y comas son separadores de miles
+            monto_str = (fila.get('monto') or '').replace('$', '').strip().replace('.', '').replace(',', '')
+            imponible = VALORES_IMPONIBLE.get((fila.get('imponible') or 'si').strip().lower())
+            if not nombre or not monto_str.isdigit() or int(monto_str) <= 0 or imponible is None:
+                errores.append(f"Línea {linea}: {fila}")
+                continue
+            bonos.append({"nombre": nombre, "monto": int(monto_str), "imponible": imponible})
+    return bonos, errores
@@ -0,0 +1,334 @@
+# SERVICE/servidor.py
+"""
+    Servicio HTTP local (asyncio, sin dependencias externas) sobre el motor de cálculo.
+
+    Endpoints (JSON):
+        POST /liquido          {"sueldo_base": ..., "afp_nombre": ..., "bonos": [...]}  Base → Líquido
+        POST /base             {"sueldo_liquido": ..., ...}                           Líquido → Base
+        POST /lote/liquido     {"filas": [ {...}, {...} ]}
+        POST /lote/base        {"filas": [ {...}, {...} ]}
+        POST /recargar         Vuelve a cargar parámetros desde db_loader (sin reiniciar)
+        GET  /estado           Versión de parámetros y estado de conexión
+        GET  /estadisticas     Latencias p50/p90/p99 por endpoint, tamaño de los lotes y
+                               contadores del motor (con --stats)
+
+    Las consultas individuales que llegan casi al mismo tiempo se agrupan
+    (ventana de unos pocos milisegundos) y se calculan en un solo lote vectorizado.
+
+    Uso:  python main.py serve --port 8765
+"""
+import asyncio
+import functools
+import json
+import math
+import time
+from collections import deque
+from DATA import data, parametros
+from SERVICE import engine, instrumentacion, nomina
+
+VENTANA_MS_DEFAULT = 3.0
+MAX_LOTE_DEFAULT = 512
+MUESTRAS_LATENCIA = 2048
+SISTEMAS_SALUD = ("fonasa", "isapre")
+
+TEXTOS_ESTADO = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+                 500: "Internal Server Error"}
+
+
+def _es_numero(valor) -> bool:
+    """Número JSON finito: json.loads acepta NaN / Infinity y bool es subclase de int"""
+    return isinstance(valor, (int, float)) and not isinstance(valor, bool) and math.isfinite(valor)
+
+
+def _validar_datos(datos, modo: str) -> dict:
+    """Valida un diccionario de entrada; lanza ValueError con un mensaje legible"""
+    if not isinstance(datos, dict):
+        raise ValueError("Cada consulta debe ser un objeto JSON")
+    principal = "sueldo_base" if modo == "base_a_liquido" else "sueldo_liquido"
+    if not _es_numero(datos.get(principal)) or datos[principal] <= 0:
+        raise ValueError(f"'{principal}' debe ser un número mayor a 0")
+    for bono in datos.get('bonos', []):
+        if not isinstance(bono, dict) or not _es_numero(bono.get('monto')) or 'imponible' not in bono:
+            raise ValueError("Cada bono debe tener 'monto' numérico e 'imponible'")
+    for total in ('bonos_imponibles', 'bonos_no_imponibles', 'movilizacion'):
+        if total in datos and not _es_numero(datos[total]):
+            raise ValueError(f"'{total}' debe ser numérico")
+    if 'afp_nombre' in datos and (not isinstance(datos['afp_nombre'], str) or not datos['afp_nombre'].strip()):
+        raise ValueError("'afp_nombre' debe ser texto")
+    if datos.get('salud_sistema', 'fonasa') not in SISTEMAS_SALUD:
+        raise ValueError(f"'salud_sistema' debe ser uno de {', '.join(SISTEMAS_SALUD)}")
+    if 'salud_uf' in datos and (not _es_numero(datos['salud_uf']) or datos['salud_uf'] < 0):
+        raise ValueError("'salud_uf' debe ser un número mayor o igual a 0")
+    if datos.get('periodo'):
+        # El período debe existir en el histórico: se resuelve aquí y no dentro del lote agrupado
+        if not isinstance(datos['periodo'], str):
+            raise ValueError("'periodo' debe ser texto (AAAA-MM)")
+        try:
+            engine.parametros_de(datos)
+        except ValueError as e:
+            raise ValueError(f"'periodo' inválido: {e}") from None
+    return datos
+
+
+def _calcular_por_separado(lista_datos: list, modo: str) -> list:
+    """Calcula cada consulta por sí sola: [(resultado, None) | (None, excepción)]"""
+    salida = []
+    for datos in lista_datos:
+        try:
+            salida.append((nomina.calcular_lista_datos([datos], modo)[0], None))
+        except Exception as e:
+            salida.append((None, e))
+    return salida
+
+
+class EstadisticasLatencia:
+    """Últimas N latencias por endpoint, para percentiles"""
+
+    def __init__(self, muestras: int = MUESTRAS_LATENCIA):
+        self.muestras = muestras
+        self.latencias = {}
+        self.conteos = {}
+        self.tamanos_lote = deque(maxlen=muestras)
+
+    def registrar(self, endpoint: str, segundos: float):
+        self.latencias.setdefault(endpoint, deque(maxlen=self.muestras)).append(segundos)
+        self.conteos[endpoint] = self.conteos.get(endpoint, 0) + 1
+
+    @staticmethod
+    def _percentil(ordenadas: list, p: float) -> float:
+        indice = min(len(ordenadas) - 1, int(round(p / 100 * (len(ordenadas) - 1))))
+        return ordenadas[indice]
+
+    def resumen(self) -> dict:
+        endpoints = {}
+        for endpoint, valores in self.latencias.items():
+            ordenadas = sorted(valores)
+            endpoints[endpoint] = {
+                "consultas": self.conteos[endpoint],
+                "p50_ms": round(self._percentil(ordenadas, 50) * 1000, 3),
+                "p90_ms": round(self._percentil(ordenadas, 90) * 1000, 3),
+                "p99_ms": round(self._percentil(ordenadas, 99) * 1000, 3),
+            }
+        lotes = list(self.tamanos_lote)
+        return {
+            "endpoints": endpoints,
+            "lotes_agrupados": len(lotes),
+            "tamano_lote_promedio": round(sum(lotes) / len(lotes), 2) if lotes else 0,
+            "tamano_lote_maximo": max(lotes) if lotes else 0,
+        }
+
+
+class Agrupador:
+    """
+    Micro-batching: junta consultas individuales durante `ventana_ms` (o hasta `max_lote`)
+    y las calcula juntas con el motor vectorizado en un hilo aparte.
+    """
+
+    def __init__(self, modo: str, estadisticas: EstadisticasLatencia,
+                 ventana_ms: float = VENTANA_MS_DEFAULT, max_lote: int = MAX_LOTE_DEFAULT):
+        self.modo = modo
+        self.estadisticas = estadisticas
+        self.ventana_s = ventana_ms / 1000
+        self.max_lote = max_lote
+        self._pendientes = []
+        self._temporizador = None
+        self._tareas = set()  # El loop sólo guarda referencias débiles a las tareas
+
+    async def calcular(self, datos: dict) -> dict:
+        loop = asyncio.get_running_loop()
+        futuro = loop.create_future()
+        self._pendientes.append((datos, futuro))
+
+        if len(self._pendientes) >= self.max_lote:
+            self._despachar()
+        elif self._temporizador is None:
+            self._temporizador = loop.call_later(self.ventana_s, self._despachar)
+        return await futuro
+
+    def _despachar(self):
+        if self._temporizador is not None:
+            self._temporizador.cancel()
+            self._temporizador = None
+        grupo, self._pendientes = self._pendientes, []
+        if grupo:
+            tarea = asyncio.ensure_future(self._procesar(grupo))
+            self._tareas.add(tarea)
+            tarea.add_done_callback(functools.partial(self._tarea_terminada, grupo))
+
+    def _tarea_terminada(self, grupo: list, tarea: asyncio.Task):
+        """Suelta la referencia a la tarea; si falló, ninguna consulta del grupo queda esperando"""
+        self._tareas.discard(tarea)
+        if tarea.cancelled():
+            for _, futuro in grupo:
+                futuro.cancel()
+            return
+        error = tarea.exception()
+        if error is None:
+            return
+        print(f"❌ Error procesando un lote agrupado: {error}")
+        for _, futuro in grupo:
+            if not futuro.done():
+                futuro.set_exception(error)
+
+    async def _procesar(self, grupo: list):
+        loop = asyncio.get_running_loop()
+        self.estadisticas.tamanos_lote.append(len(grupo))
+        lista_datos = [d for d, _ in grupo]
+        try:
+            resultados = await loop.run_in_executor(None, nomina.calcular_lista_datos, lista_datos, self.modo)
+            resultados = [(resultado, None) for resultado in resultados]
+        except Exception:
+            # Una consulta inválida no debe hacer fallar a las demás del grupo:
+            # se recalcula cada una por separado y sólo la culpable recibe el error
+            resultados = await loop.run_in_executor(None, _calcular_por_separado, lista_datos, self.modo)
+        for (_, futuro), (resultado, error) in zip(grupo, resultados):
+            if futuro.done():
+                continue
+            if error is not None:
+                futuro.set_exception(error)
+            else:
+                futuro.set_result(resultado)
+
+
+class ServidorCalculo:
+    """Servidor HTTP/1.1 mínimo sobre asyncio.start_server"""
+
+    def __init__(self, host: str = "127.0.0.1", puerto: int = 8765,
+                 ventana_ms: float = VENTANA_MS_DEFAULT, max_lote: int = MAX_LOTE_DEFAULT,
+                 recargar_callback=None):
+        self.host = host
+        self.puerto = puerto
+        self.estadisticas = EstadisticasLatencia()
+        self.agrupadores = {
+            "base_a_liquido": Agrupador("base_a_liquido", self.estadisticas, ventana_ms, max_lote),
+            "liquido_a_base": Agrupador("liquido_a_base", self.estadisticas, ventana_ms, max_lote),
+        }
+        self.recargar_callback = recargar_callback
+        self._servidor = None
+
+    # --- Rutas ---
+
+    async def _individual(self, modo: str, cuerpo):
+        return await self.agrupadores[modo].calcular(_validar_datos(cuerpo, modo))
+
+    async def _lote(self, modo: str, cuerpo):
+        filas = cuerpo.get('filas') if isinstance(cuerpo, dict) else None
+        if not isinstance(filas, list):
+            raise ValueError("Se esperaba {'filas': [...]}")
+        filas = [_validar_datos(f, modo) for f in filas]
+        loop = asyncio.get_running_loop()
+        resultados = await loop.run_in_executor(None, nomina.calcular_lista_datos, filas, modo)
+        return {"resultados": resultados}
+
+    async def _recargar(self, _cuerpo):
+        if self.recargar_callback is None:
+            raise ValueError("Recarga no configurada")
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.recargar_callback)
+        return self._estado(None)
+
+    def _estado(self, _cuerpo):
+        params = parametros.obtener_actual()
+        return {
+            "version_parametros": params.version,
+            "hash_parametros": params.hash,
+            "valor_uf": params.valor_uf,
+            "estado_conexion": data.ESTADO_CONEXION,
+        }
+
+    async def _despachar(self, metodo: str, ruta: str, cuerpo):
+        rutas_post = {
+            "/liquido": lambda c: self._individual("base_a_liquido", c),
+            "/base": lambda c: self._individual("liquido_a_base", c),
+            "/lote/liquido": lambda c: self._lote("base_a_liquido", c),
+            "/lote/base": lambda c: self._lote("liquido_a_base", c),
+            "/recargar": self._recargar,
+        }
+        rutas_get = {
+            "/estado": self._estado,
+            "/estadisticas": lambda c: {**self.estadisticas.resumen(), "motor": instrumentacion.estadisticas()},
+        }
+        if ruta in rutas_post:
+            if metodo != "POST":
+                return 405, {"error": "Use POST"}
+            return 200, await rutas_post[ruta](cuerpo)
+        if ruta in rutas_get:
+            if metodo != "GET":
+                return 405, {"error": "Use GET"}
+            return 200, rutas_get[ruta](cuerpo)
+        return 404, {"error": f"Ruta desconocida: {ruta}"}
+
+    # --- Protocolo HTTP ---
+
+    async def _atender(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                linea = await reader.readline()
+                if not linea:
+                    break
+                metodo, ruta, _version = linea.decode('latin-1').split(' ', 2)
+                ruta = ruta.split('?')[0]
+
+                cabeceras = {}
+                while True:
+                    cabecera = await reader.readline()
+                    if cabecera in (b'\r\n', b'\n', b''):
+                        break
+                    nombre, _, valor = cabecera.decode('latin-1').partition(':')
+                    cabeceras[nombre.strip().lower()] = valor.strip()
+
+                largo = int(cabeceras.get('content-length', 0))
+                crudo = await reader.readexactly(largo) if largo else b''
+
+                inicio = time.perf_counter()
+                try:
+                    cuerpo = json.loads(crudo) if crudo else {}
+                    estado, respuesta = await self._despachar(metodo, ruta, cuerpo)
+                except (ValueError, KeyError, TypeError) as e:
+                    estado, respuesta = 400, {"error": str(e)}
+                except Exception as e:
+                    print(f"❌ Error interno en {ruta}: {e}")
+                    estado, respuesta = 500, {"error": str(e)}
+                self.estadisticas.registrar(ruta, time.perf_counter() - inicio)
+
+                payload = json.dumps(respuesta, ensure_ascii=False).encode('utf-8')
+                mantener = cabeceras.get('connection', '').lower() != 'close'
+                writer.write(
+                    f"HTTP/1.1 {estado} {TEXTOS_ESTADO.get(estado, '')}\r\n"
+                    f"Content-Type: application/json; charset=utf-8\r\n"
+                    f"Content-Length: {len(payload)}\r\n"
+                    f"Connection: {'keep-alive' if mantener else 'close'}\r\n\r\n".encode('latin-1') + payload
+                )
+                await writer.drain()
+                if not mantener:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def iniciar(self):
+        self._servidor = await asyncio.start_server(self._atender, self.host, self.puerto)
+        self.puerto = self._servidor.sockets[0].getsockname()[1]
+        print(f"🌐 Servicio de cálculo escuchando en http://{self.host}:{self.puerto}")
+        return self
+
+    async def detener(self):
+        if self._servidor is not None:
+            self._servidor.close()
+            await self._servidor.wait_closed()
+
+    async def servir_para_siempre(self):
+        await self.iniciar()
+        async with self._servidor:
+            await self._servidor.serve_forever()
+
+
+def ejecutar(host: str = "127.0.0.1", puerto: int = 8765, ventana_ms: float = VENTANA_MS_DEFAULT,
+             max_lote: int = MAX_LOTE_DEFAULT, recargar_callback=None):
+    """Punto de entrada bloqueante (Ctrl+C para detener)"""
+    servidor = ServidorCalculo(host, puerto, ventana_ms, max_lote, recargar_callback)
+    try:
+        asyncio.run(servidor.servir_para_siempre())
+    except KeyboardInterrupt:
+        print("🛑 Servicio detenido")
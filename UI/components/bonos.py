@@ -1,18 +1,27 @@
 import customtkinter as ctk
-from tkinter import messagebox
+from tkinter import messagebox, filedialog, ttk
+from SERVICE import services
 
 class BonosFrame(ctk.CTkFrame):
-    def __init__(self, parent, lista_bonos_ref, callback_formato=None):
+    def __init__(self, parent, lista_bonos_ref, callback_formato=None, al_cambiar=None):
         super().__init__(parent, corner_radius=15)
         self.lista_bonos = lista_bonos_ref
-        self.callback_formato = callback_formato 
+        self.callback_formato = callback_formato
+        self.al_cambiar = al_cambiar  # Se llama cada vez que la lista de bonos cambia
+
+        # Totales acumulados: se ajustan en cada alta/edición/baja (nunca se re-suma la lista)
+        self.total_imponible = 0
+        self.total_no_imponible = 0
+        self._bonos = {}          # iid de la fila -> bono (el mismo dict que está en lista_bonos)
+        self._editando = None     # iid del bono cargado en el formulario para editar
+
         # Variables locales
         self.bono_nombre_var = ctk.StringVar()
         self.bono_monto_var = ctk.StringVar(value="")
         self.bono_imponible_var = ctk.BooleanVar(value=True)
-        
+
         self._crear_interfaz()
-    
+
     def _crear_interfaz(self):
         """Crea la sección de bonos"""
         # Título
@@ -22,30 +31,30 @@ class BonosFrame(ctk.CTkFrame):
             font=ctk.CTkFont(size=18, weight="bold"),
             anchor="w"
         ).pack(pady=(15, 10), padx=20, fill='x')
-        
+
         # Formulario
         form_frame = ctk.CTkFrame(self, fg_color="transparent")
         form_frame.pack(fill='x', padx=20, pady=(0, 10))
-        
+
         # Grid de inputs
         input_grid = ctk.CTkFrame(form_frame, fg_color="transparent")
         input_grid.pack(fill='x', pady=(0, 10))
-        
+
         # Nombre
         ctk.CTkLabel(input_grid, text="Nombre:", font=ctk.CTkFont(size=12)).grid(
             row=0, column=0, padx=(0, 5), sticky='w')
         ctk.CTkEntry(
-            input_grid, 
+            input_grid,
             textvariable=self.bono_nombre_var,
             width=150,
             height=35,
             placeholder_text="Ej: Producción"
         ).grid(row=0, column=1, padx=5)
-        
+
         # Monto
         ctk.CTkLabel(input_grid, text="Monto:", font=ctk.CTkFont(size=12)).grid(
             row=0, column=2, padx=(15, 5), sticky='w')
-        
+
         self.entry_monto = ctk.CTkEntry(
             input_grid,
             textvariable=self.bono_monto_var,
@@ -57,26 +66,18 @@ class BonosFrame(ctk.CTkFrame):
 
         self.entry_monto.bind('<KeyRelease>', self._al_escribir_monto)
 
-        # ctk.CTkEntry(
-        #     input_grid,
-        #     textvariable=self.bono_monto_var,
-        #     width=120,
-        #     height=35,
-        #     placeholder_text="$ 0"
-        # ).grid(row=0, column=3, padx=5)
-        
-        # Checkbox y botón
+        # Checkbox y botones
         control_frame = ctk.CTkFrame(form_frame, fg_color="transparent")
         control_frame.pack(fill='x')
-        
+
         ctk.CTkCheckBox(
             control_frame,
             text="Imponible",
             variable=self.bono_imponible_var,
             font=ctk.CTkFont(size=12)
         ).pack(side='left', padx=(0, 10))
-        
-        ctk.CTkButton(
+
+        self.btn_agregar = ctk.CTkButton(
             control_frame,
             text="Agregar",
             width=100,
@@ -85,34 +86,67 @@ class BonosFrame(ctk.CTkFrame):
             hover_color=("#229954", "#1e8449"),
             font=ctk.CTkFont(size=12, weight="bold"),
             command=self._agregar_bono_interno
-        ).pack(side='left')
-        
-        # Lista de bonos (Textbox)
+        )
+        self.btn_agregar.pack(side='left')
+
+        ctk.CTkButton(
+            control_frame,
+            text="Importar CSV",
+            width=110,
+            height=35,
+            fg_color=("#2980b9", "#1a5276"),
+            font=ctk.CTkFont(size=12, weight="bold"),
+            command=self._importar_csv
+        ).pack(side='left', padx=(10, 0))
+
+        # Lista de bonos: Treeview (sólo dibuja las filas visibles; cientos de bonos no pesan)
         ctk.CTkLabel(
             self,
-            text="Bonos agregados:",
+            text="Bonos agregados (doble clic para editar):",
             font=ctk.CTkFont(size=12, weight="bold"),
             anchor="w"
         ).pack(pady=(10, 5), padx=20, fill='x')
-        
-        self.bonos_textbox = ctk.CTkTextbox(
-            self,
-            height=100,
-            font=ctk.CTkFont(size=12),
-            corner_radius=10
+
+        lista_frame = ctk.CTkFrame(self, fg_color="transparent")
+        lista_frame.pack(fill='x', padx=20, pady=(0, 5))
+
+        estilo = ttk.Style(self)
+        estilo.configure("Bonos.Treeview", background="#2b2b2b", fieldbackground="#2b2b2b",
+                         foreground="white", rowheight=24, borderwidth=0)
+        estilo.configure("Bonos.Treeview.Heading", background="#1f6aa5", foreground="white", relief="flat")
+        estilo.map("Bonos.Treeview", background=[("selected", "#1f6aa5")])
+
+        self.tabla_bonos = ttk.Treeview(
+            lista_frame, columns=("nombre", "monto", "tipo"), show="headings",
+            height=5, style="Bonos.Treeview", selectmode="extended"
         )
-        self.bonos_textbox.pack(fill='x', padx=20, pady=(0, 10))
-        self.bonos_textbox.configure(state="disabled") # Inicializar bloqueado
-        
+        self.tabla_bonos.heading("nombre", text="Nombre")
+        self.tabla_bonos.heading("monto", text="Monto")
+        self.tabla_bonos.heading("tipo", text="Tipo")
+        self.tabla_bonos.column("nombre", width=200)
+        self.tabla_bonos.column("monto", width=110, anchor='e')
+        self.tabla_bonos.column("tipo", width=110, anchor='center')
+        self.tabla_bonos.pack(side='left', fill='x', expand=True)
+        self.tabla_bonos.bind('<Double-1>', self._cargar_para_editar)
+
+        barra = ctk.CTkScrollbar(lista_frame, command=self.tabla_bonos.yview)
+        barra.pack(side='right', fill='y')
+        self.tabla_bonos.configure(yscrollcommand=barra.set)
+
+        # Totales acumulados
+        self.lbl_totales = ctk.CTkLabel(self, text="", font=ctk.CTkFont(size=12), anchor="w")
+        self.lbl_totales.pack(padx=20, pady=(0, 5), fill='x')
+        self._actualizar_totales()
+
         # Botón eliminar
         ctk.CTkButton(
             self,
-            text="Eliminar Último Bono",
+            text="Eliminar Seleccionados (o el último)",
             fg_color=("#c0392b", "#a93226"),
             hover_color=("#a93226", "#922b21"),
             height=35,
             font=ctk.CTkFont(size=12, weight="bold"),
-            command=self._eliminar_ultimo_bono
+            command=self._eliminar_bonos
         ).pack(pady=(0, 15), padx=20, fill='x')
 
     def _al_escribir_monto(self, event):
@@ -121,47 +155,135 @@ class BonosFrame(ctk.CTkFrame):
             nuevo_valor = self.callback_formato(self.bono_monto_var.get())
             self.bono_monto_var.set(nuevo_valor)
 
+    # --- Totales ---
+
+    def totales(self) -> dict:
+        """Totales precalculados, con las mismas claves que usa el motor"""
+        return {"bonos_imponibles": self.total_imponible, "bonos_no_imponibles": self.total_no_imponible}
+
+    def _sumar(self, bono, signo=1):
+        if bono['imponible']:
+            self.total_imponible += signo * bono['monto']
+        else:
+            self.total_no_imponible += signo * bono['monto']
+
+    def _actualizar_totales(self):
+        self.lbl_totales.configure(
+            text=f"{len(self._bonos)} bonos | Imponibles: $ {self.total_imponible:,} | "
+                 f"No imponibles: $ {self.total_no_imponible:,}".replace(",", "."))
+
+    def _notificar_cambio(self):
+        self._actualizar_totales()
+        if self.al_cambiar:
+            self.al_cambiar()
+
+    # --- Alta, edición y baja ---
+
+    @staticmethod
+    def _valores_fila(bono):
+        tipo = "IMPONIBLE" if bono['imponible'] else "NO IMPONIBLE"
+        return (bono['nombre'], f"${bono['monto']:,}".replace(",", "."), tipo)
+
+    def _insertar(self, bono):
+        iid = self.tabla_bonos.insert("", "end", values=self._valores_fila(bono))
+        self._bonos[iid] = bono
+        self.lista_bonos.append(bono)
+        self._sumar(bono)
+        return iid
+
+    def agregar_bonos(self, bonos):
+        """Agrega varios bonos de una vez (una sola notificación de cambio)"""
+        for bono in bonos:
+            self._insertar(bono)
+        self._notificar_cambio()
+
     def _agregar_bono_interno(self):
-        """Valida y agrega un bono a la lista"""
+        """Valida y agrega un bono a la lista (o guarda la edición en curso)"""
         nombre = self.bono_nombre_var.get().strip()
         monto_str = self.bono_monto_var.get().replace('.', '').replace(',', '')
         es_imponible = self.bono_imponible_var.get()
-        
+
         if not nombre:
             messagebox.showwarning("Datos", "Falta el nombre del bono.")
             return
-            
+
         if not monto_str.isdigit() or int(monto_str) <= 0:
             messagebox.showwarning("Datos", "Monto inválido.")
             return
 
         monto = int(monto_str)
-        
-        self.lista_bonos.append({
-            "nombre": nombre,
-            "monto": monto,
-            "imponible": es_imponible
-        })
-        
-        self._actualizar_textbox_bonos()
-        
-        # Limpiar campos
+
+        if self._editando is not None and self._editando in self._bonos:
+            # Edición en el lugar: se descuenta el valor anterior y se suma el nuevo
+            bono = self._bonos[self._editando]
+            self._sumar(bono, -1)
+            bono.update({"nombre": nombre, "monto": monto, "imponible": es_imponible})
+            self._sumar(bono)
+            self.tabla_bonos.item(self._editando, values=self._valores_fila(bono))
+        else:
+            self._insertar({
+                "nombre": nombre,
+                "monto": monto,
+                "imponible": es_imponible
+            })
+
+        self._limpiar_formulario()
+        self._notificar_cambio()
+
+    def _cargar_para_editar(self, event=None):
+        """Doble clic: lleva el bono al formulario; 'Guardar' lo reemplaza en su misma fila"""
+        seleccion = self.tabla_bonos.selection()
+        if not seleccion:
+            return
+        self._editando = seleccion[0]
+        bono = self._bonos[self._editando]
+        self.bono_nombre_var.set(bono['nombre'])
+        self.bono_monto_var.set(f"{bono['monto']:,}".replace(",", "."))
+        self.bono_imponible_var.set(bono['imponible'])
+        self.btn_agregar.configure(text="Guardar")
+
+    def _limpiar_formulario(self):
+        self._editando = None
+        self.btn_agregar.configure(text="Agregar")
         self.bono_nombre_var.set("")
         self.bono_monto_var.set("")
         self.bono_imponible_var.set(True)
 
-    def _eliminar_ultimo_bono(self):
-        if self.lista_bonos:
-            self.lista_bonos.pop()
-            self._actualizar_textbox_bonos()
-
-    def _actualizar_textbox_bonos(self):
-        self.bonos_textbox.configure(state="normal")
-        self.bonos_textbox.delete("1.0", "end")
-        
-        for i, bono in enumerate(self.lista_bonos, 1):
-            tipo = "IMPONIBLE" if bono['imponible'] else "NO IMPONIBLE"
-            texto = f"{i}. {bono['nombre']} | ${bono['monto']:,}".replace(",", ".") + f" | {tipo}\n"
-            self.bonos_textbox.insert("end", texto)
-            
-        self.bonos_textbox.configure(state="disabled")
\ No newline at end of file
+    def _eliminar_bonos(self):
+        """Elimina las filas seleccionadas; sin selección, el último bono (como antes)"""
+        seleccion = self.tabla_bonos.selection()
+        if not seleccion:
+            hijos = self.tabla_bonos.get_children()
+            seleccion = hijos[-1:]
+        if not seleccion:
+            return
+
+        borrados = set()
+        for iid in seleccion:
+            bono = self._bonos.pop(iid)
+            self._sumar(bono, -1)
+            borrados.add(id(bono))
+        self.tabla_bonos.delete(*seleccion)
+        # Una sola pasada sobre la lista compartida, sin importar cuántos se borren
+        self.lista_bonos[:] = [b for b in self.lista_bonos if id(b) not in borrados]
+
+        if self._editando in seleccion:
+            self._limpiar_formulario()
+        self._notificar_cambio()
+
+    def _importar_csv(self):
+        """Carga masiva desde un CSV con columnas nombre, monto, imponible"""
+        ruta = filedialog.askopenfilename(
+            title="Importar bonos", filetypes=[("CSV", "*.csv"), ("Todos", "*.*")])
+        if not ruta:
+            return
+        try:
+            bonos, errores = services.leer_bonos_csv(ruta)
+        except Exception as e:
+            messagebox.showerror("Importar bonos", f"❌ No se pudo leer el archivo:\n{e}")
+            return
+        self.agregar_bonos(bonos)
+        if errores:
+            detalle = "\n".join(errores[:10]) + ("\n..." if len(errores) > 10 else "")
+            messagebox.showwarning("Importar bonos", f"Se importaron {len(bonos)} bonos. "
+                                                     f"{len(errores)} filas omitidas:\n{detalle}")
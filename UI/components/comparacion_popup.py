@@ -0,0 +1,107 @@
+import customtkinter as ctk
+from tkinter import ttk
+
+# Columnas de la tabla: (clave, título, ancho)
+COLUMNAS = [
+    ("afp_nombre", "AFP", 90),
+    ("salud", "Salud", 110),
+    ("sueldo_base", "Sueldo Base", 105),
+    ("sueldo_liquido", "Líquido", 105),
+    ("cotizacion_previsional", "AFP $", 90),
+    ("cotizacion_salud", "Salud $", 90),
+    ("impuesto", "Impuesto", 90),
+    ("diferencia_actual", "Δ vs elegido", 105),
+]
+
+
+def _formato_pesos(valor) -> str:
+    return f"$ {valor:,}".replace(",", ".")
+
+
+def _formato_diferencia(valor) -> str:
+    signo = "+" if valor > 0 else "-" if valor < 0 else ""
+    return signo + _formato_pesos(abs(valor))
+
+
+class ComparacionPopup(ctk.CTkToplevel):
+    def __init__(self, parent):
+        """
+        Tabla de comparación AFP × salud. Se crea una sola vez; cada comparación
+        nueva reemplaza las filas (mostrar) y cerrar la ventana sólo la oculta.
+        """
+        super().__init__(parent)
+        self.title("Comparación de Escenarios")
+        self.geometry("860x560")
+        self.protocol("WM_DELETE_WINDOW", self.withdraw)
+        self._crear_interfaz()
+
+    def _crear_interfaz(self):
+        header = ctk.CTkFrame(self, fg_color=("#8e44ad", "#6c3483"), corner_radius=0)
+        header.pack(fill='x', pady=(0, 10))
+        self.lbl_header = ctk.CTkLabel(header, text="", font=ctk.CTkFont(size=20, weight="bold"),
+                                       text_color="white")
+        self.lbl_header.pack(pady=15)
+
+        self.lbl_resumen = ctk.CTkLabel(self, text="", font=ctk.CTkFont(size=13), anchor="w", justify="left")
+        self.lbl_resumen.pack(fill='x', padx=20, pady=(0, 10))
+
+        tabla_frame = ctk.CTkFrame(self, fg_color="transparent")
+        tabla_frame.pack(fill='both', expand=True, padx=20)
+
+        estilo = ttk.Style(self)
+        estilo.configure("Comparacion.Treeview", background="#2b2b2b", fieldbackground="#2b2b2b",
+                         foreground="white", rowheight=26, borderwidth=0)
+        estilo.configure("Comparacion.Treeview.Heading", background="#6c3483", foreground="white", relief="flat")
+
+        self.tabla = ttk.Treeview(tabla_frame, columns=[c for c, _, _ in COLUMNAS], show="headings",
+                                  style="Comparacion.Treeview")
+        for clave, titulo, ancho in COLUMNAS:
+            self.tabla.heading(clave, text=titulo)
+            self.tabla.column(clave, width=ancho, anchor='w' if clave in ("afp_nombre", "salud") else 'e')
+        self.tabla.tag_configure("elegido", background="#1f6aa5")
+        self.tabla.tag_configure("mejor", foreground="#2ecc71")
+        self.tabla.pack(side='left', fill='both', expand=True)
+
+        barra = ctk.CTkScrollbar(tabla_frame, command=self.tabla.yview)
+        barra.pack(side='right', fill='y')
+        self.tabla.configure(yscrollcommand=barra.set)
+
+        ctk.CTkButton(self, text="Cerrar Ventana", command=self.withdraw,
+                      fg_color="gray", hover_color="darkgray", height=35).pack(pady=10)
+
+    def mostrar(self, comparacion, elegido=None):
+        """
+        Carga una Comparacion (SERVICE/comparacion.py). `elegido` es el índice de la
+        combinación del formulario: se resalta y las diferencias se miden contra ella.
+        """
+        filas = comparacion.filas()
+        mejor = comparacion.mejor()
+        clave_delta = "sueldo_liquido" if comparacion.modo == "base_a_liquido" else "sueldo_base"
+        referencia = filas[elegido][clave_delta] if elegido is not None else None
+
+        if comparacion.modo == "base_a_liquido":
+            self.lbl_header.configure(text="COMPARACIÓN: BASE → LÍQUIDO")
+            entrada = f"Sueldo base {_formato_pesos(filas[0]['sueldo_base'])}"
+        else:
+            self.lbl_header.configure(text="COMPARACIÓN: LÍQUIDO → BASE")
+            entrada = f"Líquido objetivo {_formato_pesos(filas[0]['sueldo_liquido'] - filas[0]['diferencia'])}"
+        self.lbl_resumen.configure(
+            text=f"{entrada} en {len(filas)} combinaciones. "
+                 f"Más conveniente: {filas[mejor]['afp_nombre']} / {filas[mejor]['salud']}")
+
+        self.tabla.delete(*self.tabla.get_children())
+        for i, fila in enumerate(filas):
+            valores = []
+            for clave, _, _ in COLUMNAS:
+                if clave == "diferencia_actual":
+                    valores.append("" if referencia is None else _formato_diferencia(fila[clave_delta] - referencia))
+                elif clave in ("afp_nombre", "salud"):
+                    valores.append(fila[clave])
+                else:
+                    valores.append(_formato_pesos(fila[clave]))
+            etiquetas = tuple(t for t, activa in (("elegido", i == elegido), ("mejor", i == mejor)) if activa)
+            self.tabla.insert("", "end", values=valores, tags=etiquetas)
+
+        self.deiconify()
+        self.lift()
+        self.focus()
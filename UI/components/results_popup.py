@@ -1,169 +1,229 @@
 import customtkinter as ctk
+from collections import deque
+
+# Cálculos recientes que se muestran lado a lado en el historial
+HISTORIAL_MAXIMO = 5
+
+# Estilos de fila: (tamaño de letra, peso, color del valor)
+ESTILOS = {
+    "principal": (16, "bold", ("#1a5f2a", "#2ecc71")),   # Verde destacado
+    "entrada": (14, "bold", ("#7f8c8d", "#95a5a6")),     # Gris para entrada
+    "total": (14, "bold", ("#2980b9", "#3498db")),       # Azul
+    "descuento": (14, "bold", ("#c0392b", "#e74c3c")),   # Rojo
+    "normal": (13, "normal", ("gray20", "gray80")),
+}
+
+# Filas del detalle: (clave, título, estilo, sólo si es mayor a 0); None es un separador
+ENCABEZADO_POR_MODO = {
+    "base_a_liquido": [
+        ("sueldo_base", "Sueldo Base (entrada):", "entrada", False),
+        None,
+        ("sueldo_liquido", "SUELDO LÍQUIDO:", "principal", False),
+    ],
+    "liquido_a_base": [
+        ("liquido_objetivo", "Líquido Objetivo (entrada):", "entrada", False),
+        None,
+        ("sueldo_base", "SUELDO BASE:", "principal", False),
+    ],
+}
+FILAS_DETALLE = [
+    None,
+    # --- DETALLE DE HABERES ---
+    ("gratificacion", "Gratificación:", "normal", False),
+    ("bonos_imponibles", "Bonos Imponibles:", "normal", True),
+    ("imponible", "Total Haberes Imponibles:", "total", False),
+    ("movilizacion", "Movilización:", "normal", False),
+    ("bonos_no_imponibles", "Bonos No Imponibles:", "normal", True),
+    ("total_haberes", "Total Haberes:", "total", False),
+    None,
+    # --- DETALLE DE DESCUENTOS ---
+    ("cotizacion_previsional", "Cotización Previsional (AFP):", "normal", False),
+    ("cotizacion_salud", "Cotización Salud:", "normal", False),
+    ("cesantia", "Seguro Cesantía:", "normal", False),
+    ("impuesto", "Impuesto Único:", "normal", False),
+    ("total_descuentos", "Total Descuentos:", "descuento", False),
+    None,
+]
+
+# Filas del historial: (título, clave)
+FILAS_HISTORIAL = [
+    ("Entrada", "entrada"),
+    ("Sueldo Base", "sueldo_base"),
+    ("Sueldo Líquido", "sueldo_liquido"),
+    ("Descuentos", "total_descuentos"),
+    ("Impuesto", "impuesto"),
+]
+
+HEADER_POR_MODO = {
+    "base_a_liquido": (("#2980b9", "#1a5276"), "CÁLCULO: BASE → LÍQUIDO"),   # Azul
+    "liquido_a_base": (("#27ae60", "#229954"), "CÁLCULO: LÍQUIDO → BASE"),   # Verde
+}
+
+
+def _formato_pesos(valor) -> str:
+    return f"$ {valor:,}".replace(",", ".")
+
 
 class ResultadosPopup(ctk.CTkToplevel):
-    def __init__(self, parent, resultados: dict, modo: str = "liquido_a_base"):
+    def __init__(self, parent, resultados: dict = None, modo: str = "liquido_a_base",
+                 historial_maximo: int = HISTORIAL_MAXIMO):
         """
-        Crea una ventana flotante independiente con los resultados.
-        
+        Ventana de resultados reutilizable: se crea una sola vez y cada cálculo
+        actualiza sus filas en el lugar (mostrar). Cerrarla sólo la oculta.
+
         Args:
             parent: Ventana padre
-            resultados: Diccionario con los resultados del cálculo
+            resultados: Diccionario con los resultados del cálculo (opcional)
             modo: "liquido_a_base" o "base_a_liquido"
+            historial_maximo: Cálculos recientes que se muestran lado a lado
         """
         super().__init__(parent)
-        
-        self.modo = modo
+
+        self.modo = None
         self.title("Resultado del Cálculo")
-        self.geometry("450x620")
-        
-        self._crear_interfaz(resultados)
-
-    def _crear_interfaz(self, resultados):
-        # --- Header con color según modo ---
-        if self.modo == "base_a_liquido":
-            color_header = ("#2980b9", "#1a5276")  # Azul para Base→Líquido
-            titulo_header = "CÁLCULO: BASE → LÍQUIDO"
-        else:
-            color_header = ("#27ae60", "#229954")  # Verde para Líquido→Base
-            titulo_header = "CÁLCULO: LÍQUIDO → BASE"
-            
-        header = ctk.CTkFrame(self, fg_color=color_header, corner_radius=0)
-        header.pack(fill='x', pady=(0, 20))
-        
-        ctk.CTkLabel(
-            header, 
-            text=titulo_header, 
+        self.geometry("900x620")
+        self.protocol("WM_DELETE_WINDOW", self.withdraw)
+
+        self.historial = deque(maxlen=historial_maximo)
+        self._paneles = {}  # modo -> (frame, {clave: (fila, label_valor, opcional)})
+
+        self._crear_interfaz()
+        if resultados is not None:
+            self.mostrar(resultados, modo)
+
+    def _crear_interfaz(self):
+        # --- Header (color y título cambian con el modo) ---
+        self.header = ctk.CTkFrame(self, corner_radius=0)
+        self.header.pack(fill='x', pady=(0, 20))
+
+        self.lbl_header = ctk.CTkLabel(
+            self.header,
+            text="",
             font=ctk.CTkFont(size=20, weight="bold"),
             text_color="white"
-        ).pack(pady=15)
-
-        # --- Cuerpo Scrollable ---
-        self.info_frame = ctk.CTkScrollableFrame(self, fg_color="transparent")
-        self.info_frame.pack(fill='both', expand=True, padx=20, pady=(0, 20))
-
-        # --- SECCIÓN PRINCIPAL según modo ---
-        if self.modo == "base_a_liquido":
-            # Primero el BASE (dato de entrada)
-            self._crear_fila("Sueldo Base (entrada):", resultados['sueldo_base'], es_entrada=True)
-            self._crear_separador()
-            # Luego el LÍQUIDO (resultado principal)
-            self._crear_fila("SUELDO LÍQUIDO:", resultados['sueldo_liquido'], es_total=True, es_principal=True)
-        else:
-            # Primero el LÍQUIDO objetivo
-            self._crear_fila("Líquido Objetivo (entrada):", resultados.get('sueldo_liquido', 0) - resultados.get('diferencia', 0), es_entrada=True)
-            self._crear_separador()
-            # Luego el BASE (resultado principal)
-            self._crear_fila("SUELDO BASE:", resultados['sueldo_base'], es_total=True, es_principal=True)
-        
-        self._crear_separador()
-        
-        # --- DETALLE DE HABERES ---
-        self._crear_fila("Gratificación:", resultados['gratificacion'])
-        
-        if resultados.get('bonos_imponibles', 0) > 0:
-            self._crear_fila("Bonos Imponibles:", resultados['bonos_imponibles'])
-            
-        self._crear_fila("Total Haberes Imponibles:", resultados['imponible'], es_total=True)
-        
-        self._crear_fila("Movilización:", resultados.get('movilizacion', 0))
-        
-        if resultados.get('bonos_no_imponibles', 0) > 0:
-            self._crear_fila("Bonos No Imponibles:", resultados['bonos_no_imponibles'])
-
-        self._crear_fila("Total Haberes:", resultados['total_haberes'], es_total=True)
-        
-        self._crear_separador()
-        
-        # --- DETALLE DE DESCUENTOS ---
-        self._crear_fila('Cotización Previsional (AFP):', resultados.get('cotizacion_previsional', 0))
-        self._crear_fila('Cotización Salud:', resultados.get('cotizacion_salud', 0))
-        self._crear_fila("Seguro Cesantía:", resultados.get('cesantia', 0))
-        self._crear_fila("Impuesto Único:", resultados['impuesto'])
-        self._crear_fila("Total Descuentos:", resultados['total_descuentos'], es_descuento=True)
-        
-        self._crear_separador()
-        
-        # # --- RESULTADO FINAL (repetido para claridad) ---
-        # if self.modo == "base_a_liquido":
-        #     self._crear_fila("SUELDO LÍQUIDO FINAL:", resultados['sueldo_liquido'], es_total=True, es_principal=True)
-        # else:
-        #     self._crear_fila("SUELDO LÍQUIDO RESULTANTE:", resultados['sueldo_liquido'], es_total=True, es_principal=True)
-        #     # Mostrar diferencia si hay redondeo
-        #     diferencia = resultados.get('diferencia', 0)
-        #     if diferencia != 0:
-        #         self._crear_nota_diferencia(diferencia)
+        )
+        self.lbl_header.pack(pady=15)
+
+        cuerpo = ctk.CTkFrame(self, fg_color="transparent")
+        cuerpo.pack(fill='both', expand=True, padx=20, pady=(0, 10))
+
+        # --- Detalle (scrollable), un panel por modo ---
+        self.info_frame = ctk.CTkScrollableFrame(cuerpo, fg_color="transparent", width=400)
+        self.info_frame.pack(side='left', fill='both', expand=True, padx=(0, 10))
+
+        # --- Historial lado a lado ---
+        self._crear_historial(cuerpo)
 
         # --- Botón cerrar ---
         ctk.CTkButton(
-            self, 
-            text="Cerrar Ventana", 
-            command=self.destroy, 
+            self,
+            text="Cerrar Ventana",
+            command=self.withdraw,
             fg_color="gray",
             hover_color="darkgray",
             height=35
         ).pack(pady=10)
 
-    def _crear_fila(self, titulo, valor, es_total=False, es_descuento=False, es_principal=False, es_entrada=False):
-        """Helper interno para crear filas de datos"""
-        f = ctk.CTkFrame(self.info_frame, fg_color="transparent")
-        f.pack(fill='x', pady=2)
-        
-        # Determinar estilo según tipo
-        if es_principal:
-            font_size = 16
-            font_weight = "bold"
-            color_texto = ("#1a5f2a", "#2ecc71")  # Verde destacado
-        elif es_entrada:
-            font_size = 14
-            font_weight = "bold"
-            color_texto = ("#7f8c8d", "#95a5a6")  # Gris para entrada
-        elif es_total:
-            font_size = 14
-            font_weight = "bold"
-            color_texto = ("#2980b9", "#3498db")  # Azul
-        elif es_descuento:
-            font_size = 14
-            font_weight = "bold"
-            color_texto = ("#c0392b", "#e74c3c")  # Rojo
-        else:
-            font_size = 13
-            font_weight = "normal"
-            color_texto = ("gray20", "gray80")
-            
+    def _crear_panel(self, modo):
+        """Crea una sola vez las filas de un modo; después sólo se cambian sus textos"""
+        panel = ctk.CTkFrame(self.info_frame, fg_color="transparent")
+        panel.grid_columnconfigure(0, weight=1)
+        filas = {}
+        for i, spec in enumerate(ENCABEZADO_POR_MODO[modo] + FILAS_DETALLE):
+            if spec is None:
+                self._crear_separador(panel, i)
+                continue
+            clave, titulo, estilo, opcional = spec
+            filas[clave] = self._crear_fila(panel, i, titulo, estilo) + (opcional,)
+        self._paneles[modo] = (panel, filas)
+        return self._paneles[modo]
+
+    def _crear_fila(self, panel, row, titulo, estilo):
+        """Helper interno para crear filas de datos; retorna (fila, label del valor)"""
+        font_size, font_weight, color_texto = ESTILOS[estilo]
+        f = ctk.CTkFrame(panel, fg_color="transparent")
+        f.grid(row=row, column=0, sticky='ew', pady=2)
+
         ctk.CTkLabel(
-            f, 
-            text=titulo, 
-            font=ctk.CTkFont(size=font_size, weight=font_weight if es_principal else "normal")
+            f,
+            text=titulo,
+            font=ctk.CTkFont(size=font_size, weight=font_weight if estilo == "principal" else "normal")
         ).pack(side='left')
-        
-        val_fmt = f"$ {valor:,}".replace(",", ".")
-        ctk.CTkLabel(
-            f, 
-            text=val_fmt, 
+
+        lbl_valor = ctk.CTkLabel(
+            f,
+            text="",
             font=ctk.CTkFont(size=font_size, weight=font_weight),
             text_color=color_texto
-        ).pack(side='right')
-
-    def _crear_nota_diferencia(self, diferencia: int):
-        """Muestra la diferencia respecto al líquido objetivo (solo en modo inverso)"""
-        f = ctk.CTkFrame(self.info_frame, fg_color=("#fff3cd", "#3d3520"), corner_radius=8)
-        f.pack(fill='x', pady=(10, 5), padx=5)
-        
-        signo = "+" if diferencia > 0 else ""
-        dif_fmt = f"{signo}$ {diferencia:,}".replace(",", ".")
-        
-        if diferencia > 0:
-            texto = f"📈 Diferencia por redondeo: {dif_fmt}"
-        else:
-            texto = f"📉 Diferencia: {dif_fmt}"
-        
-        ctk.CTkLabel(
-            f,
-            text=texto,
-            font=ctk.CTkFont(size=11),
-            text_color=("#856404", "#ffc107"),
-            justify="left"
-        ).pack(pady=8, padx=10, anchor='w')
-
-    def _crear_separador(self):
-        ctk.CTkFrame(self.info_frame, height=2, fg_color="gray").pack(fill='x', pady=10)
+        )
+        lbl_valor.pack(side='right')
+        return f, lbl_valor
+
+    def _crear_historial(self, parent):
+        """Tabla fija: una columna por cálculo reciente (el más nuevo a la izquierda)"""
+        frame = ctk.CTkFrame(parent, corner_radius=10)
+        frame.pack(side='left', fill='y')
+
+        ctk.CTkLabel(frame, text="Historial", font=ctk.CTkFont(size=14, weight="bold")).grid(
+            row=0, column=0, columnspan=self.historial.maxlen + 1, pady=(10, 5))
+
+        self._celdas_modo = []
+        self._celdas_historial = {clave: [] for _, clave in FILAS_HISTORIAL}
+        for i, (titulo, _) in enumerate(FILAS_HISTORIAL, start=2):
+            ctk.CTkLabel(frame, text=titulo, font=ctk.CTkFont(size=12)).grid(row=i, column=0, padx=(10, 5), sticky='w')
+        for columna in range(1, self.historial.maxlen + 1):
+            celda = ctk.CTkLabel(frame, text="", font=ctk.CTkFont(size=12, weight="bold"))
+            celda.grid(row=1, column=columna, padx=5)
+            self._celdas_modo.append(celda)
+            for i, (_, clave) in enumerate(FILAS_HISTORIAL, start=2):
+                celda = ctk.CTkLabel(frame, text="", font=ctk.CTkFont(size=12), text_color=("gray20", "gray80"))
+                celda.grid(row=i, column=columna, padx=5, sticky='e')
+                self._celdas_historial[clave].append(celda)
+
+    def mostrar(self, resultados: dict, modo: str = "liquido_a_base"):
+        """Muestra un cálculo nuevo actualizando los textos de las filas existentes"""
+        if modo != self.modo:
+            if self.modo is not None:
+                self._paneles[self.modo][0].pack_forget()
+            panel, _ = self._paneles.get(modo) or self._crear_panel(modo)
+            panel.pack(fill='x')
+            color_header, titulo_header = HEADER_POR_MODO[modo]
+            self.header.configure(fg_color=color_header)
+            self.lbl_header.configure(text=titulo_header)
+            self.modo = modo
+
+        valores = {
+            **resultados,
+            "liquido_objetivo": resultados.get('sueldo_liquido', 0) - resultados.get('diferencia', 0),
+        }
+        for clave, (fila, lbl_valor, opcional) in self._paneles[modo][1].items():
+            valor = valores.get(clave, 0)
+            if opcional:
+                # grid_remove recuerda la posición: la fila vuelve a su lugar al reaparecer
+                if valor > 0:
+                    fila.grid()
+                else:
+                    fila.grid_remove()
+            lbl_valor.configure(text=_formato_pesos(valor))
+
+        self._agregar_al_historial(valores, modo)
+        self.deiconify()
+        self.lift()
+        self.focus()
+
+    def _agregar_al_historial(self, valores: dict, modo: str):
+        entrada = valores['sueldo_base'] if modo == "base_a_liquido" else valores['liquido_objetivo']
+        self.historial.appendleft({
+            **{clave: valores.get(clave, 0) for _, clave in FILAS_HISTORIAL},
+            "entrada": entrada,
+            "modo": "B → L" if modo == "base_a_liquido" else "L → B",
+        })
+        for columna in range(self.historial.maxlen):
+            calculo = self.historial[columna] if columna < len(self.historial) else None
+            self._celdas_modo[columna].configure(text=calculo['modo'] if calculo else "")
+            for _, clave in FILAS_HISTORIAL:
+                texto = _formato_pesos(calculo[clave]) if calculo else ""
+                self._celdas_historial[clave][columna].configure(text=texto)
+
+    def _crear_separador(self, panel, row):
+        ctk.CTkFrame(panel, height=2, fg_color="gray").grid(row=row, column=0, sticky='ew', pady=10)
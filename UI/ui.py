@@ -1,12 +1,22 @@
 import customtkinter as ctk
+from concurrent.futures import ThreadPoolExecutor
 from tkinter import messagebox 
 from typing import Callable, Optional, List
 from .components.results_popup import ResultadosPopup
+from .components.comparacion_popup import ComparacionPopup
 from .components.bonos import BonosFrame 
 from DATA import data
 import os
 import sys
 
+# Vista previa: espera tras la última tecla antes de recalcular, y frecuencia con que
+# el loop de Tk revisa si el cálculo en segundo plano terminó
+DEBOUNCE_VISTA_PREVIA_MS = 250
+REVISION_VISTA_PREVIA_MS = 30
+
+def _formato_pesos(valor) -> str:
+    return f"$ {valor:,}".replace(",", ".")
+
 class ConfigUI:
     
     def __init__(self):
@@ -20,16 +30,30 @@ class ConfigUI:
         self.formato_chile_sueldo_callback: Optional[Callable] = None
         self.calculo_isapre_callback: Optional[Callable] = None
         self.calcular_callback = None
+        self.comparar_callback = None
         self.cambio_afp_callback: Optional[Callable] = None
+        self.vista_previa_callback: Optional[Callable] = None  # datos -> resultado (corre fuera del hilo de Tk)
         
         self.lista_bonos = []
         
+        # Vista previa en vivo: un solo hilo de cálculo; cada pedido lleva un número de
+        # generación y las respuestas de generaciones anteriores se descartan
+        self._ejecutor_previa = ThreadPoolExecutor(max_workers=1, thread_name_prefix="vista-previa")
+        self._generacion_previa = 0
+        self._futuro_previa = None
+        self._after_previa = None
+        
+        # Ventanas de resultados y de comparación únicas: se reciclan en cada cálculo
+        self._popup_resultados: Optional[ResultadosPopup] = None
+        self._popup_comparacion: Optional[ComparacionPopup] = None
+        
         # Variables del formulario
         self.sueldo_var = ctk.StringVar()  # Variable única para el monto principal
         self.afp_seleccionada_var = ctk.StringVar(value="Uno")
         self.tasa_afp_actual_var = ctk.StringVar(value="10.49%")
         self.tipo_salud_var = ctk.StringVar(value="fonasa")
         self.valor_isapre_uf_var = ctk.StringVar(value="")
+        self._plan_isapre_default = ""
         self.movilizacion_var = ctk.StringVar(value="40.000")
         
         # NUEVA: Variable para el modo de cálculo
@@ -71,7 +95,8 @@ class ConfigUI:
         self.crear_seccion_entradas(scroll_frame)
         
         # 2. Componente de Bonos
-        self.bonos_component = BonosFrame(scroll_frame, self.lista_bonos, self._proxy_formato)
+        self.bonos_component = BonosFrame(scroll_frame, self.lista_bonos, self._proxy_formato,
+                                          al_cambiar=self.programar_vista_previa)
         self.bonos_component.pack(fill='x', pady=(0, 15))
         
         # 3. Botón Calcular
@@ -87,14 +112,25 @@ class ConfigUI:
         ctk.CTkLabel(inner_header, text="Calculadora de Sueldos",
                      font=ctk.CTkFont(size=24, weight="bold"), text_color="white").pack(side='left')
 
-        color_status = "#2ecc71" if data.ESTADO_CONEXION == "ONLINE" else "#e67e22"
-        
-        status_frame = ctk.CTkFrame(inner_header, fg_color=color_status, corner_radius=20)
-        status_frame.pack(side='right')
-        
-        ctk.CTkLabel(status_frame, text=data.MENSAJE_ESTADO, 
-                     font=ctk.CTkFont(size=12, weight="bold"), 
-                     text_color="white").pack(padx=15, pady=5)
+        self.status_frame = ctk.CTkFrame(inner_header, corner_radius=20)
+        self.status_frame.pack(side='right')
+        
+        self.status_label = ctk.CTkLabel(self.status_frame, text="",
+                                         font=ctk.CTkFont(size=12, weight="bold"), 
+                                         text_color="white")
+        self.status_label.pack(padx=15, pady=5)
+        self.actualizar_estado_conexion()
+
+    def actualizar_estado_conexion(self):
+        """Refresca el badge del header con data.ESTADO_CONEXION / data.MENSAJE_ESTADO"""
+        if data.ESTADO_CONEXION == "ONLINE":
+            color_status = "#2ecc71"
+        elif data.ESTADO_CONEXION == "LOADING":
+            color_status = "#7f8c8d"
+        else:
+            color_status = "#e67e22"
+        self.status_frame.configure(fg_color=color_status)
+        self.status_label.configure(text=data.MENSAJE_ESTADO)
 
     def _crear_selector_modo(self, parent):
         """Crea el toggle para seleccionar el modo de cálculo"""
@@ -161,6 +197,7 @@ class ConfigUI:
         
         # Limpiar el campo al cambiar de modo
         self.sueldo_var.set("")
+        self.programar_vista_previa()
 
     def crear_seccion_entradas(self, parent):
         frame = ctk.CTkFrame(parent, corner_radius=15)
@@ -203,6 +240,15 @@ class ConfigUI:
         self.entry_sueldo_principal.bind('<KeyRelease>', self._manejo_formato_sueldo)
 
     def _crear_boton_calcular(self, parent):
+        self.lbl_vista_previa = ctk.CTkLabel(
+            parent,
+            text="",
+            font=ctk.CTkFont(size=14, weight="bold"),
+            text_color=("gray30", "gray70"),
+            anchor="w"
+        )
+        self.lbl_vista_previa.pack(fill='x', padx=5)
+        
         self.btn_calcular = ctk.CTkButton(
             parent,
             text="CALCULAR SUELDO BASE",
@@ -214,11 +260,78 @@ class ConfigUI:
             command=self._al_presionar_calcular
         )
         self.btn_calcular.pack(pady=10, fill='x')
+        
+        self.btn_comparar = ctk.CTkButton(
+            parent,
+            text="COMPARAR TODAS LAS AFP / SALUD",
+            font=ctk.CTkFont(size=14, weight="bold"),
+            fg_color=("#8e44ad", "#6c3483"),
+            height=40,
+            corner_radius=15,
+            cursor="hand2",
+            command=self._al_presionar_comparar
+        )
+        self.btn_comparar.pack(pady=(0, 10), fill='x')
 
     def _al_presionar_calcular(self):
         if self.calcular_callback:
             self.calcular_callback()
 
+    def _al_presionar_comparar(self):
+        if self.comparar_callback:
+            self.comparar_callback()
+
+    # --- Vista previa en vivo ---
+
+    def programar_vista_previa(self, *_):
+        """Reinicia la espera (debounce): sólo se calcula cuando el usuario deja de escribir"""
+        # Lo que esté calculándose corresponde a datos que ya cambiaron
+        self._generacion_previa += 1
+        if self._after_previa is not None:
+            self.root.after_cancel(self._after_previa)
+        self._after_previa = self.root.after(DEBOUNCE_VISTA_PREVIA_MS, self._lanzar_vista_previa)
+
+    def _lanzar_vista_previa(self):
+        self._after_previa = None
+        if not self.vista_previa_callback:
+            return
+        # Un pedido anterior que aún no empezó ya no sirve
+        if self._futuro_previa is not None:
+            self._futuro_previa.cancel()
+
+        datos = self.obtener_valores_formulario()
+        monto = datos.get('sueldo_base' if datos.get('modo') == "base_a_liquido" else 'sueldo_liquido', 0)
+        if monto <= 0:
+            self._futuro_previa = None
+            self.lbl_vista_previa.configure(text="")
+            return
+        self.lbl_vista_previa.configure(text="⏳ Calculando...")
+        self._futuro_previa = self._ejecutor_previa.submit(self.vista_previa_callback, datos)
+        self.root.after(REVISION_VISTA_PREVIA_MS, self._revisar_vista_previa,
+                        self._generacion_previa, self._futuro_previa, datos['modo'])
+
+    def _revisar_vista_previa(self, generacion, futuro, modo):
+        """Corre en el loop de Tk: espera el futuro sin bloquear y descarta respuestas viejas"""
+        if generacion != self._generacion_previa:
+            return
+        if not futuro.done():
+            self.root.after(REVISION_VISTA_PREVIA_MS, self._revisar_vista_previa, generacion, futuro, modo)
+            return
+        if futuro.cancelled():
+            return
+        error = futuro.exception()
+        if error is not None:
+            self.lbl_vista_previa.configure(text=f"⚠️ {error}")
+            return
+        self.lbl_vista_previa.configure(text=self._texto_vista_previa(futuro.result(), modo))
+
+    @staticmethod
+    def _texto_vista_previa(res, modo) -> str:
+        if modo == "base_a_liquido":
+            return f"Vista previa → Sueldo líquido: {_formato_pesos(res['sueldo_liquido'])}"
+        return (f"Vista previa → Sueldo base: {_formato_pesos(res['sueldo_base'])} "
+                f"(líquido {_formato_pesos(res['sueldo_liquido'])})")
+
     def _crear_campo_moderno(self, parent, label, var, ph, row):
         f = ctk.CTkFrame(parent, fg_color="transparent")
         f.grid(row=row, column=0, pady=8, sticky='ew')
@@ -235,6 +348,7 @@ class ConfigUI:
         if self.formato_chile_sueldo_callback:
             val_formateado = self.formato_chile_sueldo_callback(self.movilizacion_var.get())
             self.movilizacion_var.set(val_formateado)
+        self.programar_vista_previa()
 
     def _proxy_formato(self, valor: str) -> str:
         """Método puente que BonosFrame llamará para formatear"""
@@ -256,9 +370,22 @@ class ConfigUI:
         if self.cambio_afp_callback:
             tasa = self.cambio_afp_callback(seleccion)
             self.tasa_afp_actual_var.set(f"{tasa*100:.2f}%")
+        self.programar_vista_previa()
 
     def configurar_lista_afps(self, lista):
         self.afp_combo.configure(values=lista)
+        # Si la AFP elegida ya no existe (datos nuevos), se toma la primera de la lista
+        if lista and self.afp_seleccionada_var.get() not in lista:
+            self.afp_seleccionada_var.set(lista[0])
+        self._on_afp_change(self.afp_seleccionada_var.get())
+
+    def configurar_plan_isapre_default(self, plan_uf):
+        """Fija el plan Isapre por defecto sin pisar un valor que el usuario ya escribió"""
+        actual = self.valor_isapre_uf_var.get()
+        if actual in ("", self._plan_isapre_default):
+            self.valor_isapre_uf_var.set(str(plan_uf))
+        self._plan_isapre_default = str(plan_uf)
+        self._on_isapre_uf_change(None)
 
     def _crear_campo_salud(self, parent, row):
         f = ctk.CTkFrame(parent, fg_color="transparent")
@@ -284,14 +411,17 @@ class ConfigUI:
             self._on_isapre_uf_change(None)
         else:
             self.fi.pack_forget()
+            self.programar_vista_previa()
 
     def _on_isapre_uf_change(self, e):
         if self.calculo_isapre_callback:
             self.lbl_isapre_pesos.configure(text=f"({self.calculo_isapre_callback(self.valor_isapre_uf_var.get())})")
+        self.programar_vista_previa()
 
     def _manejo_formato_sueldo(self, e):
         if self.formato_chile_sueldo_callback:
             self.sueldo_var.set(self.formato_chile_sueldo_callback(self.sueldo_var.get()))
+        self.programar_vista_previa()
 
     def obtener_valores_formulario(self) -> dict:
         """Retorna los valores del formulario incluyendo el modo de cálculo"""
@@ -313,7 +443,8 @@ class ConfigUI:
                 "afp_nombre": self.afp_seleccionada_var.get(),
                 "salud_sistema": self.tipo_salud_var.get(),
                 "salud_uf": salud_uf,
-                "bonos": self.lista_bonos 
+                # Totales que BonosFrame mantiene al día: el motor no vuelve a sumar la lista
+                **self.bonos_component.totales()
             }
             
             # Según el modo, el sueldo va en diferente key
@@ -331,7 +462,17 @@ class ConfigUI:
         return self.modo_calculo_var.get()
 
     def mostrar_resultados_popup(self, res, modo="liquido_a_base"): 
-        ResultadosPopup(self.root, res, modo)
+        # El motor entrega resultados inmutables; el popup trabaja con un dict
+        datos = res.a_dict() if hasattr(res, 'a_dict') else res
+        if self._popup_resultados is None or not self._popup_resultados.winfo_exists():
+            self._popup_resultados = ResultadosPopup(self.root, datos, modo)
+        else:
+            self._popup_resultados.mostrar(datos, modo)
+        
+    def mostrar_comparacion(self, comparacion, elegido=None):
+        if self._popup_comparacion is None or not self._popup_comparacion.winfo_exists():
+            self._popup_comparacion = ComparacionPopup(self.root)
+        self._popup_comparacion.mostrar(comparacion, elegido)
         
     def mostrar_error(self, t, m): 
         messagebox.showerror(t, m)
@@ -340,4 +481,7 @@ class ConfigUI:
         messagebox.showwarning(t, m)
         
     def run(self): 
-        self.root.mainloop()
+        try:
+            self.root.mainloop()
+        finally:
+            self._ejecutor_previa.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,187 @@
+# benchmarks/bench_motor.py
+"""
+    Suite de benchmarks del motor de cálculo, con baseline JSON y umbral de regresión.
+
+    Uso (desde la raíz del proyecto):
+        python -m benchmarks.bench_motor --guardar benchmarks/baseline.json
+        python -m benchmarks.bench_motor --comparar benchmarks/baseline.json --umbral 0.20
+        python -m benchmarks.bench_motor --filtro lote --rapido
+
+    Cada caso registra ops/s y latencia p50/p99 por llamada. Con --comparar,
+    el proceso termina con código 1 si algún caso empeora su p50 más allá del umbral.
+    La baseline depende de la máquina: generarla y compararla en el mismo equipo.
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+import numpy as np
+from DATA import parametros
+from SERVICE import engine, lote, motor_entero
+
+RONDAS_DEFAULT = 30
+SEGUNDOS_POR_RONDA = 0.02
+
+
+# --- Escenarios representativos ---
+
+def _bonos(cantidad: int) -> list:
+    return [{"nombre": f"Bono {i}", "monto": 10_000 + i * 500, "imponible": i % 3 != 0} for i in range(cantidad)]
+
+
+ESCENARIOS = {
+    "fonasa_bajo_tope": {"sueldo_base": 900_000, "sueldo_liquido": 800_000, "afp_nombre": "Uno",
+                         "salud_sistema": "fonasa", "movilizacion": 40_000, "bonos": []},
+    "fonasa_sobre_tope": {"sueldo_base": 6_000_000, "sueldo_liquido": 5_000_000, "afp_nombre": "Capital",
+                          "salud_sistema": "fonasa", "movilizacion": 40_000, "bonos": []},
+    "isapre_plan_alto": {"sueldo_base": 1_200_000, "sueldo_liquido": 1_000_000, "afp_nombre": "Modelo",
+                         "salud_sistema": "isapre", "salud_uf": 6.5, "movilizacion": 0, "bonos": _bonos(3)},
+    "isapre_sobre_tope": {"sueldo_base": 9_000_000, "sueldo_liquido": 7_000_000, "afp_nombre": "Habitat",
+                          "salud_sistema": "isapre", "salud_uf": 4.0, "movilizacion": 0, "bonos": _bonos(3)},
+    "bonos_pesados": {"sueldo_base": 2_000_000, "sueldo_liquido": 2_500_000, "afp_nombre": "Provida",
+                      "salud_sistema": "fonasa", "movilizacion": 60_000, "bonos": _bonos(200)},
+}
+
+
+def _nomina_sintetica(filas: int, semilla: int = 7) -> tuple:
+    """Columnas para el motor vectorizado: (montos, bonos_imp, bonos_no_imp, movilizacion, tasa, salud, uf)"""
+    rng = np.random.default_rng(semilla)
+    tasas = np.array(sorted(parametros.obtener_actual().tasas_afp.values()))
+    isapre = rng.random(filas) < 0.4
+    return (
+        rng.integers(500_000, 8_000_000, filas).astype(float),
+        rng.choice([0, 50_000, 150_000, 400_000], filas).astype(float),
+        rng.choice([0, 20_000, 80_000], filas).astype(float),
+        rng.choice([0, 40_000, 60_000], filas).astype(float),
+        rng.choice(tasas, filas),
+        np.where(isapre, "isapre", "fonasa"),
+        np.where(isapre, rng.uniform(1, 8, filas), 0.0),
+    )
+
+
+def construir_casos() -> dict:
+    """nombre -> (funcion_sin_argumentos, filas_por_llamada)"""
+    casos = {}
+
+    for nombre, datos in ESCENARIOS.items():
+        casos[f"simular_liquido/{nombre}"] = (lambda d=datos: engine.simular_liquido(d['sueldo_base'], d), 1)
+        casos[f"resolver_sueldo_base/{nombre}"] = (lambda d=datos: engine.resolver_sueldo_base(d), 1)
+        casos[f"resolver_sueldo_base_biseccion/{nombre}"] = (
+            lambda d=datos: engine.resolver_sueldo_base(d, metodo="biseccion"), 1)
+
+    # Un punto en medio de cada tramo de impuesto
+    for i, tramo in enumerate(parametros.obtener_actual().tramos):
+        hasta = tramo['hasta'] if tramo['hasta'] != float('inf') else tramo['desde'] * 2
+        base = (tramo['desde'] + hasta) / 2
+        casos[f"calcular_impuesto_unico/tramo_{i + 1}"] = (lambda b=base: engine.calcular_impuesto_unico(b), 1)
+
+    for filas in (10_000, 100_000):
+        columnas = _nomina_sintetica(filas)
+        casos[f"lote_base_a_liquido/{filas}"] = (
+            lambda c=columnas: lote.calcular_liquido_desde_base_lote(*c), filas)
+        casos[f"lote_liquido_a_base/{filas}"] = (
+            lambda c=columnas: lote.resolver_sueldo_base_lote(*c), filas)
+        casos[f"entero_base_a_liquido/{filas}"] = (
+            lambda c=columnas: motor_entero.calcular_liquido_desde_base_entero(*c), filas)
+        casos[f"entero_liquido_a_base/{filas}"] = (
+            lambda c=columnas: motor_entero.resolver_sueldo_base_entero(*c), filas)
+
+    return casos
+
+
+# --- Medición ---
+
+def medir(funcion, filas_por_llamada: int, rondas: int) -> dict:
+    """
+    Ejecuta `rondas` rondas de ~SEGUNDOS_POR_RONDA cada una (tras un calentamiento).
+    La latencia de cada ronda es su tiempo / llamadas; p50/p99 se calculan sobre las rondas.
+    """
+    # Calentamiento + estimación de llamadas por ronda
+    inicio = time.perf_counter()
+    funcion()
+    una = max(time.perf_counter() - inicio, 1e-7)
+    llamadas_por_ronda = max(1, int(SEGUNDOS_POR_RONDA / una))
+
+    latencias = []
+    total_llamadas = 0
+    total_segundos = 0.0
+    for _ in range(rondas):
+        inicio = time.perf_counter()
+        for _ in range(llamadas_por_ronda):
+            funcion()
+        segundos = time.perf_counter() - inicio
+        latencias.append(segundos / llamadas_por_ronda)
+        total_llamadas += llamadas_por_ronda
+        total_segundos += segundos
+
+    latencias.sort()
+    return {
+        "ops_por_segundo": total_llamadas / total_segundos,
+        "filas_por_segundo": total_llamadas * filas_por_llamada / total_segundos,
+        "p50_us": latencias[len(latencias) // 2] * 1e6,
+        "p99_us": latencias[min(len(latencias) - 1, int(len(latencias) * 0.99))] * 1e6,
+        "llamadas": total_llamadas,
+    }
+
+
+def comparar(actual: dict, baseline: dict, umbral: float) -> list:
+    """Lista de (caso, p50_baseline, p50_actual, variacion) que superan el umbral"""
+    regresiones = []
+    for nombre, resultado in actual.items():
+        anterior = baseline.get(nombre)
+        if anterior is None:
+            continue
+        variacion = resultado['p50_us'] / anterior['p50_us'] - 1
+        if variacion > umbral:
+            regresiones.append((nombre, anterior['p50_us'], resultado['p50_us'], variacion))
+    return regresiones
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks del motor de cálculo")
+    parser.add_argument("--guardar", help="Escribir resultados como baseline JSON")
+    parser.add_argument("--comparar", help="Baseline JSON contra la cual comparar")
+    parser.add_argument("--umbral", type=float, default=0.20, help="Regresión tolerada en p50 (0.20 = 20%%)")
+    parser.add_argument("--filtro", default="", help="Sólo casos cuyo nombre contenga este texto")
+    parser.add_argument("--rondas", type=int, default=RONDAS_DEFAULT)
+    parser.add_argument("--rapido", action="store_true", help="Pocas rondas (humo, no para baseline)")
+    args = parser.parse_args(argv)
+
+    rondas = 5 if args.rapido else args.rondas
+    casos = {n: c for n, c in construir_casos().items() if args.filtro in n}
+
+    print(f"{'caso':<52} {'ops/s':>12} {'filas/s':>14} {'p50 µs':>11} {'p99 µs':>11}")
+    resultados = {}
+    for nombre, (funcion, filas) in casos.items():
+        r = medir(funcion, filas, rondas)
+        resultados[nombre] = r
+        print(f"{nombre:<52} {r['ops_por_segundo']:>12,.0f} {r['filas_por_segundo']:>14,.0f} "
+              f"{r['p50_us']:>11,.1f} {r['p99_us']:>11,.1f}")
+
+    if args.guardar:
+        documento = {
+            "maquina": platform.node(),
+            "python": platform.python_version(),
+            "hash_parametros": parametros.obtener_actual().hash,
+            "resultados": resultados,
+        }
+        with open(args.guardar, 'w') as f:
+            json.dump(documento, f, indent=2)
+        print(f"💾 Baseline guardada en {args.guardar}")
+
+    if args.comparar:
+        with open(args.comparar) as f:
+            baseline = json.load(f)['resultados']
+        regresiones = comparar(resultados, baseline, args.umbral)
+        if regresiones:
+            print(f"❌ {len(regresiones)} regresiones sobre el umbral de {args.umbral:.0%}:")
+            for nombre, antes, ahora, variacion in regresiones:
+                print(f"   {nombre}: p50 {antes:,.1f} → {ahora:,.1f} µs (+{variacion:.0%})")
+            return 1
+        print(f"✅ Sin regresiones sobre el umbral de {args.umbral:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
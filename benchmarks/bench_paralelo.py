@@ -0,0 +1,115 @@
+# benchmarks/bench_paralelo.py
+"""
+    Benchmark de escalamiento del cálculo batch en paralelo.
+
+    Uso (desde la raíz del proyecto):
+        python -m benchmarks.bench_paralelo --filas 1000000 --chunk 20000 --workers 1 2 4 8 16
+        python -m benchmarks.bench_paralelo --guardar escalamiento.json
+
+    Genera una nómina sintética en memoria y mide la etapa de cálculo del pipeline
+    con distintos números de procesos. Reporta filas/s, speedup y eficiencia
+    respecto de 1 proceso (eficiencia ~100% = escalamiento lineal).
+    Con más procesos que CPUs se mide la sobresuscripción, no el escalamiento:
+    esas filas se marcan, y --guardar registra los CPUs de la máquina junto a los números.
+"""
+import argparse
+import json
+import os
+import platform
+import time
+import numpy as np
+import pandas as pd
+from DATA import parametros
+from SERVICE import pipeline
+
+
+def generar_nomina(filas: int, semilla: int = 42) -> pd.DataFrame:
+    """Nómina sintética con la mezcla típica de AFP, salud y bonos"""
+    rng = np.random.default_rng(semilla)
+    isapre = rng.random(filas) < 0.4
+    return pd.DataFrame({
+        "rut": np.arange(filas).astype(str),
+        "sueldo_liquido": rng.integers(500_000, 8_000_000, filas),
+        "movilizacion": rng.choice([0, 40_000, 60_000], filas),
+        "afp_nombre": rng.choice(sorted(parametros.obtener_actual().tasas_afp), filas),
+        "salud_sistema": np.where(isapre, "isapre", "fonasa"),
+        "salud_uf": np.where(isapre, rng.uniform(1, 8, filas).round(3), 0.0),
+        "bonos_imponibles": rng.choice([0, 50_000, 150_000, 400_000], filas),
+        "bonos_no_imponibles": rng.choice([0, 20_000, 80_000], filas),
+    })
+
+
+def medir(nomina: pd.DataFrame, modo: str, chunk: int, trabajadores: int) -> float:
+    """Segundos que toma calcular toda la nómina con `trabajadores` procesos"""
+    bloques = (nomina.iloc[i:i + chunk] for i in range(0, len(nomina), chunk))
+    inicio = time.perf_counter()
+    if trabajadores > 1:
+        etapa = pipeline.calcular_bloques_en_paralelo(bloques, modo, trabajadores=trabajadores)
+    else:
+        etapa = pipeline.calcular_bloques(bloques, modo)
+    for _ in etapa:
+        pass
+    return time.perf_counter() - inicio
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Escalamiento del cálculo batch en paralelo")
+    parser.add_argument("--filas", type=int, default=1_000_000)
+    parser.add_argument("--chunk", type=int, default=20_000)
+    parser.add_argument("--mode", choices=["liquido_a_base", "base_a_liquido"], default="liquido_a_base")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--guardar", help="Escribir los resultados (y los datos de la máquina) en JSON")
+    args = parser.parse_args()
+
+    nomina = generar_nomina(args.filas)
+    if args.mode == "base_a_liquido":
+        nomina = nomina.rename(columns={"sueldo_liquido": "sueldo_base"})
+
+    cpus = os.cpu_count() or 1
+    miles = lambda n: f"{n:,}".replace(",", ".")
+    print(f"🧮 {miles(args.filas)} filas, bloques de {miles(args.chunk)}, modo {args.mode}, {cpus} CPUs")
+    if max(args.workers) > cpus:
+        print(f"⚠️ Hay más procesos que CPUs ({cpus}): las filas marcadas con * no miden escalamiento")
+    print(f"{'procesos':>9} {'segundos':>10} {'filas/s':>12} {'speedup':>8} {'eficiencia':>11}")
+
+    # Siempre se mide 1 proceso primero: es la referencia del speedup
+    trabajadores_a_medir = [1] + [t for t in args.workers if t != 1]
+
+    referencia = None
+    resultados = []
+    for trabajadores in trabajadores_a_medir:
+        segundos = medir(nomina, args.mode, args.chunk, trabajadores)
+        if referencia is None:
+            referencia = segundos
+        speedup = referencia / segundos
+        marca = " *" if trabajadores > cpus else ""
+        print(f"{trabajadores:>9} {segundos:>10.2f} {miles(round(args.filas / segundos)):>12} "
+              f"{speedup:>7.2f}x {speedup / trabajadores:>10.0%}{marca}")
+        resultados.append({
+            "procesos": trabajadores,
+            "segundos": round(segundos, 3),
+            "filas_por_segundo": round(args.filas / segundos),
+            "speedup": round(speedup, 3),
+            "eficiencia": round(speedup / trabajadores, 3),
+            "sobresuscrito": trabajadores > cpus,
+        })
+
+    if args.guardar:
+        documento = {
+            "maquina": platform.node(),
+            "procesador": platform.processor(),
+            "cpus": cpus,
+            "python": platform.python_version(),
+            "hash_parametros": parametros.obtener_actual().hash,
+            "filas": args.filas,
+            "chunk": args.chunk,
+            "modo": args.mode,
+            "resultados": resultados,
+        }
+        with open(args.guardar, 'w') as f:
+            json.dump(documento, f, indent=2)
+        print(f"💾 Resultados guardados en {args.guardar}")
+
+
+if __name__ == "__main__":
+    main()
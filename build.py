@@ -12,6 +12,7 @@ args = [
     '--noconsole',                        # Ocultar la pantalla negra (CMD) de fondo
     '--onedir',                           # Crear una CARPETA (Vital para que funcione el .env editable)
     '--clean',                            # Limpiar caché de compilaciones fallidas
+    '--noupx',                            # DLLs sin comprimir: no se descomprimen en cada arranque
     
     # IMPORTANTE: Incluir los archivos de diseño de CustomTkinter
     f'--add-data={ctk_path};customtkinter/',
@@ -23,6 +24,14 @@ args = [
     '--hidden-import=UI',
     '--hidden-import=SERVICE',
     
+    # Módulos que arrastran las dependencias opcionales de pandas y que la app nunca usa
+    # (menos archivos que el antivirus escanea al abrir la carpeta)
+    '--exclude-module=matplotlib',
+    '--exclude-module=IPython',
+    '--exclude-module=scipy',
+    '--exclude-module=pytest',
+    '--exclude-module=tkinter.test',
+    
     # AGREGA ESTAS DOS LÍNEAS NUEVAS:
     '--icon=assets/logo.ico', 
     
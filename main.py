@@ -1,12 +1,68 @@
 # main.py
-from UI.ui import ConfigUI
-from SERVICE import services, engine
-from DATA import db_loader 
+import sys
+import time
 
-def main():
-    db_loader.actualizar_configuracion_desde_db()
+_INICIO_PROCESO = time.perf_counter()
+
+# --profile-startup se activa antes de cualquier otra importación para medirlas todas
+if "--profile-startup" in sys.argv:
+    from SERVICE import perfil_arranque
+    perfil_arranque.activar(_INICIO_PROCESO)
+
+import argparse
+import threading
+from DATA import data, db_loader, parametros
+from SERVICE import instrumentacion, perfil_arranque
+
+
+def _agregar_opcion_perfil(parser):
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="Mostrar tiempos de importación y de arranque")
+
+
+def _activar_estadisticas(segundos):
+    """--stats N: instrumenta el motor y vuelca el resumen cada N segundos"""
+    if segundos:
+        instrumentacion.iniciar_volcado_periodico(segundos)
+        print(f"📊 Instrumentación del motor activa (resumen cada {segundos:g} s)")
+
+
+def _agregar_opcion_refresco(parser):
+    parser.add_argument("--refresco", type=float, default=900, metavar="SEGUNDOS",
+                        help="Volver a consultar los parámetros en la BD cada N segundos (0 = nunca)")
+
+
+def _iniciar_refresco(segundos, al_actualizar=None):
+    """--refresco N: recarga en caliente de UF, topes y tramos mientras la aplicación corre"""
+    if segundos > 0:
+        db_loader.iniciar_refresco_periodico(segundos, al_actualizar)
+        print(f"🔄 Refresco de parámetros cada {segundos:g} s")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="main.py", description="Calculadora de sueldos (interfaz gráfica)")
+    parser.add_argument("--stats", type=float, default=0, metavar="SEGUNDOS",
+                        help="Instrumentar el motor y mostrar estadísticas cada N segundos")
+    _agregar_opcion_refresco(parser)
+    _agregar_opcion_perfil(parser)
+    args = parser.parse_args(argv)
+
+    # La interfaz se importa aquí para que el modo batch nunca cargue customtkinter
+    perfil_arranque.marcar("argumentos leídos")
+    from UI.ui import ConfigUI
+    perfil_arranque.marcar("interfaz importada (customtkinter)")
+    from SERVICE import services, cache
+    perfil_arranque.marcar("motor importado")
+
+    _activar_estadisticas(args.stats)
+
+    # Arranque sin bloqueo: caché local (o valores de fábrica) al instante,
+    # y la BD se consulta en segundo plano con la ventana ya abierta
+    db_loader.cargar_inicial()
+    perfil_arranque.marcar("parámetros iniciales cargados")
     
     app = ConfigUI()
+    perfil_arranque.marcar("ventana construida")
     
     # Configurar callbacks
     app.formato_chile_sueldo_callback = services.formato_chile_sueldo
@@ -16,22 +72,47 @@ def main():
         return services.obtener_tasa_afp(nombre_afp)
     app.cambio_afp_callback = al_cambiar_afp
     
-    app.configurar_lista_afps(services.obtener_lista_afps())
-    valor_uf, default_plan = services.obtener_defaults_salud()
-    app.valor_isapre_uf_var.set(str(default_plan))
+    def calcular_vista_previa(datos):
+        """Corre en el hilo de la vista previa (no toca la interfaz); mismo motor y caché que el botón"""
+        if datos['modo'] == "base_a_liquido":
+            return cache.calcular_liquido_desde_base(datos)
+        return cache.resolver_sueldo_base(datos)
+    app.vista_previa_callback = calcular_vista_previa
+    
+    def refrescar_parametros():
+        """Vuelca el snapshot vigente en la interfaz (lista de AFP, plan Isapre, badge)"""
+        app.configurar_lista_afps(services.obtener_lista_afps())
+        _, default_plan = services.obtener_defaults_salud()
+        app.configurar_plan_isapre_default(default_plan)
+        app.actualizar_estado_conexion()
+    
+    refrescar_parametros()
     
-    tasa_init = services.obtener_tasa_afp("Uno")
-    app.tasa_afp_actual_var.set(f"{tasa_init*100:.2f}%")
+    # Tk no es thread-safe: los hilos de carga y refresco sólo marcan este evento
+    # (suscriptor de parámetros) y la interfaz se actualiza desde el loop de Tk
+    cambio_parametros = threading.Event()
+    parametros.suscribir(lambda _nuevo: cambio_parametros.set())
+    estado_mostrado = [(data.ESTADO_CONEXION, data.MENSAJE_ESTADO)]
+    
+    def revisar_parametros():
+        estado = (data.ESTADO_CONEXION, data.MENSAJE_ESTADO)
+        if cambio_parametros.is_set() or estado != estado_mostrado[0]:
+            cambio_parametros.clear()
+            estado_mostrado[0] = estado
+            refrescar_parametros()
+        app.root.after(200, revisar_parametros)
+    
+    db_loader.actualizar_en_segundo_plano()
+    _iniciar_refresco(args.refresco)
+    app.root.after(200, revisar_parametros)
 
     def procesar_calculo():
         """Procesa el cálculo según el modo seleccionado"""
         datos = app.obtener_valores_formulario()
         modo = datos.get('modo', 'liquido_a_base')
         
-        bonos = datos.get('bonos', [])
-        print(f"Modo: {modo}")
-        print(f"Datos recibidos: {datos}")
-        print(f"Bonos Count: {len(bonos)}")
+        print(f"Modo: {modo} | Bonos: {len(app.lista_bonos)} "
+              f"(imponibles {datos.get('bonos_imponibles', 0)}, no imponibles {datos.get('bonos_no_imponibles', 0)})")
 
         try:
             if modo == "base_a_liquido":
@@ -45,7 +126,7 @@ def main():
                     )
                     return
                 
-                resultado = engine.calcular_liquido_desde_base(datos)
+                resultado = cache.calcular_liquido_desde_base(datos)
                 app.mostrar_resultados_popup(resultado, modo="base_a_liquido")
                 
             else:
@@ -59,7 +140,12 @@ def main():
                     )
                     return
 
-                resultado = engine.resolver_sueldo_base(datos)
+                # Contador del hilo de Tk: la vista previa resuelve en otro hilo y no lo mueve
+                antes, _ = instrumentacion.ultima_resolucion_del_hilo()
+                resultado = cache.resolver_sueldo_base(datos)
+                despues, traza = instrumentacion.ultima_resolucion_del_hilo()
+                if despues != antes:  # No se imprime en aciertos del caché
+                    print(instrumentacion.formatear_traza(traza))
                 app.mostrar_resultados_popup(resultado, modo="liquido_a_base")
             
         except Exception as e:
@@ -70,7 +156,208 @@ def main():
 
     app.calcular_callback = procesar_calculo
     
+    def procesar_comparacion():
+        """El mismo sueldo en todas las AFP × opciones de salud, en una sola llamada vectorizada"""
+        datos = app.obtener_valores_formulario()
+        modo = datos.get('modo', 'liquido_a_base')
+        monto = datos.get('sueldo_base' if modo == "base_a_liquido" else 'sueldo_liquido', 0)
+        if monto <= 0:
+            app.mostrar_advertencia("Faltan Datos", "Debes ingresar un sueldo mayor a $0 para comparar.")
+            return
+        
+        try:
+            from SERVICE import comparacion
+            resultado = comparacion.comparar(datos, modo)
+            elegido = resultado.indice(datos['afp_nombre'], datos['salud_sistema'], datos.get('salud_uf', 0))
+            print(f"Comparación: {modo} | {len(resultado)} combinaciones")
+            app.mostrar_comparacion(resultado, elegido)
+        except Exception as e:
+            print(f"Error detallado: {e}")
+            import traceback
+            traceback.print_exc()
+            app.mostrar_error("Error de Comparación", f"❌ Ocurrió un error interno:\n{e}")
+    
+    app.comparar_callback = procesar_comparacion
+    
+    # Primera vuelta del loop de Tk: la ventana ya está en pantalla
+    app.root.after_idle(lambda: perfil_arranque.terminar("primera ventana visible"))
     app.run()
 
+def main_batch(argv):
+    """Modo headless: python main.py batch --mode liquido_a_base --in nomina.csv --out resultados.csv"""
+    parser = argparse.ArgumentParser(prog="main.py batch", description="Cálculo masivo de sueldos desde CSV o Parquet")
+    parser.add_argument("--mode", choices=["liquido_a_base", "base_a_liquido"], default="liquido_a_base")
+    parser.add_argument("--in", dest="entrada", required=True, help="Archivo de entrada (.csv o .parquet)")
+    parser.add_argument("--out", dest="salida", required=True, help="Archivo de salida (.csv o .parquet)")
+    parser.add_argument("--chunk", type=int, default=5000, help="Filas por bloque")
+    parser.add_argument("--sep", default=",", help="Separador del CSV (ej: ';')")
+    parser.add_argument("--workers", type=int, default=1, help="Procesos de cálculo en paralelo")
+    parser.add_argument("--entero", action="store_true",
+                        help="Aritmética entera de punto fijo (resultados exactos y reproducibles al peso)")
+    parser.add_argument("--periodo", default=None, metavar="AAAA-MM",
+                        help="Recalcular con los parámetros históricos de ese período "
+                             "(una columna 'periodo' en la nómina tiene prioridad)")
+    _agregar_opcion_perfil(parser)
+    parser.add_argument("--solo-cache", action="store_true",
+                        help="No consultar la BD; usar cache_config.json (o valores de fábrica)")
+    parser.add_argument("--stats", type=float, default=0, metavar="SEGUNDOS",
+                        help="Instrumentar el motor y mostrar estadísticas cada N segundos")
+    args = parser.parse_args(argv)
+
+    from SERVICE import pipeline
+
+    if args.solo_cache:
+        db_loader.cargar_desde_cache()
+    else:
+        db_loader.actualizar_configuracion_desde_db()
+
+    perfil_arranque.terminar("listo para procesar")
+    print(f"📄 {args.entrada} → {args.salida} (modo: {args.mode})")
+    _activar_estadisticas(args.stats)
+    pipeline.procesar_archivo(args.entrada, args.salida, args.mode, args.chunk, args.sep,
+                              trabajadores=args.workers, entero=args.entero, periodo=args.periodo)
+    if instrumentacion.ACTIVO:
+        for metodo, resumen in instrumentacion.estadisticas()['metodos'].items():
+            print(f"📊 [{metodo}] {resumen}")
+
+
+def main_servicio(argv):
+    """Servicio HTTP local: python main.py serve --port 8765"""
+    parser = argparse.ArgumentParser(prog="main.py serve", description="Servicio HTTP de cálculo de sueldos")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--ventana-ms", type=float, default=3.0,
+                        help="Ventana para agrupar consultas individuales en un lote")
+    parser.add_argument("--max-lote", type=int, default=512)
+    parser.add_argument("--stats", type=float, default=0, metavar="SEGUNDOS",
+                        help="Instrumentar el motor y mostrar estadísticas cada N segundos")
+    _agregar_opcion_refresco(parser)
+    _agregar_opcion_perfil(parser)
+    args = parser.parse_args(argv)
+
+    from SERVICE import servidor
+
+    db_loader.actualizar_configuracion_desde_db()
+    _activar_estadisticas(args.stats)
+    # El caché de resultados ya se vacía al publicar; aquí sólo se deja registro
+    _iniciar_refresco(args.refresco, lambda nuevo: print(
+        f"🔄 Parámetros actualizados en caliente: versión {nuevo.version} (UF {nuevo.valor_uf})"))
+    perfil_arranque.terminar("listo para escuchar")
+    servidor.ejecutar(args.host, args.port, args.ventana_ms, args.max_lote,
+                      recargar_callback=lambda: db_loader.actualizar_configuracion_desde_db(forzar=True))
+
+
+def main_curvas(argv):
+    """Tabla de bandas: python main.py curvas --mode base_a_liquido --hasta 5000000 --out bandas.csv"""
+    parser = argparse.ArgumentParser(prog="main.py curvas", description="Curvas de sueldo por AFP y sistema de salud")
+    parser.add_argument("--mode", choices=["liquido_a_base", "base_a_liquido"], default="base_a_liquido")
+    parser.add_argument("--desde", type=float, default=None, help="Monto inicial (por defecto el sueldo mínimo)")
+    parser.add_argument("--hasta", type=float, default=5_000_000)
+    parser.add_argument("--paso", type=float, default=1000)
+    parser.add_argument("--salud-uf", type=float, default=None, help="Plan Isapre en UF (por defecto el de referencia)")
+    parser.add_argument("--out", dest="salida", required=True, help="Archivo CSV de salida")
+    parser.add_argument("--sep", default=",", help="Separador del CSV (ej: ';')")
+    parser.add_argument("--ancha", action="store_true", help="Una columna por AFP/salud (formato para publicar)")
+    parser.add_argument("--solo-cache", action="store_true",
+                        help="No consultar la BD; usar cache_config.json (o valores de fábrica)")
+    _agregar_opcion_perfil(parser)
+    args = parser.parse_args(argv)
+
+    from SERVICE import curvas
+
+    if args.solo_cache:
+        db_loader.cargar_desde_cache()
+    else:
+        db_loader.actualizar_configuracion_desde_db()
+
+    perfil_arranque.terminar("listo para calcular")
+    curva = curvas.barrer(args.mode, args.desde, args.hasta, args.paso, salud_uf=args.salud_uf)
+    if args.ancha:
+        columna = "sueldo_liquido" if args.mode == "base_a_liquido" else "sueldo_base"
+        curvas.exportar_csv(curvas.tabla_bandas(curva, columna), args.salida, args.sep, indice=True)
+    else:
+        curvas.exportar_csv(curva, args.salida, args.sep)
+
+
+def main_historico(argv):
+    """Histórico de parámetros: python main.py historico --uf uf.csv --parametros mensuales.json"""
+    parser = argparse.ArgumentParser(prog="main.py historico", description="Histórico de parámetros por fecha")
+    parser.add_argument("--uf", dest="archivo_uf", help="CSV con columnas fecha,valor (UF diaria)")
+    parser.add_argument("--sep", default=",", help="Separador del CSV de UF")
+    parser.add_argument("--parametros", dest="archivo_parametros",
+                        help="JSON: lista de conjuntos con 'vigente_desde' y las claves que cambian")
+    parser.add_argument("--consultar", metavar="FECHA", help="Mostrar los parámetros de una fecha o período")
+    args = parser.parse_args(argv)
+
+    from DATA import historico
+
+    if args.archivo_uf:
+        historico.importar_uf_csv(args.archivo_uf, args.sep)
+    if args.archivo_parametros:
+        historico.importar_parametros_json(args.archivo_parametros)
+    print(f"📊 {historico.historico().resumen()}")
+    if args.consultar:
+        p = historico.parametros_en(args.consultar)
+        print(f"📅 {args.consultar}: UF {p.valor_uf} | Sueldo mínimo {p.sueldo_minimo} | "
+              f"{len(p.tramos)} tramos | hash {p.hash}")
+
+
+def main_proyeccion(argv):
+    """Proyección anual: python main.py proyeccion --in nomina.csv --desde 2025-01 --out-mensual meses.csv"""
+    parser = argparse.ArgumentParser(prog="main.py proyeccion",
+                                     description="Proyección de la nómina mes a mes (trabajadores × meses)")
+    parser.add_argument("--in", dest="entrada", required=True, help="Nómina de entrada (.csv o .parquet)")
+    parser.add_argument("--desde", required=True, metavar="AAAA-MM", help="Primer mes de la proyección")
+    parser.add_argument("--meses", type=int, default=12)
+    parser.add_argument("--mode", choices=["base_a_liquido", "liquido_a_base"], default="base_a_liquido",
+                        help="liquido_a_base para contratos con líquido pactado")
+    parser.add_argument("--uf-inicial", type=float, default=None,
+                        help="UF del primer mes (por defecto la del histórico o la vigente)")
+    parser.add_argument("--variacion-uf", type=float, default=None, metavar="TASA",
+                        help="Variación mensual de la UF (ej: 0.003 = 0,3%% mensual)")
+    parser.add_argument("--out-mensual", required=True, help="CSV con los totales de cada mes")
+    parser.add_argument("--out-anual", default=None, help="CSV con los totales de cada trabajador")
+    parser.add_argument("--out-detalle", default=None, help="CSV con una fila por trabajador × mes")
+    parser.add_argument("--sep", default=",", help="Separador de los CSV (ej: ';')")
+    parser.add_argument("--solo-cache", action="store_true",
+                        help="No consultar la BD; usar cache_config.json (o valores de fábrica)")
+    _agregar_opcion_perfil(parser)
+    args = parser.parse_args(argv)
+
+    import pandas as pd
+    from SERVICE import pipeline, proyeccion
+
+    if args.solo_cache:
+        db_loader.cargar_desde_cache()
+    else:
+        db_loader.actualizar_configuracion_desde_db()
+
+    periodos = proyeccion.periodos_desde(args.desde, args.meses)
+    uf_por_mes = None
+    if args.uf_inicial is not None or args.variacion_uf is not None:
+        uf_inicial = args.uf_inicial or proyeccion.parametros_por_mes(periodos[:1])[0].valor_uf
+        uf_por_mes = proyeccion.trayectoria_uf(uf_inicial, len(periodos), args.variacion_uf or 0.0)
+
+    tabla = pd.concat(pipeline.leer_bloques(args.entrada, separador=args.sep), ignore_index=True)
+    perfil_arranque.terminar("listo para proyectar")
+    print(f"📄 {args.entrada}: {len(tabla)} trabajadores × {len(periodos)} meses ({periodos[0]} a {periodos[-1]})")
+    proy = proyeccion.proyectar(tabla, periodos, args.mode, uf_por_mes=uf_por_mes)
+    proyeccion.exportar_csv(proy, args.out_mensual, args.out_anual, args.out_detalle, args.sep)
+    total = proy.total()
+    print(f"📊 Líquido {total['sueldo_liquido']:,} | Cotizaciones {total['cotizaciones']:,} | "
+          f"Impuesto {total['impuesto']:,}".replace(",", "."))
+
+
 if __name__ == "__main__":
-    main()
+    if len(sys.argv) > 1 and sys.argv[1] == "batch":
+        main_batch(sys.argv[2:])
+    elif len(sys.argv) > 1 and sys.argv[1] == "serve":
+        main_servicio(sys.argv[2:])
+    elif len(sys.argv) > 1 and sys.argv[1] == "curvas":
+        main_curvas(sys.argv[2:])
+    elif len(sys.argv) > 1 and sys.argv[1] == "historico":
+        main_historico(sys.argv[2:])
+    elif len(sys.argv) > 1 and sys.argv[1] == "proyeccion":
+        main_proyeccion(sys.argv[2:])
+    else:
+        main(sys.argv[1:])
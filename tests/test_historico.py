@@ -0,0 +1,81 @@
+# tests/test_historico.py
+"""Histórico de parámetros: consultas concurrentes con escrituras"""
+import threading
+from datetime import date, timedelta
+from DATA import historico, parametros
+
+
+def test_consultas_concurrentes_con_escrituras(tmp_path):
+    h = historico.HistoricoParametros(str(tmp_path / "historico.db"))
+    inicio = date(2024, 1, 1)
+    h.registrar_snapshot(inicio, parametros.obtener_actual())
+    dias = [inicio + timedelta(days=d) for d in range(1, 300)]
+    validas = {parametros.obtener_actual().valor_uf} | {37_000 + n for n in range(len(dias))}
+    errores = []
+
+    def escribir():
+        for n, dia in enumerate(dias):
+            h.registrar_uf(dia, 37_000 + n)
+
+    def leer():
+        try:
+            for _ in range(20):
+                for dia in dias[::7]:
+                    assert h.parametros_en(dia).valor_uf in validas
+                    assert h.uf_en(dia) in validas
+                    h.resumen()
+        except Exception as e:
+            errores.append(e)
+
+    hilos = [threading.Thread(target=escribir)] + [threading.Thread(target=leer) for _ in range(4)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+
+    assert not errores
+    assert h.uf_en(dias[-1]) == 37_000 + len(dias) - 1
+    assert h.parametros_en(dias[10]).valor_uf == 37_010
+
+
+def test_snapshot_sin_cambios_no_escribe(tmp_path, monkeypatch):
+    h = historico.HistoricoParametros(str(tmp_path / "historico.db"))
+    escrituras = []
+    escribir = h._escribir
+    monkeypatch.setattr(h, "_escribir", lambda sql, filas: (escrituras.append(sql), escribir(sql, filas)))
+    actual = parametros.obtener_actual()
+
+    h.registrar_snapshot(date(2025, 3, 3), actual)
+    assert len(escrituras) == 2  # UF y conjunto mensual
+    h.registrar_snapshot(date(2025, 3, 4), actual)
+    h.registrar_snapshot(date(2025, 3, 4), actual)
+    assert len(escrituras) == 2
+
+    h.registrar_snapshot(date(2025, 3, 5), actual.reemplazar({historico.CLAVE_UF: actual.valor_uf + 10}))
+    assert len(escrituras) == 3
+    assert h.uf_en(date(2025, 3, 4)) == actual.valor_uf
+
+
+def test_ruta_junto_al_cache_o_por_variable(tmp_path, monkeypatch):
+    from DATA import db_loader
+    monkeypatch.delenv("HISTORICO_PARAMETROS_DB", raising=False)
+    monkeypatch.setattr(db_loader, "CACHE_FILE", str(tmp_path / "config" / "cache_config.json"))
+    assert historico.ruta_por_defecto() == str(tmp_path / "config" / historico.HISTORICO_FILE)
+
+    monkeypatch.setenv("HISTORICO_PARAMETROS_DB", str(tmp_path / "otro.db"))
+    assert historico.HistoricoParametros().ruta == str(tmp_path / "otro.db")
+
+
+def test_carga_de_bd_registra_solo_cuando_cambia_el_hash(tmp_path, monkeypatch):
+    from DATA import db_loader
+    h = historico.HistoricoParametros(str(tmp_path / "historico.db"))
+    registrados = []
+    monkeypatch.setattr(historico, "_historico", h)
+    monkeypatch.setattr(h, "registrar_snapshot", lambda fecha, params: registrados.append(params.hash))
+    monkeypatch.setattr(db_loader, "_ultimo_hash_historico", None)
+    actual = parametros.obtener_actual()
+
+    db_loader._registrar_en_historico(actual)
+    db_loader._registrar_en_historico(actual)
+    db_loader._registrar_en_historico(actual.reemplazar({"tasa_cesant": actual.tasa_cesant + 0.001}))
+    assert len(registrados) == 2
@@ -0,0 +1,82 @@
+# tests/test_lote.py
+"""Motor vectorizado contra el motor escalar, fila por fila"""
+import numpy as np
+import pytest
+from DATA import parametros
+from SERVICE import engine, lote, resultados
+
+CAMPOS_BASE = resultados.CAMPOS_POR_MODO["liquido_a_base"]
+
+
+def escenarios_aleatorios(n: int, semilla: int, params) -> dict:
+    rng = np.random.default_rng(semilla)
+    sistemas = rng.choice(["fonasa", "isapre"], n)
+    return {
+        "bonos_imponibles": rng.choice([0, 50_000, 123_457], n),
+        "bonos_no_imponibles": rng.choice([0, 20_000], n),
+        "movilizacion": rng.choice([0, 30_000, 45_500], n),
+        "afp_nombre": rng.choice(list(params.tasas_afp), n),
+        "salud_sistema": sistemas,
+        "salud_uf": np.where(sistemas == "isapre", rng.choice([2.5, 4.0, 7.3], n), 0.0),
+    }
+
+
+def columnas_lote(escenario: dict, params) -> tuple:
+    return (escenario["bonos_imponibles"], escenario["bonos_no_imponibles"], escenario["movilizacion"],
+            lote.tasas_afp_desde_nombres(escenario["afp_nombre"], params),
+            escenario["salud_sistema"], escenario["salud_uf"])
+
+
+def datos_fila(escenario: dict, i: int, **montos) -> dict:
+    return {clave: valores[i].item() for clave, valores in escenario.items()} | montos
+
+
+def test_simulacion_identica_al_motor_escalar():
+    params = parametros.obtener_actual()
+    escenario = escenarios_aleatorios(2000, semilla=3, params=params)
+    bases = np.random.default_rng(4).uniform(0, 20_000_000, 2000)
+
+    liquidos, _ = lote.simular_liquido_lote(bases, *columnas_lote(escenario, params), params=params)
+    for i, base in enumerate(bases):
+        esperado = engine.compilar_escenario(datos_fila(escenario, i), params).liquido(base)
+        assert liquidos[i] == esperado, f"fila {i}"
+
+
+def test_resolver_igual_al_motor_escalar_fila_por_fila():
+    params = parametros.obtener_actual()
+    escenario = escenarios_aleatorios(2000, semilla=5, params=params)
+    objetivos = np.random.default_rng(6).integers(200_000, 15_000_000, 2000)
+
+    columnas = lote.resolver_sueldo_base_lote(objetivos, *columnas_lote(escenario, params), params=params)
+    for i, objetivo in enumerate(objetivos):
+        esperado = engine.resolver_sueldo_base(datos_fila(escenario, i, sueldo_liquido=int(objetivo)), params=params)
+        assert {c: int(columnas[c][i]) for c in CAMPOS_BASE} == {c: esperado[c] for c in CAMPOS_BASE}, f"fila {i}"
+
+
+def test_resolver_con_parametros_por_fila():
+    actual = parametros.obtener_actual()
+    otro = parametros.validar(actual.reemplazar({"VALOR_UF_ACTUAL": round(actual.valor_uf * 1.04, 2),
+                                                 "tasa_cesant": actual.tasa_cesant + 0.002}))
+    assert otro.hash != actual.hash
+    snapshots = [actual, otro]
+    indice = np.arange(600) % 2
+    por_fila = lote.ParametrosPorFila(snapshots, indice)
+    escenario = escenarios_aleatorios(600, semilla=7, params=actual)
+    objetivos = np.random.default_rng(8).integers(200_000, 15_000_000, 600)
+
+    columnas = (escenario["bonos_imponibles"], escenario["bonos_no_imponibles"], escenario["movilizacion"],
+                por_fila.tasas_afp(escenario["afp_nombre"]), escenario["salud_sistema"], escenario["salud_uf"])
+    resultado = lote.resolver_sueldo_base_lote(objetivos, *columnas, params=por_fila)
+    for i, objetivo in enumerate(objetivos):
+        esperado = engine.resolver_sueldo_base(datos_fila(escenario, i, sueldo_liquido=int(objetivo)),
+                                               params=snapshots[indice[i]])
+        assert {c: int(resultado[c][i]) for c in CAMPOS_BASE} == {c: esperado[c] for c in CAMPOS_BASE}, f"fila {i}"
+
+
+@pytest.mark.parametrize("objetivo", [0, 30_000, 70_000])
+def test_objetivo_cubierto_por_bonos_da_base_cero(objetivo):
+    params = parametros.obtener_actual()
+    columnas = lote.resolver_sueldo_base_lote([objetivo], 0, 70_000, params=params)
+    esperado = engine.resolver_sueldo_base({"sueldo_liquido": objetivo, "bonos_no_imponibles": 70_000}, params=params)
+    assert int(columnas["sueldo_base"][0]) == esperado["sueldo_base"] == 0
+    assert int(columnas["sueldo_base_exacto"][0]) == esperado["sueldo_base_exacto"] == 0
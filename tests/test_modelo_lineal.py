@@ -0,0 +1,45 @@
+# tests/test_modelo_lineal.py
+"""Modelo lineal por tramos: camino por defecto de engine.resolver_sueldo_base"""
+import random
+from DATA import parametros
+from SERVICE import engine, instrumentacion, modelo_lineal
+
+
+def _datos_aleatorios(n: int, semilla: int) -> list:
+    rng = random.Random(semilla)
+    afps = list(parametros.obtener_actual().tasas_afp)
+    return [{"sueldo_liquido": rng.randint(1, 25_000_000), "afp_nombre": rng.choice(afps),
+             "salud_sistema": rng.choice(["fonasa", "isapre"]), "salud_uf": rng.choice([0, 2.5, 4.0, 12.0]),
+             "bonos_imponibles": rng.choice([0, 50_000]), "bonos_no_imponibles": rng.choice([0, 20_000, 900_000]),
+             "movilizacion": rng.choice([0, 40_000])} for _ in range(n)]
+
+
+def test_lineal_igual_a_biseccion():
+    params = parametros.obtener_actual()
+    for datos in _datos_aleatorios(2000, semilla=1):
+        lineal = engine.resolver_sueldo_base(datos, metodo="lineal", params=params)
+        biseccion = engine.resolver_sueldo_base(datos, metodo="biseccion", params=params)
+        assert lineal.a_dict() == biseccion.a_dict(), datos
+
+
+def test_modelo_se_compila_una_vez_por_escenario_y_snapshot():
+    actual = parametros.obtener_actual()
+    otro = parametros.validar(actual.reemplazar({"VALOR_UF_ACTUAL": round(actual.valor_uf + 100, 2)}))
+    datos = {"sueldo_liquido": 1_500_000, "afp_nombre": "Modelo", "salud_sistema": "isapre", "salud_uf": 3.1}
+
+    modelo = modelo_lineal.modelo_para(engine.compilar_escenario(datos, actual))
+    assert modelo is not None
+    assert modelo_lineal.modelo_para(engine.compilar_escenario(dict(datos, sueldo_liquido=2_000_000), actual)) is modelo
+    assert modelo_lineal.modelo_para(engine.compilar_escenario(datos, otro)) is not modelo
+
+
+def test_sin_modelo_usa_biseccion(monkeypatch):
+    params = parametros.obtener_actual()
+    datos = {"sueldo_liquido": 1_234_567, "afp_nombre": "Habitat"}
+    esperado = engine.resolver_sueldo_base(datos, metodo="biseccion", params=params)
+
+    monkeypatch.setattr(modelo_lineal, "modelo_para", lambda escenario: None)
+    monkeypatch.setattr(instrumentacion, "ACTIVO", True)
+    assert engine.resolver_sueldo_base(datos, params=params).a_dict() == esperado.a_dict()
+    _, traza = instrumentacion.ultima_resolucion_del_hilo()
+    assert traza["metodo"] == "biseccion" and traza["respaldo"]
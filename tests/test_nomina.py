@@ -0,0 +1,38 @@
+# tests/test_nomina.py
+"""Lectura de columnas de la nómina"""
+import pandas as pd
+import pytest
+from DATA import parametros
+from SERVICE import engine, nomina, pipeline
+
+
+@pytest.mark.parametrize("texto, esperado", [
+    ("1500000", 1_500_000), ("1.500.000", 1_500_000), ("$ 1.500.000", 1_500_000), ("$1.500.000", 1_500_000),
+    ("1.500.000,50", 1_500_000.5), ("-12.500", -12_500), ("1.500", 1_500), ("1500,5", 1_500.5),
+    ("1.5", 1.5), ("", 0), (None, 0),
+])
+def test_montos_en_pesos(texto, esperado):
+    tabla = pd.DataFrame({"sueldo_liquido": [texto, "0"]})
+    assert nomina.columnas_entrada(tabla)["sueldo_liquido"][0] == esperado
+
+
+@pytest.mark.parametrize("texto, esperado", [("2,822", 2.822), ("2.822", 2.822), ("4", 4.0)])
+def test_plan_isapre_en_uf(texto, esperado):
+    tabla = pd.DataFrame({"sueldo_liquido": ["1"], "salud_sistema": ["isapre"], "salud_uf": [texto]})
+    assert nomina.columnas_entrada(tabla)["salud_uf"][0] == esperado
+
+
+def test_valor_invalido_indica_columna_fila_y_valor():
+    tabla = pd.DataFrame({"sueldo_liquido": ["900.000", "1.2.3", "abc"]})
+    with pytest.raises(ValueError, match=r"'sueldo_liquido', fila 1: '1\.2\.3' \(y 1 filas más\)"):
+        nomina.columnas_entrada(tabla)
+
+
+def test_pipeline_con_formato_chileno(tmp_path):
+    entrada, salida = tmp_path / "nomina.csv", tmp_path / "salida.csv"
+    entrada.write_text('sueldo_liquido;movilizacion;afp_nombre\n"1.500.000";"$ 40.000";Habitat\n', encoding="utf-8")
+    pipeline.procesar_archivo(str(entrada), str(salida), separador=";", mostrar_progreso=False)
+
+    esperado = engine.resolver_sueldo_base({"sueldo_liquido": 1_500_000, "movilizacion": 40_000,
+                                            "afp_nombre": "Habitat"}, params=parametros.obtener_actual())
+    assert pd.read_csv(salida, sep=";")["sueldo_base"][0] == esperado["sueldo_base"]
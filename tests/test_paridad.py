@@ -0,0 +1,62 @@
+# tests/test_paridad.py
+"""Nómina y pipeline (motor vectorizado) contra el motor escalar, fila por fila"""
+import random
+import pandas as pd
+import pytest
+from DATA import parametros
+from SERVICE import engine, motor_entero, nomina, pipeline
+
+
+def filas_aleatorias(n: int, semilla: int) -> list:
+    rng = random.Random(semilla)
+    afps = list(parametros.obtener_actual().tasas_afp)
+    filas = []
+    for _ in range(n):
+        sistema = rng.choice(["fonasa", "isapre"])
+        filas.append({
+            "sueldo_liquido": rng.randint(200_000, 15_000_000),
+            "sueldo_base": rng.randint(0, 15_000_000),
+            "movilizacion": rng.choice([0, 30_000, 45_500]),
+            "afp_nombre": rng.choice(afps),
+            "salud_sistema": sistema,
+            "salud_uf": rng.choice([2.5, 4.0, 7.3]) if sistema == "isapre" else 0.0,
+            "bonos_imponibles": rng.choice([0, 50_000, 123_457]),
+            "bonos_no_imponibles": rng.choice([0, 20_000]),
+        })
+    # Caso reportado: Cuprum / Fonasa, bonos 50.000 imp. y 20.000 no imp., líquido 8.222.960
+    filas.append({"sueldo_liquido": 8_222_960, "sueldo_base": 0, "movilizacion": 0, "afp_nombre": "Cuprum",
+                  "salud_sistema": "fonasa", "salud_uf": 0.0,
+                  "bonos_imponibles": 50_000, "bonos_no_imponibles": 20_000})
+    return filas
+
+
+def _comparar(columnas, esperados: list, campos):
+    for i, esperado in enumerate(esperados):
+        obtenido = {c: int(columnas[c][i]) for c in campos}
+        assert obtenido == {c: esperado[c] for c in campos}, f"fila {i}"
+
+
+@pytest.mark.parametrize("modo", nomina.MODOS)
+def test_nomina_igual_al_motor_escalar(modo):
+    params = parametros.obtener_actual()
+    filas = filas_aleatorias(1500, semilla=8)
+    columnas = nomina.calcular_tabla(pd.DataFrame(filas), modo, params)
+
+    calcular = engine.resolver_sueldo_base if modo == "liquido_a_base" else engine.calcular_liquido_desde_base
+    _comparar(columnas, [calcular(f, params=params) for f in filas], nomina.COLUMNAS_RESULTADO[modo])
+
+
+@pytest.mark.parametrize("entero", [False, True])
+def test_pipeline_igual_a_llamadas_individuales(tmp_path, entero):
+    params = parametros.obtener_actual()
+    filas = filas_aleatorias(700, semilla=10)
+    entrada, salida = tmp_path / "nomina.csv", tmp_path / "salida.csv"
+    pd.DataFrame(filas).drop(columns="sueldo_base").to_csv(entrada, index=False)
+
+    pipeline.procesar_archivo(str(entrada), str(salida), "liquido_a_base", tamano_bloque=256,
+                              mostrar_progreso=False, entero=entero)
+
+    # El motor entero tiene su propia aritmética: se compara con su llamada individual
+    resolver = motor_entero.resolver_sueldo_base if entero else engine.resolver_sueldo_base
+    _comparar(pd.read_csv(salida), [resolver(f, params=params) for f in filas],
+              nomina.COLUMNAS_RESULTADO["liquido_a_base"])
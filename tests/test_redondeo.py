@@ -0,0 +1,51 @@
+# tests/test_redondeo.py
+"""Redondeo a miles de Líquido → Base (motor escalar y vectorizado)"""
+import random
+import numpy as np
+import pytest
+from DATA import parametros
+from SERVICE import engine, lote
+
+
+def test_ruido_bajo_el_peso_no_sube_otros_mil():
+    # Raíz en 6.491.000,27: con la base 6.491.000 el líquido es 5.420.795,79 → $5.420.796.
+    # Redondear la raíz flotante hacia arriba pagaba $1000 más de base por 0,21 pesos.
+    resultado = engine.resolver_sueldo_base({"sueldo_liquido": 5_420_796, "afp_nombre": "Habitat",
+                                             "salud_sistema": "isapre", "salud_uf": 4},
+                                            params=parametros.obtener_actual())
+    assert resultado["sueldo_base"] == resultado["sueldo_base_exacto"] == 6_491_000
+    assert resultado["sueldo_liquido"] == 5_420_796
+    assert resultado["diferencia"] == resultado["redondeo_aplicado"] == 0
+
+
+@pytest.mark.parametrize("metodo", ["lineal", "biseccion"])
+def test_pendiente_mayor_a_uno_no_paga_menos(metodo):
+    # Bajo el tope de gratificación: base al peso 104.000 con líquido 115.484,4985 < 115.485
+    datos = {"sueldo_liquido": 115_485, "afp_nombre": "Habitat", "bonos_imponibles": 12_345}
+    params = parametros.obtener_actual()
+    resultado = engine.resolver_sueldo_base(datos, metodo=metodo, params=params)
+    assert resultado["sueldo_base_exacto"] == 104_000
+    assert resultado["sueldo_base"] == 105_000
+    assert resultado["diferencia"] >= 0
+
+    columnas = lote.resolver_sueldo_base_lote([115_485], 12_345, tasa_afp=params.tasas_afp["Habitat"], params=params)
+    assert int(columnas["sueldo_base"][0]) == 105_000
+
+
+def test_invariantes_del_redondeo():
+    params = parametros.obtener_actual()
+    rng = random.Random(11)
+    afps = list(params.tasas_afp)
+    filas = [{"sueldo_liquido": rng.randint(1, 12_000_000), "afp_nombre": rng.choice(afps),
+              "bonos_imponibles": rng.choice([0, 12_345, 50_000])} for _ in range(3000)]
+    columnas = lote.resolver_sueldo_base_lote(
+        np.array([f["sueldo_liquido"] for f in filas]), np.array([f["bonos_imponibles"] for f in filas]),
+        tasa_afp=lote.tasas_afp_desde_nombres(np.array([f["afp_nombre"] for f in filas]), params), params=params)
+
+    for i, datos in enumerate(filas):
+        r = engine.resolver_sueldo_base(datos, params=params)
+        assert r["sueldo_base"] % 1000 == 0
+        assert 0 <= r["redondeo_aplicado"] <= 1000
+        assert r["diferencia"] >= 0 and r["sueldo_liquido"] >= datos["sueldo_liquido"]
+        assert int(columnas["sueldo_base"][i]) == r["sueldo_base"]
+        assert int(columnas["diferencia"][i]) == r["diferencia"]
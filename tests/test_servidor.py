@@ -0,0 +1,117 @@
+# tests/test_servidor.py
+"""Servicio HTTP: validación de entradas y mismos resultados que el motor escalar"""
+import asyncio
+import json
+import random
+import pytest
+from DATA import parametros
+from SERVICE import engine, resultados, servidor
+
+
+async def _post(puerto: int, ruta: str, crudo: bytes) -> tuple:
+    reader, writer = await asyncio.open_connection("127.0.0.1", puerto)
+    writer.write(f"POST {ruta} HTTP/1.1\r\nContent-Length: {len(crudo)}\r\n"
+                 f"Connection: close\r\n\r\n".encode('latin-1') + crudo)
+    await writer.drain()
+    respuesta = await reader.read()
+    writer.close()
+    cabecera, _, cuerpo = respuesta.partition(b"\r\n\r\n")
+    return int(cabecera.split(b" ")[1]), json.loads(cuerpo)
+
+
+def consultar(consultas: list) -> list:
+    """Levanta un servidor en un puerto libre y envía [(ruta, cuerpo crudo)] en paralelo"""
+    async def ejecutar():
+        srv = await servidor.ServidorCalculo(puerto=0).iniciar()
+        try:
+            return await asyncio.gather(*(_post(srv.puerto, ruta, crudo) for ruta, crudo in consultas))
+        finally:
+            await srv.detener()
+    return asyncio.run(ejecutar())
+
+
+@pytest.mark.parametrize("cuerpo", [
+    '{"sueldo_liquido": NaN}',
+    '{"sueldo_liquido": Infinity}',
+    '{"sueldo_liquido": -Infinity}',
+    '{"sueldo_liquido": true}',
+    '{"sueldo_liquido": 900000, "movilizacion": NaN}',
+    '{"sueldo_liquido": 900000, "bonos_imponibles": Infinity}',
+    '{"sueldo_liquido": 900000, "bonos_no_imponibles": false}',
+    '{"sueldo_liquido": 900000, "salud_sistema": "isapre", "salud_uf": NaN}',
+    '{"sueldo_liquido": 900000, "bonos": [{"monto": NaN, "imponible": true}]}',
+    '{"sueldo_liquido": 900000, "bonos": [{"monto": true, "imponible": true}]}',
+])
+def test_numeros_no_finitos_o_bool_son_400(cuerpo):
+    with pytest.raises(ValueError):
+        servidor._validar_datos(json.loads(cuerpo), "liquido_a_base")
+    [(estado, respuesta)] = consultar([("/base", cuerpo.encode())])
+    assert estado == 400 and "error" in respuesta
+
+
+def test_lote_con_fila_no_finita_es_400():
+    cuerpo = json.dumps({"filas": [{"sueldo_base": 900_000}, {"sueldo_base": float("nan")}]})
+    [(estado, _)] = consultar([("/lote/liquido", cuerpo.encode())])
+    assert estado == 400
+
+
+def _consultas_aleatorias(n: int, semilla: int, principal: str) -> list:
+    rng = random.Random(semilla)
+    afps = list(parametros.obtener_actual().tasas_afp)
+    consultas = []
+    for _ in range(n):
+        sistema = rng.choice(["fonasa", "isapre"])
+        datos = {principal: rng.randint(300_000, 12_000_000), "afp_nombre": rng.choice(afps), "salud_sistema": sistema, "movilizacion": rng.choice([0, 40_000]),
+                 "bonos": [{"monto": rng.choice([0, 50_000]), "imponible": True},
+                           {"monto": rng.choice([0, 20_000]), "imponible": False}]}
+        if sistema == "isapre":
+            datos["salud_uf"] = rng.choice([2.5, 4.0])
+        consultas.append(datos)
+    # Caso reportado: Cuprum / Fonasa, bonos 50.000 imp. y 20.000 no imp., líquido 8.222.960
+    consultas.append({principal: 8_222_960, "afp_nombre": "Cuprum", "salud_sistema": "fonasa",
+                      "bonos": [{"monto": 50_000, "imponible": True}, {"monto": 20_000, "imponible": False}]})
+    return consultas
+
+
+@pytest.mark.parametrize("ruta, modo, principal", [
+    ("/base", "liquido_a_base", "sueldo_liquido"),
+    ("/liquido", "base_a_liquido", "sueldo_base"),
+])
+def test_http_igual_al_motor_escalar(ruta, modo, principal):
+    calcular = engine.resolver_sueldo_base if modo == "liquido_a_base" else engine.calcular_liquido_desde_base
+    consultas = _consultas_aleatorias(300, semilla=21, principal=principal)
+
+    # En paralelo: el agrupador las calcula en lotes con el motor vectorizado
+    respuestas = consultar([(ruta, json.dumps(datos).encode()) for datos in consultas])
+    for datos, (estado, respuesta) in zip(consultas, respuestas):
+        assert estado == 200
+        esperado = calcular(datos)
+        assert {c: respuesta[c] for c in resultados.CAMPOS_POR_MODO[modo]} == \
+               {c: esperado[c] for c in resultados.CAMPOS_POR_MODO[modo]}, datos
+
+
+def test_http_lote_igual_al_motor_escalar():
+    consultas = _consultas_aleatorias(200, semilla=22, principal="sueldo_liquido")
+    [(estado, respuesta)] = consultar([("/lote/base", json.dumps({"filas": consultas}).encode())])
+    assert estado == 200
+    assert respuesta["resultados"] == [engine.resolver_sueldo_base(datos).a_dict() for datos in consultas]
+
+
+def test_lote_agrupado_que_falla_no_deja_consultas_esperando(monkeypatch):
+    def fallar(*_args):
+        raise RuntimeError("motor caído")
+    monkeypatch.setattr(servidor.nomina, "calcular_lista_datos", fallar)
+    monkeypatch.setattr(servidor, "_calcular_por_separado", fallar)
+
+    async def ejecutar():
+        srv = await servidor.ServidorCalculo(puerto=0).iniciar()
+        try:
+            respuestas = await asyncio.wait_for(asyncio.gather(
+                *(_post(srv.puerto, "/base", b'{"sueldo_liquido": 900000}') for _ in range(3))), timeout=5)
+            return respuestas, srv.agrupadores["liquido_a_base"]._tareas
+        finally:
+            await srv.detener()
+
+    respuestas, tareas = asyncio.run(ejecutar())
+    assert [estado for estado, _ in respuestas] == [500, 500, 500]
+    assert not tareas